@@ -0,0 +1,146 @@
+# app/caching.py
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+# States returned alongside a cached value
+FRESH = "fresh"        # within TTL
+STALE = "stale"        # past TTL, served immediately while a refresh runs in the background
+FALLBACK = "fallback"  # upstream failed; last good value for the same group
+
+
+class SWRCache:
+    """
+    Thread-safe stale-while-revalidate cache.
+
+    - fresh hit: returned as-is
+    - stale hit: returned immediately, one background refresh per key is started
+    - miss: loaded inline; if the loader raises, the last good value of the same
+      `group` (e.g. the coin) is served instead, and only re-raised when none exists
+
+    `expires` (stored_at -> expires_at) replaces the fixed `ttl`, e.g. to expire
+    at a schedule boundary.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 256, expires: Callable[[float], float] | None = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.expires = expires or (lambda stored_at: stored_at + self.ttl)
+        self._entries: OrderedDict[Hashable, tuple[Any, float, Hashable | None]] = OrderedDict()
+        self._last_good: dict[Hashable, Any] = {}
+        self._refreshing: set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def put(self, key: Hashable, value: Any, group: Hashable | None = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time(), group)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if group is not None:
+                self._last_good[group] = value
+
+    def get(self, key: Hashable, loader: Callable[[], Any], group: Hashable | None = None) -> tuple[Any, str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None:
+            value, stored_at, _ = entry
+            if time.time() < self.expires(stored_at):
+                return value, FRESH
+            self._refresh_in_background(key, loader, group)
+            return value, STALE
+
+        try:
+            value = loader()
+        except Exception:
+            with self._lock:
+                if group is not None and group in self._last_good:
+                    return self._last_good[group], FALLBACK
+            raise
+        self.put(key, value, group)
+        return value, FRESH
+
+    def invalidate_group(self, group: Hashable) -> int:
+        """
+        Drop every entry stored under `group`; other groups are untouched.
+
+        The group's last good value is kept so a failing refetch can still fall back.
+        """
+        with self._lock:
+            keys = [k for k, (_, _, g) in self._entries.items() if g == group]
+            for k in keys:
+                del self._entries[k]
+        return len(keys)
+
+    def _refresh_in_background(self, key: Hashable, loader: Callable[[], Any], group: Hashable | None) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.put(key, loader(), group)
+            except Exception:
+                pass  # keep serving the stale value; next hit retries
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="swr-refresh", daemon=True).start()
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one in-flight call.
+
+    The first caller (the leader) runs `fn`; callers arriving while it runs
+    wait for it and get the same result, or the same exception. Nothing is
+    kept once the call finishes: this de-duplicates, it does not cache.
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fn()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._flights
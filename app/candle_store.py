@@ -0,0 +1,96 @@
+# app/candle_store.py
+from __future__ import annotations
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+# Parquet files (one per pair + interval) plus a tiny JSON sidecar holding
+# Kraken's "last" cursor. Override the location with CRYPTO_INSIGHT_DATA_DIR.
+DATA_DIR = Path(
+    os.environ.get("CRYPTO_INSIGHT_DATA_DIR", Path(__file__).resolve().parent / ".data")
+) / "candles"
+
+COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+
+# Cap per pair + interval so minute candles can't grow the store without bound
+# (~139 days of 1m bars; daily history is never near this).
+MAX_ROWS = 200_000
+
+
+def load_candles(pair: str, interval: int) -> tuple[pd.DataFrame | None, int | None]:
+    """
+    Return (candles, last_cursor) from disk, or (None, None) before the first backfill.
+    """
+    data_path, meta_path = _paths(pair, interval)
+    if not data_path.exists():
+        return None, None
+    try:
+        df = pd.read_parquet(data_path)[COLUMNS]
+    except Exception:
+        # Corrupt/partial file: treat as cold and let the caller backfill.
+        return None, None
+    if df.empty:
+        return None, None
+    return df, _cursor(meta_path, df)
+
+
+def save_candles(pair: str, interval: int, df: pd.DataFrame, last: int | None) -> None:
+    """
+    Atomically write candles, then cursor (tmp file + rename each, safe across
+    workers and threads). A crash between the two renames leaves an older
+    cursor next to newer candles, which only makes the next fetch overlap more.
+    """
+    data_path, meta_path = _paths(pair, interval)
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+
+    df = df.tail(MAX_ROWS)
+    tag = f".{os.getpid()}-{threading.get_ident()}.tmp"
+    tmp_data = data_path.with_name(data_path.name + tag)
+    df[COLUMNS].to_parquet(tmp_data, index=False)
+    os.replace(tmp_data, data_path)
+
+    tmp_meta = meta_path.with_name(meta_path.name + tag)
+    tmp_meta.write_text(json.dumps({"last": last, "rows": int(len(df))}))
+    os.replace(tmp_meta, meta_path)
+
+
+def merge_candles(stored: pd.DataFrame | None, fresh: pd.DataFrame) -> pd.DataFrame:
+    """
+    Append freshly fetched candles to the stored history.
+
+    Kraken re-sends the candle at the cursor and the still-open current candle,
+    so stored candles from the first fresh timestamp on are replaced by the
+    fresh rows.
+    """
+    if fresh.empty:
+        return stored if stored is not None else fresh
+    # Consecutive pages of one cursor walk overlap the same way, so dedupe even on backfill.
+    fresh = fresh.drop_duplicates(subset="date", keep="last").sort_values("date")
+    if stored is None or stored.empty:
+        return fresh.reset_index(drop=True)
+    # Stored history is sorted and unique: keep what precedes the fresh rows and
+    # append them, rather than re-sorting up to MAX_ROWS rows on every fetch.
+    cut = int(stored["date"].searchsorted(fresh["date"].iloc[0], side="left"))
+    return pd.concat([stored.iloc[:cut], fresh], ignore_index=True)
+
+
+def _cursor(meta_path: Path, df: pd.DataFrame) -> int:
+    """
+    The stored cursor, checked against the candles it belongs to: if the sidecar
+    is missing, unreadable or ahead of the newest stored candle (files written
+    by different writers), resume from the newest stored candle instead.
+    """
+    newest = int(df["date"].max().timestamp())
+    try:
+        last = json.loads(meta_path.read_text())["last"]
+        return min(int(last), newest)
+    except Exception:
+        return newest
+
+
+def _paths(pair: str, interval: int) -> tuple[Path, Path]:
+    stem = f"{pair.upper()}_{int(interval)}"
+    return DATA_DIR / f"{stem}.parquet", DATA_DIR / f"{stem}.json"
@@ -0,0 +1,178 @@
+# app/candles.py
+from __future__ import annotations
+import time as _time
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class CandleSeries:
+    """
+    OHLCV candles as contiguous, read-only arrays: int64 epoch seconds (sorted,
+    unique) plus one (5, n) block of open/high/low/close/volume in float64 or,
+    to halve memory, float32.
+
+    Windows (last, between, slicing) are views of the same arrays, and
+    to_frame() wraps them in a DataFrame without copying, so a series can be
+    shared by every session and sliced per render for free.
+    """
+
+    __slots__ = ("time", "values", "_frame", "_root", "_start")
+
+    def __init__(self, time: np.ndarray, values: np.ndarray):
+        if time.dtype != np.int64 or time.ndim != 1:
+            raise TypeError("time must be a 1-D int64 array of epoch seconds")
+        if values.ndim != 2 or values.shape != (len(FIELDS), len(time)):
+            raise ValueError(f"values must have shape ({len(FIELDS)}, {len(time)})")
+        if values.dtype not in (np.float32, np.float64):
+            raise TypeError("values must be float32 or float64")
+        time = time.view()
+        values = values.view()
+        time.flags.writeable = False
+        values.flags.writeable = False
+        self.time = time
+        self.values = values
+        self._frame: pd.DataFrame | None = None
+        # Windows remember the series they view, to slice its (cached) frame
+        self._root: CandleSeries | None = None
+        self._start = 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dtype: Any = np.float64) -> CandleSeries:
+        """Copy a date + OHLCV frame (any order, duplicate dates keep the last row)."""
+        time = df["date"].to_numpy(dtype="datetime64[s]").view(np.int64)
+        values = np.empty((len(FIELDS), len(df)), dtype=dtype)
+        for row, name in zip(values, FIELDS):
+            row[:] = df[name].to_numpy(dtype=np.float64)
+        if len(time) > 1 and not (np.diff(time) > 0).all():
+            # Last occurrence of each timestamp, in time order
+            _, first_of_reversed = np.unique(time[::-1], return_index=True)
+            order = len(time) - 1 - first_of_reversed
+            time, values = time[order], values[:, order]
+        return cls(np.ascontiguousarray(time), np.ascontiguousarray(values))
+
+    @classmethod
+    def empty(cls, dtype: Any = np.float64) -> CandleSeries:
+        return cls(np.empty(0, dtype=np.int64), np.empty((len(FIELDS), 0), dtype=dtype))
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, key: slice) -> CandleSeries:
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("CandleSeries only supports contiguous slices")
+        start, stop, _ = key.indices(len(self))
+        window = CandleSeries(self.time[start:stop], self.values[:, start:stop])
+        window._root = self._root or self
+        window._start = self._start + start
+        return window
+
+    def __getstate__(self):
+        return self.time, self.values
+
+    def __setstate__(self, state) -> None:
+        CandleSeries.__init__(self, *state)
+
+    def __repr__(self) -> str:
+        span = "" if not len(self) else f", {self.dates[0]} .. {self.dates[-1]}"
+        return f"CandleSeries({len(self)} candles, {self.values.dtype}{span})"
+
+    # --- columns (views) ---
+    @property
+    def dates(self) -> np.ndarray:
+        return self.time.view("datetime64[s]")
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.values[0]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.values[1]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.values[2]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.values[3]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.values[4]
+
+    @property
+    def nbytes(self) -> int:
+        return self.time.nbytes + self.values.nbytes
+
+    # --- windows (views) ---
+    def last(self, n: int) -> CandleSeries:
+        """The newest `n` candles (all of them if there are fewer)."""
+        return self[max(len(self) - max(n, 0), 0):]
+
+    def between(self, t0: Any, t1: Any) -> CandleSeries:
+        """Candles with t0 <= date <= t1 (epoch seconds or anything pd.Timestamp accepts)."""
+        lo = np.searchsorted(self.time, _epoch(t0), side="left")
+        hi = np.searchsorted(self.time, _epoch(t1), side="right")
+        return self[lo:max(lo, hi)]
+
+    def closed(self, interval: int, now: float | None = None) -> CandleSeries:
+        """Without the candle still open at `now` (Kraken always sends it); the same object if none is."""
+        n = int(np.searchsorted(self.time, candle_start(_now(now), interval), side="left"))
+        return self if n == len(self) else self[:n]
+
+    def merge(self, newer: CandleSeries) -> CandleSeries:
+        """A new series with `newer` appended; candles from `newer`'s first timestamp on are replaced."""
+        if not len(newer):
+            return self
+        kept = self[:int(np.searchsorted(self.time, newer.time[0], side="left"))]
+        return CandleSeries(
+            np.concatenate([kept.time, newer.time]),
+            np.concatenate([kept.values, newer.values.astype(self.values.dtype, copy=False)], axis=1),
+        )
+
+    # --- pandas adapter ---
+    def to_frame(self) -> pd.DataFrame:
+        """
+        date + OHLCV DataFrame backed by this series' arrays (no copy).
+
+        Each call returns its own (shallow) frame, so adding columns never
+        touches other callers; the values are read-only like the arrays and
+        writing them raises, so derive new frames (assign, .copy()) instead.
+        """
+        if self._frame is None:
+            if self._root is not None:
+                # Row slices of a frame are views too, and cheaper than a new frame
+                frame = self._root.to_frame().iloc[self._start:self._start + len(self)]
+                frame.index = pd.RangeIndex(len(self))  # our own frame object; the root keeps its index
+                self._frame = frame
+            else:
+                columns = {"date": self.dates}
+                columns.update(zip(FIELDS, self.values))
+                self._frame = pd.DataFrame(columns, copy=False)
+        return self._frame.copy(deep=False)
+
+
+def candle_start(t: float, interval: int) -> int:
+    """Epoch seconds at which the `interval`-minute candle holding `t` opened (UTC-aligned, like Kraken)."""
+    step = interval * 60
+    return int(t // step) * step
+
+
+def next_close(interval: int, now: float | None = None) -> int:
+    """Epoch seconds at which the `interval`-minute candle open at `now` closes."""
+    return candle_start(_now(now), interval) + interval * 60
+
+
+def _now(now: float | None) -> float:
+    return _time.time() if now is None else now
+
+
+def _epoch(t: Any) -> int:
+    if isinstance(t, (int, np.integer)):
+        return int(t)
+    return pd.Timestamp(t).value // 10**9
@@ -1,6 +1,10 @@
 # app/data.py
 from __future__ import annotations
+import json
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import numpy as np
@@ -8,57 +12,334 @@ import pandas as pd
 import requests
 import streamlit as st
 
+import shared_cache
+from caching import SingleFlight
+from candles import CandleSeries, next_close
+from candle_store import MAX_ROWS as MAX_STORED_ROWS, load_candles, merge_candles, save_candles
+from indicators import IndicatorEngine
+from perf import count, timed
+from pyramid import CandlePyramid
+from ratelimit import TokenBucket
+
+try:
+    import orjson  # optional: decodes large Kraken pages noticeably faster
+except ImportError:
+    orjson = None
+
+
+# Kraken public REST API; point it at a mirror or the benchmark stub server
+# (benchmarks/stub_server.py) with CRYPTO_INSIGHT_KRAKEN_URL.
+KRAKEN_API_URL = os.environ.get("CRYPTO_INSIGHT_KRAKEN_URL", "https://api.kraken.com/0/public")
+
+# Kraken allows public REST calls at roughly one per second per IP (small bursts
+# tolerated). Every OHLC request of this process waits for a token; a throttled
+# answer pauses the bucket and the request is retried instead of failing.
+KRAKEN_RATE = float(os.environ.get("CRYPTO_INSIGHT_KRAKEN_RATE", 1.0))
+KRAKEN_BURST = float(os.environ.get("CRYPTO_INSIGHT_KRAKEN_BURST", 3))
+KRAKEN_LIMITER = TokenBucket(rate=KRAKEN_RATE, capacity=KRAKEN_BURST)
+THROTTLE_RETRIES = 3
+THROTTLE_BACKOFF = 5.0  # seconds, when a 429 carries no Retry-After
+
+# Kraken's OHLC endpoint serves at most 720 candles per request (and only the
+# newest 720), so ranges beyond ~2 years of daily candles show what the candle
+# store has accumulated.
+KRAKEN_MAX_CANDLES = 720
+RSI_WARMUP = 14
+# The "All" date range: more days than any stored series holds
+ALL_DAYS = 100 * 365
+
+# Candle interval (Kraken minutes) per sidebar label
+INTERVALS = {"1d": 1440, "4h": 240, "1h": 60, "15m": 15, "5m": 5, "1m": 1}
+DAILY = 1440
+
+# Safety net for the cursor walk in _iter_kraken_ohlc_pages
+MAX_PAGES = 50
+
+# Stored history per (pair, interval) as last read/written: (candles, cursor, saved_at).
+# Short intervals fetch every minute, so the Parquet file is read only on a
+# process's first fetch and rewritten at most every STORE_PERSIST_SECONDS (a
+# restart re-fetches the unsaved candles from the older cursor).
+STORE_PERSIST_SECONDS = float(os.environ.get("CRYPTO_INSIGHT_STORE_PERSIST_SECONDS", 300))
+_STORED: dict[tuple[str, int], tuple[pd.DataFrame, int | None, float]] = {}
+_PAGE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kraken-page")
+
+
+# Series published by the background refresher (app/prefetch.py) are served as-is.
+# The refresher re-fetches their open candle every OPEN_CANDLE_TTL seconds, and a
+# snapshot is served for that long plus SNAPSHOT_GRACE (time for the refresher's
+# next one to land). Past that the refresher is behind or dead: only the open
+# candle is refreshed inline, and a snapshot older than SNAPSHOT_MAX_AGE is ignored.
+SNAPSHOT_GRACE = 15
+SNAPSHOT_MAX_AGE = 60 * 30
+
+_LATEST: dict[tuple[str, int], tuple[CandleSeries, float]] = {}
+_LATEST_LOCK = threading.Lock()
+
+# Closed candles never change, so a fetched series stays valid until its
+# interval's next candle close. Until then only the still-open candle is
+# refreshed, after this many seconds, with one small Kraken request.
+OPEN_CANDLE_TTL = float(os.environ.get("CRYPTO_INSIGHT_OPEN_CANDLE_TTL", 60))
+# Workers share only a series' newest candles (one Kraken page) and merge them onto
+# their own copy: a whole 1m series is ~10 MB to pickle on every refresh.
+SHARED_TAIL_ROWS = KRAKEN_MAX_CANDLES
+# Price/volume precision of in-process series; float32 halves their memory
+# (~7 significant digits, plenty for charts, KPIs and indicators).
+CANDLE_DTYPE = np.dtype(os.environ.get("CRYPTO_INSIGHT_CANDLE_DTYPE", "float64"))
+
+# Fetched series, shared read-only by every session of the process:
+# (symbol, interval) -> (series, fetched_at, generation). A plain dict rather
+# than st.cache_resource, which only caches inside a script run.
+_SERIES: dict[tuple[str, int], tuple[CandleSeries, float, int]] = {}
+_LOADS = SingleFlight()
+
+# Bumped by invalidate_ohlc(); a load that started before the bump is not
+# stored, so a refresh re-fetches one coin without touching the other coins.
+_GENERATION: dict[str, int] = {}
+
+# One Kraken walk per (pair, interval) at a time; the refresher, fan-out and
+# sessions that miss together all wait for the same fetch.
+_FETCHES = SingleFlight()
+
 
 # --- Public helpers (same names you already import) ---
-@st.cache_data(ttl=60 * 10, show_spinner=False)
-def generate_ohlc_data(symbol: str, n_days: int) -> pd.DataFrame:
+def load_ohlc_series(symbol: str, interval: int = DAILY) -> pd.DataFrame:
     """
-    Fetch OHLC from Kraken and keep extra lookback data for indicators.
+    OHLC history for one coin at one candle interval (daily by default), as a
+    DataFrame view of load_candle_series(). The frame is shared (not copied)
+    between sessions and read-only: derive new frames from it, never modify it
+    in place.
     """
-    pair = _symbol_to_kraken_pair(symbol)
-    # Add 100-day buffer for indicators like RSI(14), SMA(20)
-    buffer_days = 100
-    end_dt = datetime.now(timezone.utc).date()
-    start_dt = end_dt - timedelta(days=max(n_days + buffer_days, 120))
-    since = int(datetime.combine(start_dt, datetime.min.time(), tzinfo=timezone.utc).timestamp())
-
-    url = "https://api.kraken.com/0/public/OHLC"
-    params = {"pair": pair, "interval": 1440, "since": since}
-    resp = requests.get(url, params=params, timeout=20)
-    resp.raise_for_status()
-    payload = resp.json()
+    return load_candle_series(symbol, interval).to_frame()
 
-    if payload.get("error"):
-        raise RuntimeError(f"Kraken API error: {payload['error']}")
 
-    result = payload.get("result", {})
-    keys = [k for k in result.keys() if k != "last"]
-    if not keys:
-        raise RuntimeError("Kraken response missing OHLC data")
-    pair_key = keys[0]
-    rows = result[pair_key]
+@timed("ohlc.load")
+def load_candle_series(symbol: str, interval: int = DAILY) -> CandleSeries:
+    """
+    OHLC history for one coin at one candle interval (daily by default).
 
-    df = pd.DataFrame(
-        rows,
-        columns=["time", "open", "high", "low", "close", "vwap", "volume", "count"],
+    Every tab slices its window out of this single per-coin series, so a rerun
+    costs at most one Kraken request per coin regardless of the date range.
+    While the background refresher keeps up this is a snapshot read and never
+    touches the network; otherwise its last snapshot is the base for a
+    one-request open-candle refresh. The last candle may still be open (see
+    CandleSeries.closed); it is at most OPEN_CANDLE_TTL seconds old (plus
+    SNAPSHOT_GRACE for a snapshot).
+    """
+    key = symbol.upper()
+    now = time.time()
+    with _LATEST_LOCK:
+        entry = _LATEST.get((key, interval))
+        cached = _SERIES.get((key, interval))
+        generation = _GENERATION.get(key, 0)
+    if entry is not None and now - entry[1] > SNAPSHOT_MAX_AGE:
+        entry = None
+    if entry is not None and now < min(
+        series_expiry(interval, entry[1]) + SNAPSHOT_GRACE, next_close(interval, entry[1])
+    ):
+        count("ohlc.snapshot.hit")
+        return entry[0]
+    if cached is not None and cached[2] != generation:
+        cached = None
+    if cached is not None and now < series_expiry(interval, cached[1]):
+        count("ohlc.cache.hit")
+        return cached[0]
+
+    count("ohlc.cache.miss")
+    newest = max((e for e in (entry, cached) if e is not None), key=lambda e: e[1], default=None)
+    base = None if newest is None else newest[0]
+    # No candle closed since the newest snapshot or fetch: its closed candles are still good
+    closed_valid = newest is not None and now < next_close(interval, newest[1])
+    return _LOADS.do(
+        (key, interval, generation), lambda: _load_series(key, interval, generation, base, closed_valid)
     )
 
-    df["time"] = pd.to_datetime(df["time"], unit="s", utc=True).dt.tz_convert(None)
-    for col in ["open", "high", "low", "close", "vwap", "volume"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    df = df.dropna(subset=["open", "high", "low", "close", "volume"]).sort_values("time")
-    df = df.rename(columns={"time": "date"})[["date", "open", "high", "low", "close", "volume"]]
+def series_expiry(interval: int, fetched_at: float) -> float:
+    """When a series fetched at `fetched_at` needs a refresh: its open candle's TTL or the next close."""
+    return min(fetched_at + OPEN_CANDLE_TTL, next_close(interval, fetched_at))
+
+
+def publish_ohlc_series(symbol: str, df: pd.DataFrame, interval: int = DAILY) -> CandleSeries:
+    """Make a freshly fetched series the one every render reads (and return it)."""
+    return publish_candle_series(symbol, CandleSeries.from_frame(df, CANDLE_DTYPE), interval)
+
+
+def publish_candle_series(symbol: str, series: CandleSeries, interval: int = DAILY) -> CandleSeries:
+    """publish_ohlc_series() for a series that is already a CandleSeries (e.g. from fetch_open_candle)."""
+    now = time.time()
+    with _LATEST_LOCK:
+        _LATEST[(symbol.upper(), interval)] = (series, now)
+    shared_cache.put(
+        _shared_key(symbol, interval), (series.last(SHARED_TAIL_ROWS), now), ttl=series_expiry(interval, now) - now
+    )
+    return series
+
+
+def invalidate_ohlc(symbol: str) -> None:
+    """Force the next read of this coin to hit Kraken (every interval); other coins keep their cache."""
+    key = symbol.upper()
+    with _LATEST_LOCK:
+        for snap_key in [k for k in _LATEST if k[0] == key]:
+            del _LATEST[snap_key]
+        _GENERATION[key] = _GENERATION.get(key, 0) + 1
+    shared_cache.invalidate(f"ohlc/{key}/")
+
+
+def _load_series(
+    key: str, interval: int, generation: int, base: CandleSeries | None, closed_valid: bool
+) -> CandleSeries:
+    # Per-process miss: fetch once per host (just the open candle while `base` has
+    # valid closed candles) and share only the newest SHARED_TAIL_ROWS candles;
+    # other workers merge that tail onto their own series.
+    loaded: list[CandleSeries] = []
+
+    def fetch() -> CandleSeries:
+        if base is not None and closed_valid:
+            return fetch_open_candle(key, interval, base)
+        return CandleSeries.from_frame(fetch_ohlc_series(key, interval), CANDLE_DTYPE)
+
+    def load() -> tuple[CandleSeries, float]:
+        loaded.append(fetch())
+        return loaded[0].last(SHARED_TAIL_ROWS), time.time()
+
+    now = time.time()
+    tail, fetched_at = shared_cache.get_or_load(
+        _shared_key(key, interval), load, ttl=series_expiry(interval, now) - now
+    )
+    if loaded:
+        series = loaded[0]
+    elif base is not None and len(base) and len(tail) and base.time[-1] >= tail.time[0]:
+        count("ohlc.shared_tail.merged")
+        series = base.merge(tail).last(MAX_STORED_ROWS)
+    elif len(tail) < SHARED_TAIL_ROWS:
+        series = tail  # the whole series fit in the tail
+    else:
+        series, fetched_at = fetch(), time.time()  # nothing here it can be merged onto
+    with _LATEST_LOCK:
+        if _GENERATION.get(key, 0) == generation:
+            _SERIES[(key, interval)] = (series, fetched_at, generation)
+    return series
+
+
+def _shared_key(symbol: str, interval: int) -> str:
+    # (newest SHARED_TAIL_ROWS candles, fetched_at) entries; the suffix keeps them
+    # apart from older workers' whole series
+    return f"ohlc/{symbol.upper()}/{interval}/tail"
+
+
+@timed("kraken.open_candle")
+def fetch_open_candle(symbol: str, interval: int, series: CandleSeries) -> CandleSeries:
+    """
+    `series` with its open candle re-fetched: one Kraken request for the candles
+    after the last closed one, and no candle-store I/O. If Kraken fails, the
+    series is served as it was (closed candles are still right).
+    """
+    closed = series.closed(interval)
+    if not len(closed):
+        return CandleSeries.from_frame(fetch_ohlc_series(symbol, interval), CANDLE_DTYPE)
+    since = int(closed.time[-1])
+    try:
+        rows, _ = _request_kraken_page(_symbol_to_kraken_pair(symbol), interval, since)
+    except Exception:
+        count("kraken.open_candle.failed")
+        return series
+    fresh = CandleSeries.from_frame(_parse_ohlc_rows(rows), CANDLE_DTYPE)
+    return closed.merge(fresh[int(np.searchsorted(fresh.time, since, side="right")):])
+
+
+@timed("kraken.fetch")
+def fetch_ohlc_series(symbol: str, interval: int = DAILY) -> pd.DataFrame:
+    """
+    OHLC history backed by the on-disk candle store (no Streamlit caching).
+
+    After the first full backfill only candles newer than the stored Kraken
+    cursor are requested, so cache expiries and restarts fetch a few rows.
+    Kraken only serves its most recent 720 candles per interval; history
+    beyond that accumulates in the store as the app keeps running, and is
+    dropped if the store falls behind that window (it would not join up).
+    Concurrent calls for the same pair and interval share one fetch.
+    """
+    pair = _symbol_to_kraken_pair(symbol)
+    return _FETCHES.do((pair, interval), lambda: _fetch_ohlc_series(pair, interval))
+
+
+def _fetch_ohlc_series(pair: str, interval: int) -> pd.DataFrame:
+    # (one walk per pair + interval at a time, so _STORED needs no lock)
+    memo = _STORED.get((pair, interval))
+    if memo is not None:
+        stored, last, saved_at = memo
+    else:
+        stored, last = load_candles(pair, interval)
+        saved_at = None
 
-    # Keep last n_days + RSI warmup
-    df = df.tail(n_days + 14).reset_index(drop=True)
+    if stored is None or last is None:
+        start = datetime.now(timezone.utc) - timedelta(minutes=interval * KRAKEN_MAX_CANDLES)
+        since = int(start.timestamp())
+    else:
+        since = int(last)
+
+    chunks = []
+    try:
+        for chunk, last in _iter_kraken_ohlc_pages(pair, interval, since):
+            chunks.append(chunk)
+    except Exception:
+        # Kraken down/slow: a stale-but-complete local history beats an error page.
+        if stored is not None and not stored.empty:
+            return stored
+        raise
+
+    fresh = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    if (
+        stored is not None and not stored.empty and not fresh.empty
+        and fresh["date"].iloc[0] > stored["date"].iloc[-1] + pd.Timedelta(minutes=interval)
+    ):
+        # The cursor fell out of Kraken's 720-candle window, which then sends only its
+        # newest candles: joining them to the stored history would leave a silent hole.
+        count("kraken.history_gap")
+        stored = None
+    df = merge_candles(stored, fresh).tail(MAX_STORED_ROWS)
+    now = time.time()
+    if saved_at is None or now - saved_at >= STORE_PERSIST_SECONDS:
+        try:
+            save_candles(pair, interval, df, last)
+            saved_at = now
+        except OSError:
+            saved_at = now  # read-only deploys still work, just without the warm restart
+    _STORED[(pair, interval)] = (df, last, saved_at)
     return df
 
 
+def generate_ohlc_data(symbol: str, n_days: int, interval: int = DAILY) -> pd.DataFrame:
+    """
+    Last n_days of OHLC plus RSI warm-up, sliced from the shared per-coin series.
+    """
+    series = load_candle_series(symbol, interval)
+    return series.last(candles_for_days(n_days, interval) + RSI_WARMUP).to_frame()
+
+
+def candles_for_days(n_days: int, interval: int = DAILY) -> int:
+    """Number of `interval`-minute candles covering n_days."""
+    return max(1, n_days * DAILY // interval)
+
+
+@st.cache_resource(show_spinner=False)
+def indicator_engine(symbol: str, interval: int = DAILY) -> IndicatorEngine:
+    """Process-wide incremental SMA(7)/SMA(20)/RSI(14) state for one coin + interval."""
+    return IndicatorEngine(sma_windows=(7, 20), rsi_period=14)
+
+
+@st.cache_resource(show_spinner=False)
+def candle_pyramid(symbol: str, interval: int = DAILY) -> CandlePyramid:
+    """Process-wide coarser resolutions (up to monthly) of one coin + interval, for long ranges."""
+    return CandlePyramid(interval)
+
+
+@timed("indicators.sma")
 def sma(series: pd.Series, w: int) -> pd.Series:
     return series.rolling(w, min_periods=w).mean()
 
 
+@timed("indicators.rsi")
 def rsi(close: pd.Series, period: int = 14) -> pd.Series:
     """
     Compute RSI with extra smoothing and warm-up handling.
@@ -75,6 +356,147 @@ def rsi(close: pd.Series, period: int = 14) -> pd.Series:
     return rsi
 
 
+# --- Internal: Kraken OHLC requests + parsing ---
+def _iter_kraken_ohlc_pages(pair: str, interval: int, since: int):
+    """
+    Yield (candles, last_cursor) pages by walking Kraken's since/last cursor.
+
+    Pipelined: as soon as a page's JSON is in, the next page (which only needs
+    the cursor) is requested in the background while this one is parsed and
+    handed to the caller, so only ~2 raw pages are ever held in memory. The
+    walk stops on a short page, a page that reaches the open candle, a cursor
+    that stops moving, or MAX_PAGES.
+    """
+    rows, last = _request_kraken_page(pair, interval, since)
+    for _ in range(MAX_PAGES):
+        more = (
+            len(rows) >= KRAKEN_MAX_CANDLES and last is not None and int(last) > since
+            # a full page ending in the still-open candle is the newest there is
+            and int(rows[-1][0]) + interval * 60 <= time.time()
+        )
+        next_page = _PAGE_POOL.submit(_request_kraken_page, pair, interval, int(last)) if more else None
+
+        yield _parse_ohlc_rows(rows), last
+        if next_page is None:
+            return
+        since = int(last)
+        rows, last = next_page.result()
+
+
+@timed("kraken.request")
+def _request_kraken_page(pair: str, interval: int, since: int) -> tuple[list, int | None]:
+    """
+    Single Kraken OHLC request; returns raw candle rows and the "last" cursor.
+
+    Paced by KRAKEN_LIMITER. Rate-limit answers (HTTP 429 or an "EAPI:Rate
+    limit exceeded" / "EGeneral:Too many requests" error) pause the limiter
+    and the request is queued again, up to THROTTLE_RETRIES times.
+    """
+    url = f"{KRAKEN_API_URL}/OHLC"
+    params = {"pair": pair, "interval": interval, "since": since}
+    for _ in range(THROTTLE_RETRIES + 1):
+        KRAKEN_LIMITER.acquire()
+        resp = requests.get(url, params=params, timeout=20)
+        if resp.status_code == 429:
+            _throttled(_retry_after(resp))
+            continue
+        resp.raise_for_status()
+        payload = _decode_json(resp.content)
+        errors = payload.get("error") or []
+        if any("Rate limit" in e or "Too many requests" in e for e in errors):
+            _throttled(THROTTLE_BACKOFF)
+            continue
+        break
+    else:
+        raise RuntimeError(f"Kraken rate limit: still throttled after {THROTTLE_RETRIES} retries")
+
+    if payload.get("error"):
+        raise RuntimeError(f"Kraken API error: {payload['error']}")
+
+    result = payload.get("result", {})
+    keys = [k for k in result.keys() if k != "last"]
+    if not keys:
+        raise RuntimeError("Kraken response missing OHLC data")
+    pair_key = keys[0]
+    return result[pair_key], result.get("last")
+
+
+def _retry_after(resp: requests.Response) -> float:
+    try:
+        return max(0.0, float(resp.headers.get("Retry-After", THROTTLE_BACKOFF)))
+    except ValueError:  # HTTP-date form; not worth parsing for a few seconds' wait
+        return THROTTLE_BACKOFF
+
+
+def _throttled(seconds: float) -> None:
+    count("kraken.throttled")
+    KRAKEN_LIMITER.pause(seconds)
+
+
+def _decode_json(content: bytes):
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+# Kraken candle row: [time, open, high, low, close, vwap, volume, count]
+_OHLCV_FIELDS = [1, 2, 3, 4, 6]
+_OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+@timed("kraken.parse")
+def _parse_ohlc_rows(rows: list) -> pd.DataFrame:
+    """
+    Kraken candle rows -> date + float64 OHLCV frame.
+
+    The rows go through one object array and are cast column-wise straight to
+    int64 epoch seconds / float64, instead of an object-dtype DataFrame that is
+    then converted column by column. Same output as _parse_ohlc_rows_pandas.
+    """
+    table = np.array(rows, dtype=object)
+    if table.size == 0:
+        return pd.DataFrame({
+            "date": np.array([], dtype="datetime64[ns]"),
+            **{c: np.array([], dtype=np.float64) for c in _OHLCV_COLUMNS},
+        })
+    if table.ndim != 2 or table.shape[1] < 7:
+        raise RuntimeError("Unexpected Kraken OHLC row layout")
+
+    times = table[:, 0].astype(np.int64)
+    try:
+        values = table[:, _OHLCV_FIELDS].astype(np.float64)
+    except (TypeError, ValueError):
+        # Malformed field somewhere: coerce to NaN like pd.to_numeric(errors="coerce")
+        values = np.column_stack(
+            [pd.to_numeric(table[:, i], errors="coerce") for i in _OHLCV_FIELDS]
+        ).astype(np.float64)
+
+    keep = ~np.isnan(values).any(axis=1)
+    if not keep.all():
+        times, values = times[keep], values[keep]
+    if times.size > 1 and (np.diff(times) < 0).any():
+        order = np.argsort(times, kind="stable")
+        times, values = times[order], values[order]
+
+    df = pd.DataFrame(values, columns=_OHLCV_COLUMNS)
+    df.insert(0, "date", times.astype("datetime64[s]").astype("datetime64[ns]"))
+    return df
+
+
+def _parse_ohlc_rows_pandas(rows: list) -> pd.DataFrame:
+    """Original pandas parser; the reference for tests and benchmarks."""
+    df = pd.DataFrame(
+        rows,
+        columns=["time", "open", "high", "low", "close", "vwap", "volume", "count"],
+    )
+
+    df["time"] = pd.to_datetime(df["time"], unit="s", utc=True).dt.tz_convert(None)
+    for col in ["open", "high", "low", "close", "vwap", "volume"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    df = df.dropna(subset=["open", "high", "low", "close", "volume"]).sort_values("time")
+    df = df.rename(columns={"time": "date"})[["date", "open", "high", "low", "close", "volume"]]
+    return df.reset_index(drop=True)
+
+
 # --- Internal: map UI symbols to Kraken pairs robustly ---
 def _symbol_to_kraken_pair(symbol: str) -> str:
     s = symbol.upper()
@@ -0,0 +1,99 @@
+# app/downsample.py
+from __future__ import annotations
+import os
+
+import numpy as np
+import pandas as pd
+
+# Streamlit doesn't tell us the rendered chart width, so budgets are derived from
+# a nominal width in CSS pixels (wide layout ~ 1200px). Override with
+# CRYPTO_INSIGHT_CHART_WIDTH for very wide or very narrow deployments.
+CHART_WIDTH_PX = int(os.environ.get("CRYPTO_INSIGHT_CHART_WIDTH", 1200))
+PX_PER_LINE_POINT = 1   # a line needs ~1 point per pixel to look identical
+PX_PER_CANDLE = 4       # a candle body needs a few pixels to be readable
+
+
+def line_budget(width_px: int = CHART_WIDTH_PX) -> int:
+    return max(3, width_px // PX_PER_LINE_POINT)
+
+
+def candle_budget(width_px: int = CHART_WIDTH_PX) -> int:
+    return max(3, width_px // PX_PER_CANDLE)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points that preserve the
+    visual shape of the line (first and last points are always kept).
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 inner buckets
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket (or the last point) is the third triangle vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.nanargmax(area)) if np.isfinite(area).any() else lo
+        out[i + 1] = a
+    return out
+
+
+def lttb_frame(df: pd.DataFrame, x: str, y: str, n_out: int | None = None) -> pd.DataFrame:
+    """Rows of `df` kept by LTTB on (x, y); unchanged when already within budget."""
+    n_out = line_budget() if n_out is None else n_out
+    if len(df) <= n_out:
+        return df
+    xs = df[x].to_numpy()
+    if np.issubdtype(xs.dtype, np.datetime64):
+        xs = xs.astype("datetime64[s]").astype("int64")
+    idx = lttb_indices(xs, df[y].to_numpy(), n_out)
+    return df.iloc[idx].reset_index(drop=True)
+
+
+def ohlc_buckets(df: pd.DataFrame, n_out: int | None = None) -> pd.DataFrame:
+    """
+    Merge consecutive candles into at most `n_out` buckets without losing extremes:
+    open = first, high = max, low = min, close = last, volume = sum. Any other
+    numeric columns (indicators) take the bucket's last value; date is the bucket start.
+    """
+    n_out = candle_budget() if n_out is None else n_out
+    n = len(df)
+    if n <= n_out:
+        return df
+
+    size = int(np.ceil(n / n_out))
+    # Anchor buckets on the newest candle so the latest bar is never split
+    starts = np.arange(n - size * int(np.ceil(n / size)), n, size).clip(min=0)
+    starts = np.unique(starts)
+    ends = np.r_[starts[1:], n]
+    last = ends - 1
+
+    out = {"date": df["date"].to_numpy()[starts]}
+    for col in df.columns:
+        if col == "date":
+            continue
+        values = df[col].to_numpy()
+        if col == "open":
+            out[col] = values[starts]
+        elif col == "high":
+            out[col] = np.maximum.reduceat(values, starts)
+        elif col == "low":
+            out[col] = np.minimum.reduceat(values, starts)
+        elif col == "volume":
+            out[col] = np.add.reduceat(values, starts)
+        else:
+            out[col] = values[last]
+    return pd.DataFrame(out, columns=df.columns)
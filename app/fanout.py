@@ -0,0 +1,66 @@
+# app/fanout.py
+from __future__ import annotations
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Hashable, Iterable, Mapping, TypeVar
+
+import requests
+
+from candles import CandleSeries
+from data import load_candle_series
+from student_api import check_health
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+# One bounded pool per process: caps concurrent upstream calls (Kraken + Render)
+# no matter how many sessions or background jobs are fanning out at once.
+MAX_CONCURRENCY = int(os.environ.get("CRYPTO_INSIGHT_FETCH_WORKERS", 8))
+_POOL = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="crypto-fetch")
+
+# api_url -> its background health probe (see start_probes)
+_PROBES: dict[str, Future] = {}
+_PROBES_LOCK = threading.Lock()
+
+
+def run_concurrently(
+    tasks: Mapping[K, Callable[[], T]], timeout: float | None = None
+) -> tuple[dict[K, T], dict[K, Exception]]:
+    """
+    Run independent blocking calls in parallel; wall time ~ the slowest call.
+
+    Returns (results, errors) keyed like `tasks`; a task still running after
+    `timeout` seconds is reported as a TimeoutError instead of blocking.
+    Tasks must not submit (and wait on) work of their own, or the pool can starve.
+    """
+    futures = {key: _POOL.submit(fn) for key, fn in tasks.items()}
+    wait(futures.values(), timeout=timeout)
+
+    results: dict[K, T] = {}
+    errors: dict[K, Exception] = {}
+    for key, fut in futures.items():
+        if not fut.done():
+            errors[key] = TimeoutError(f"{key!r} did not finish within {timeout}s")
+        elif fut.exception() is not None:
+            errors[key] = fut.exception()
+        else:
+            results[key] = fut.result()
+    return results, errors
+
+
+def fetch_all_ohlc(coins: list[str] | tuple[str, ...]) -> tuple[dict[str, CandleSeries], dict[str, Exception]]:
+    """Every coin's OHLC series in one parallel round-trip, cached for the renders that follow."""
+    return run_concurrently({coin: (lambda c=coin: load_candle_series(c)) for coin in coins})
+
+
+def start_probes(session: requests.Session, api_urls: Iterable[str]) -> None:
+    """
+    Health-probe student APIs in the background and return at once, with at most
+    one probe per API in flight; check_health shares the "up" results.
+    """
+    with _PROBES_LOCK:
+        for url in api_urls:
+            probe = _PROBES.get(url)
+            if probe is None or probe.done():
+                _PROBES[url] = _POOL.submit(check_health, session, url)
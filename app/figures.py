@@ -0,0 +1,82 @@
+# app/figures.py
+from __future__ import annotations
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from perf import count, span
+
+# Process-wide LRU of built Plotly figures. Figures are never mutated after
+# construction (st.plotly_chart serializes a copy), so sessions can share them.
+MAX_FIGURES = int(os.environ.get("CRYPTO_INSIGHT_FIGURE_CACHE", 64))
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable content hash of frames/series/arrays plus plain option values."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            h.update(repr(list(part.columns) if isinstance(part, pd.DataFrame) else part.name).encode())
+            h.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        elif isinstance(part, np.ndarray):
+            h.update(str(part.dtype).encode() + str(part.shape).encode())
+            h.update(np.ascontiguousarray(part).tobytes())
+        else:
+            h.update(repr(part).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class FigureCache:
+    """Bounded LRU: key -> built go.Figure."""
+
+    def __init__(self, maxsize: int = MAX_FIGURES):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._figs: OrderedDict[str, go.Figure] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: str, build: Callable[[], go.Figure]) -> go.Figure:
+        with self._lock:
+            fig = self._figs.get(key)
+            if fig is not None:
+                self._figs.move_to_end(key)
+                self.hits += 1
+                count("figure.hit")
+                return fig
+            self.misses += 1
+        count("figure.miss")
+
+        fig = build()
+        with self._lock:
+            self._figs[key] = fig
+            self._figs.move_to_end(key)
+            while len(self._figs) > self.maxsize:
+                self._figs.popitem(last=False)
+        return fig
+
+
+FIGURE_CACHE = FigureCache()
+
+
+def cached_figure(name: str, build: Callable[..., go.Figure], frame: pd.DataFrame, **options) -> go.Figure:
+    """
+    Build `build(frame, **options)` once per (name, frame content, options).
+
+    `frame` should hold everything the figure plots (the visible slice plus any
+    indicator columns), so identical reruns skip figure construction entirely.
+    """
+    key = f"{name}:{fingerprint(frame, sorted(options.items()))}"
+
+    def build_timed() -> go.Figure:
+        with span(f"figure.build.{name}"):
+            return build(frame, **options)
+
+    return FIGURE_CACHE.get_or_build(key, build_timed)
@@ -0,0 +1,283 @@
+# app/indicators.py
+from __future__ import annotations
+import bisect
+import threading
+from collections import deque
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+
+
+# --- Streaming indicators: O(1) per appended candle ---
+class RollingMean:
+    """Streaming equivalent of data.sma: series.rolling(w, min_periods=w).mean()."""
+
+    __slots__ = ("window", "_values", "_sum")
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values: deque[float] = deque()
+        self._sum = 0.0
+
+    def update(self, x: float) -> float:
+        self._values.append(x)
+        self._sum += x
+        if len(self._values) > self.window:
+            self._sum -= self._values.popleft()
+        if len(self._values) < self.window:
+            return NAN
+        return self._sum / self.window
+
+    def snapshot(self) -> tuple:
+        return (deque(self._values), self._sum)
+
+    def restore(self, state: tuple) -> None:
+        values, total = state
+        self._values = deque(values)
+        self._sum = total
+
+
+class WilderRSI:
+    """
+    Streaming equivalent of data.rsi: EWM(alpha=1/period, adjust=False) of gains and
+    losses seeded with the first change, NaN until `period` changes were seen and
+    whenever the average loss is exactly 0.
+    """
+
+    __slots__ = ("period", "_alpha", "_prev", "_avg_gain", "_avg_loss", "_n")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._alpha = 1.0 / period
+        self._prev: float | None = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._n = 0
+
+    def update(self, close: float) -> float:
+        if self._prev is None:
+            self._prev = close
+            return NAN
+        change = close - self._prev
+        self._prev = close
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+
+        if self._n == 0:
+            self._avg_gain, self._avg_loss = gain, loss
+        else:
+            self._avg_gain = (1 - self._alpha) * self._avg_gain + self._alpha * gain
+            self._avg_loss = (1 - self._alpha) * self._avg_loss + self._alpha * loss
+        self._n += 1
+
+        if self._n < self.period or self._avg_loss == 0:
+            return NAN
+        rs = self._avg_gain / self._avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def snapshot(self) -> tuple:
+        return (self._prev, self._avg_gain, self._avg_loss, self._n)
+
+    def restore(self, state: tuple) -> None:
+        self._prev, self._avg_gain, self._avg_loss, self._n = state
+
+
+class IndicatorEngine:
+    """
+    Per-coin indicator state (SMAs + RSI) that only processes new candles.
+
+    `sync` is called with the coin's full close series on every render; candles
+    already seen are skipped, appended ones cost O(1) each, and a revised last
+    candle (Kraken's still-open bar) is re-applied from the state saved before it.
+    Candles trimmed off the front (a capped store) are dropped without a rebuild,
+    so values keep the warm-up of the full history seen. If the history no longer
+    lines up (gap, backfill) the engine rebuilds.
+    """
+
+    def __init__(self, sma_windows: Sequence[int] = (7, 20), rsi_period: int = 14):
+        self.sma_windows = tuple(sma_windows)
+        self.rsi_period = rsi_period
+        self._lock = threading.Lock()
+        self._reset()
+
+    @property
+    def columns(self) -> list[str]:
+        return [f"sma{w}" for w in self.sma_windows] + [f"rsi{self.rsi_period}"]
+
+    def sync(self, dates: Sequence, closes: Sequence[float]) -> pd.DataFrame:
+        """Indicator columns aligned to `dates` (same length and order)."""
+        dates = np.asarray(dates)
+        closes = np.asarray(closes, dtype="float64")
+        with self._lock:
+            start = self._resume_index(dates, closes)
+            for i in range(start, len(dates)):
+                self._push(dates[i], float(closes[i]))
+            out = {name: np.array(values, dtype="float64") for name, values in self._out.items()}
+        return pd.DataFrame(out, index=range(len(dates)), columns=self.columns)
+
+    # --- internals ---
+    def _reset(self) -> None:
+        self._smas = [RollingMean(w) for w in self.sma_windows]
+        self._rsi = WilderRSI(self.rsi_period)
+        self._dates: list = []
+        self._closes: list[float] = []
+        self._out: dict[str, list[float]] = {name: [] for name in self.columns}
+        self._before_last: tuple | None = None
+
+    def _resume_index(self, dates: np.ndarray, closes: np.ndarray) -> int:
+        n = len(self._dates)
+        if n == 0:
+            return 0
+        if dates[0] != self._dates[0]:
+            # Front trimmed: forget the candles before the new first one
+            offset = bisect.bisect_left(self._dates, dates[0])
+            if offset < n and self._dates[offset] == dates[0]:
+                self._drop_front(offset)
+                n -= offset
+        # Same first candle and our last candle still at the same position -> incremental
+        if len(dates) < n or dates[0] != self._dates[0] or dates[n - 1] != self._dates[-1]:
+            self._reset()
+            return 0
+        if closes[n - 1] != self._closes[-1]:
+            if self._before_last is None:
+                self._reset()
+                return 0
+            self._pop_last()
+            return n - 1
+        return n
+
+    def _push(self, date, close: float) -> None:
+        self._before_last = (
+            [s.snapshot() for s in self._smas],
+            self._rsi.snapshot(),
+        )
+        values = [s.update(close) for s in self._smas] + [self._rsi.update(close)]
+        for name, value in zip(self.columns, values):
+            self._out[name].append(value)
+        self._dates.append(date)
+        self._closes.append(close)
+
+    def _drop_front(self, count: int) -> None:
+        for values in self._out.values():
+            del values[:count]
+        del self._dates[:count]
+        del self._closes[:count]
+
+    def _pop_last(self) -> None:
+        sma_states, rsi_state = self._before_last
+        for s, state in zip(self._smas, sma_states):
+            s.restore(state)
+        self._rsi.restore(rsi_state)
+        for values in self._out.values():
+            values.pop()
+        self._dates.pop()
+        self._closes.pop()
+        self._before_last = None
+
+
+# --- Vectorized batch indicators: 2-D close arrays (coins x time), many windows at once ---
+def batch_sma(close: np.ndarray, windows: Sequence[int]) -> dict[int, np.ndarray]:
+    """Rolling means for every window from one cumulative sum (NaN during warm-up)."""
+    close = np.atleast_2d(np.asarray(close, dtype="float64"))
+    # De-mean per row before the cumsum so long, high-priced series keep precision.
+    base = close[:, :1]
+    csum = np.cumsum(close - base, axis=1)
+    csum = np.concatenate([np.zeros((close.shape[0], 1)), csum], axis=1)
+
+    out = {}
+    for w in windows:
+        res = np.full(close.shape, np.nan)
+        if w <= close.shape[1]:
+            res[:, w - 1:] = (csum[:, w:] - csum[:, :-w]) / w + base
+        out[w] = res
+    return out
+
+
+def batch_ema(close: np.ndarray, spans: Sequence[int]) -> dict[int, np.ndarray]:
+    """`ewm(span=s, adjust=False).mean()` for every span in a single pass over time."""
+    close = np.atleast_2d(np.asarray(close, dtype="float64"))
+    alphas = (2.0 / (np.asarray(spans, dtype="float64") + 1.0))[:, None]  # (S, 1)
+    res = _ewm_recursive(np.broadcast_to(close, (len(spans),) + close.shape), alphas[..., None])
+    return {s: res[i] for i, s in enumerate(spans)}
+
+
+def batch_rsi(close: np.ndarray, periods: Sequence[int]) -> dict[int, np.ndarray]:
+    """Same definition as data.rsi, for every period in a single pass over time."""
+    close = np.atleast_2d(np.asarray(close, dtype="float64"))
+    change = np.diff(close, axis=1)
+    gains = np.broadcast_to(np.clip(change, 0, None), (len(periods),) + change.shape)
+    losses = np.broadcast_to(np.clip(-change, 0, None), (len(periods),) + change.shape)
+    alphas = (1.0 / np.asarray(periods, dtype="float64"))[:, None, None]
+
+    avg_gain = _ewm_recursive(gains, alphas)
+    avg_loss = _ewm_recursive(losses, alphas)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / np.where(avg_loss == 0, np.nan, avg_loss))
+
+    out = {}
+    for i, p in enumerate(periods):
+        res = np.full(close.shape, np.nan)
+        res[:, 1:] = rsi[i]
+        res[:, :p] = np.nan  # min_periods: `p` changes must have been seen
+        out[p] = res
+    return out
+
+
+def batch_macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> dict[str, np.ndarray]:
+    """MACD line, signal and histogram (EMA-based, adjust=False like pandas defaults here)."""
+    emas = batch_ema(close, (fast, slow))
+    line = emas[fast] - emas[slow]
+    sig = batch_ema(line, (signal,))[signal]
+    return {"macd": line, "macd_signal": sig, "macd_hist": line - sig}
+
+
+def batch_bollinger(close: np.ndarray, windows: Sequence[int], k: float = 2.0) -> dict[int, dict[str, np.ndarray]]:
+    """Bollinger bands (rolling mean +- k * sample std) for every window."""
+    close = np.atleast_2d(np.asarray(close, dtype="float64"))
+    means = batch_sma(close, windows)
+    out = {}
+    for w in windows:
+        std = np.full(close.shape, np.nan)
+        if 1 < w <= close.shape[1]:
+            std[:, w - 1:] = np.lib.stride_tricks.sliding_window_view(close, w, axis=1).std(axis=-1, ddof=1)
+        out[w] = {"mid": means[w], "upper": means[w] + k * std, "lower": means[w] - k * std}
+    return out
+
+
+def batch_indicators(
+    close: np.ndarray,
+    sma_windows: Sequence[int] = (),
+    ema_spans: Sequence[int] = (),
+    rsi_periods: Sequence[int] = (),
+    macd: tuple[int, int, int] | None = None,
+    bollinger_windows: Sequence[int] = (),
+) -> dict[str, np.ndarray]:
+    """
+    Every requested indicator for a (coins x time) close array, keyed like
+    "sma20", "ema12", "rsi14", "macd", "macd_signal", "macd_hist", "bb20_upper".
+    """
+    out: dict[str, np.ndarray] = {}
+    out.update({f"sma{w}": v for w, v in batch_sma(close, sma_windows).items()})
+    if ema_spans:
+        out.update({f"ema{s}": v for s, v in batch_ema(close, ema_spans).items()})
+    if rsi_periods:
+        out.update({f"rsi{p}": v for p, v in batch_rsi(close, rsi_periods).items()})
+    if macd:
+        out.update(batch_macd(close, *macd))
+    for w, bands in batch_bollinger(close, bollinger_windows).items():
+        out.update({f"bb{w}_{name}": v for name, v in bands.items()})
+    return out
+
+
+def _ewm_recursive(x: np.ndarray, alpha: np.ndarray) -> np.ndarray:
+    """y[t] = (1 - a) * y[t-1] + a * x[t] along the last axis, seeded with x[0]."""
+    y = np.empty(x.shape, dtype="float64")
+    y[..., 0] = x[..., 0]
+    keep = 1.0 - alpha[..., 0]
+    a = alpha[..., 0]
+    for t in range(1, x.shape[-1]):
+        y[..., t] = keep * y[..., t - 1] + a * x[..., t]
+    return y
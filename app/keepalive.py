@@ -0,0 +1,128 @@
+# app/keepalive.py
+from __future__ import annotations
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+import streamlit as st
+
+from student_api import COIN_TO_MODULE, api_base, import_student_module
+
+log = logging.getLogger(__name__)
+
+# Render's free tier spins a service down after ~15 idle minutes, so ping well inside that.
+KEEPALIVE_ENABLED = os.environ.get("CRYPTO_INSIGHT_KEEPALIVE", "0") == "1"
+KEEPALIVE_SECONDS = int(os.environ.get("CRYPTO_INSIGHT_KEEPALIVE_SECONDS", 60 * 10))
+# A probe slower than this (or failing) means the service had spun down.
+COLD_THRESHOLD = 5.0
+# Long enough to sit through a 30-60s cold start instead of giving up mid spin-up.
+# Pings are sent once (no retries), so a dead service costs one timeout per round.
+PING_TIMEOUT = 90
+
+
+@dataclass
+class EndpointStatus:
+    url: str
+    warm: bool
+    latency: float | None
+    checked_at: float
+    error: str | None = None
+
+
+_STATUS: dict[str, EndpointStatus] = {}
+_STATUS_LOCK = threading.Lock()
+
+
+def registered_api_urls() -> dict[str, str]:
+    """API_URL of every student module, keyed by coin (modules without one are skipped)."""
+    urls = {}
+    for coin in COIN_TO_MODULE:
+        try:
+            api_url = getattr(import_student_module(coin), "API_URL", None)
+        except Exception:
+            continue
+        if api_url:
+            urls[coin] = api_base(api_url)
+    return urls
+
+
+def endpoint_status(api_url: str) -> EndpointStatus | None:
+    with _STATUS_LOCK:
+        return _STATUS.get(api_base(api_url))
+
+
+def is_warm(api_url: str, max_age: float = KEEPALIVE_SECONDS * 2) -> bool:
+    """True when a recent keep-alive ping found the service already up."""
+    status = endpoint_status(api_url)
+    return bool(status and status.warm and time.time() - status.checked_at <= max_age)
+
+
+def build_ping_session() -> requests.Session:
+    """Session without retries, unlike student_api.build_http_session."""
+    s = requests.Session()
+    s.headers.update({"User-Agent": "CryptoInsight/1.0"})
+    return s
+
+
+def ping(session: requests.Session, base: str) -> EndpointStatus:
+    """
+    GET /health once and record whether the service was warm. Pings only feed
+    is_warm(); the endpoint's circuit breaker is left to real prediction traffic.
+    """
+    start = time.monotonic()
+    try:
+        r = session.get(f"{base}/health", timeout=PING_TIMEOUT)
+        latency = time.monotonic() - start
+        ok = r.ok
+        error = None if ok else f"HTTP {r.status_code}"
+    except Exception as e:
+        latency, ok, error = None, False, str(e)
+
+    status = EndpointStatus(
+        url=base,
+        warm=ok and latency is not None and latency < COLD_THRESHOLD,
+        latency=latency,
+        checked_at=time.time(),
+        error=error,
+    )
+    with _STATUS_LOCK:
+        _STATUS[base] = status
+    return status
+
+
+class KeepAlive:
+    """Daemon thread that pings every student API so users never pay the spin-up."""
+
+    def __init__(self, interval: float = KEEPALIVE_SECONDS):
+        self.interval = interval
+        self._session = build_ping_session()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="crypto-keepalive", daemon=True)
+
+    def start(self) -> "KeepAlive":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def ping_all(self) -> dict[str, EndpointStatus]:
+        # Sequential on purpose: this thread is the only waiter and pings are rare.
+        return {coin: ping(self._session, base) for coin, base in registered_api_urls().items()}
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.ping_all()
+            except Exception:
+                log.exception("Keep-alive round failed")
+            self._stop.wait(self.interval)
+
+
+@st.cache_resource(show_spinner=False)
+def start_keepalive() -> KeepAlive:
+    """Start the process-wide keep-alive loop exactly once."""
+    return KeepAlive().start()
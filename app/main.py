@@ -1,13 +1,29 @@
+import os
 import pkgutil
 from pathlib import Path
 import streamlit as st
 
-from tabs.ui import style_sidebar
+from tabs.ui import VIEW_SWITCHER_LABEL, style_sidebar
 from tabs.overview import render as render_overview
 from tabs.ohlc import render as render_ohlc
 from tabs.predictions import render as render_predictions
 from tabs.team import render as render_team
-from tabs.predictions import prewarm_prediction_for_coin
+from tabs.debug import render as render_debug
+from tabs.predictions import prewarm_all_predictions
+from prefetch import PREFETCH_ENABLED, start_prefetcher
+from keepalive import KEEPALIVE_ENABLED, start_keepalive
+from data import ALL_DAYS, INTERVALS
+from fanout import fetch_all_ohlc
+from ticker import LIVE_SECONDS
+from perf import begin_rerun, end_rerun
+
+COINS = ["BTC", "ETH", "SOL", "XRP"]
+# Date range label -> days; long ranges are drawn from coarser candles (app/pyramid.py)
+DATE_RANGES = {
+    "Last 30 Days": 30, "Last 60 Days": 60, "Last 90 Days": 90, "Last 180 Days": 180,
+    "Last 1 Year": 365, "Last 5 Years": 5 * 365, "All": ALL_DAYS,
+}
+EAGER_TABS = os.environ.get("CRYPTO_INSIGHT_EAGER_TABS", "0") == "1"
 
 # ---------- Page config ----------
 st.set_page_config(
@@ -17,6 +33,25 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Per-stage timings for this rerun; ?debug=1 shows them, ?profile=1 adds cProfile
+DEBUG = st.query_params.get("debug") == "1"
+begin_rerun(profile=DEBUG and st.query_params.get("profile") == "1")
+
+@st.cache_resource(show_spinner=False)
+def _warm_all_ohlc(coins: tuple[str, ...]) -> None:
+    """Without the refresher, a process's first run loads every coin in one parallel round-trip."""
+    fetch_all_ohlc(coins)
+
+
+# Background refresher keeps every coin's OHLC + prediction hot (one per process)
+if PREFETCH_ENABLED:
+    start_prefetcher(tuple(COINS))
+else:
+    _warm_all_ohlc(tuple(COINS))
+# Optional keep-alive pings so Render's free tier never spins the model APIs down
+if KEEPALIVE_ENABLED:
+    start_keepalive()
+
 # ---------- Sidebar ----------
 style_sidebar()
 with st.sidebar:
@@ -28,7 +63,7 @@ with st.sidebar:
         st.markdown("<div class='card-title'>☰&nbsp;&nbsp;Select Cryptocurrency</div>", unsafe_allow_html=True)
         coin = st.selectbox(
             "coin",
-            ["BTC", "ETH", "SOL", "XRP"],
+            COINS,
             index=1,
             label_visibility="collapsed",
             key="coin_select",
@@ -39,17 +74,40 @@ with st.sidebar:
         st.markdown("<div class='card-title'>&nbsp;&nbsp;Date Range</div>", unsafe_allow_html=True)
         days_label = st.selectbox(
             "range",
-            ["Last 30 Days", "Last 60 Days", "Last 90 Days", "Last 180 Days"],
+            list(DATE_RANGES),
             index=3,
             label_visibility="collapsed",
             key="date_range_select",
         )
-        days = {"Last 30 Days": 30, "Last 60 Days": 60, "Last 90 Days": 90, "Last 180 Days": 180}[days_label]
+        days = DATE_RANGES[days_label]
+
+    # Card: candle interval
+    with st.container():
+        st.markdown("<div class='card-title'>&nbsp;&nbsp;Candle Interval</div>", unsafe_allow_html=True)
+        interval_label = st.selectbox(
+            "interval",
+            list(INTERVALS),
+            index=0,
+            label_visibility="collapsed",
+            key="interval_select",
+        )
+        interval = INTERVALS[interval_label]
 
     # Card: toggle
     with st.container():
         st.markdown("<div class='card-title toggle-row'>Show Indicators <span></span></div>", unsafe_allow_html=True)
         show_ind = st.toggle(" ", value=True, label_visibility="collapsed", key="show_ind_toggle")
+
+    # Card: live prices (only the KPI row / last candle rerun, every LIVE_SECONDS)
+    with st.container():
+        st.markdown("<div class='card-title toggle-row'>Live Prices <span></span></div>", unsafe_allow_html=True)
+        live = st.toggle(
+            "  ",
+            value=False,
+            label_visibility="collapsed",
+            key="live_toggle",
+            help=f"Refresh the latest price every {LIVE_SECONDS:g}s from Kraken's ticker",
+        )
     
     with st.container():
         st.markdown(
@@ -64,22 +122,36 @@ with st.sidebar:
             unsafe_allow_html=True
         )
 
-    prewarm_prediction_for_coin(coin)
+    prewarm_all_predictions(COINS)
 
 
 # ---------- Tabs ----------
-tab_overview, tab_ohlc, tab_pred, tab_students = st.tabs(
-    ["Overview", "OHLC + Indicators", "Predictions", "Team"]
-)
-
-with tab_overview:
-    render_overview(coin=coin, days=days)
+# Lazy by default: a tab-styled radio picks ONE view and only that view loads
+# data / builds figures. st.tabs renders every tab on each rerun, so keep it as
+# an opt-in (CRYPTO_INSIGHT_EAGER_TABS=1 or ?tabs=eager).
+views = {
+    "Overview": lambda: render_overview(coin=coin, days=days, interval=interval, live=live),
+    "OHLC + Indicators": lambda: render_ohlc(coin=coin, days=days, show_ind=show_ind, interval=interval, live=live),
+    "Predictions": lambda: render_predictions(coin=coin, days=days),
+    "Team": render_team,
+}
 
-with tab_ohlc:
-    render_ohlc(coin=coin, days=days, show_ind=show_ind)
-
-with tab_pred:
-    render_predictions(coin=coin, days=days)
-
-with tab_students:
-    render_team()
+try:
+    if EAGER_TABS or st.query_params.get("tabs") == "eager":
+        for tab, render_view in zip(st.tabs(list(views)), views.values()):
+            with tab:
+                render_view()
+    else:
+        active_view = st.radio(
+            VIEW_SWITCHER_LABEL,
+            list(views),
+            horizontal=True,
+            label_visibility="collapsed",
+            key="active_view",
+        )
+        views[active_view]()
+finally:
+    # st.stop() inside a view raises through here, so the trace is closed either way
+    trace = end_rerun()
+    if DEBUG:
+        render_debug(trace)
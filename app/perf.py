@@ -0,0 +1,146 @@
+# app/perf.py
+from __future__ import annotations
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Callable, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+# Append every rerun's trace here as JSON lines (unset = no file output)
+PERF_LOG = os.environ.get("CRYPTO_INSIGHT_PERF_LOG")
+
+
+@dataclass
+class Span:
+    name: str
+    start: float      # seconds since the rerun started (or epoch for background work)
+    duration: float   # seconds
+    thread: str
+
+
+@dataclass
+class RerunTrace:
+    rerun_id: str
+    started_at: float
+    duration: float | None = None
+    spans: list[Span] = field(default_factory=list)
+    counters: Counter = field(default_factory=Counter)
+    profile: str | None = None
+
+    def to_json_lines(self) -> str:
+        summary = {
+            "type": "rerun",
+            "rerun_id": self.rerun_id,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "counters": dict(self.counters),
+        }
+        lines = [json.dumps(summary)]
+        lines += [json.dumps({"type": "span", "rerun_id": self.rerun_id, **asdict(s)}) for s in self.spans]
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide aggregates (every thread, including background refreshers)
+_TOTALS: dict[str, list[float]] = {}   # name -> [count, total_seconds, max_seconds]
+_COUNTERS: Counter = Counter()
+_LOCK = threading.Lock()
+_local = threading.local()
+
+
+def begin_rerun(profile: bool = False) -> RerunTrace:
+    """Start collecting spans/counters for the script run on this thread."""
+    trace = RerunTrace(rerun_id=uuid.uuid4().hex[:12], started_at=time.time())
+    _local.trace = trace
+    _local.t0 = time.perf_counter()
+    _local.profiler = None
+    if profile:
+        _local.profiler = cProfile.Profile()
+        _local.profiler.enable()
+    return trace
+
+
+def end_rerun() -> RerunTrace | None:
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return None
+    trace.duration = time.perf_counter() - _local.t0
+    profiler = getattr(_local, "profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(30)
+        trace.profile = out.getvalue()
+    _local.trace = None
+    _local.profiler = None
+
+    if PERF_LOG:
+        try:
+            with open(PERF_LOG, "a", encoding="utf-8") as fh:
+                fh.write(trace.to_json_lines())
+        except OSError:
+            pass
+    return trace
+
+
+@contextmanager
+def span(name: str):
+    """Time a block; recorded on this thread's rerun (if any) and in process totals."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        with _LOCK:
+            totals = _TOTALS.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += duration
+            totals[2] = max(totals[2], duration)
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace.spans.append(Span(name, start - _local.t0, duration, threading.current_thread().name))
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of span()."""
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def count(name: str, n: int = 1) -> None:
+    """Bump a counter (e.g. "ohlc.cache.hit") for this rerun and process-wide."""
+    with _LOCK:
+        _COUNTERS[name] += n
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.counters[name] += n
+
+
+def rerun_count(name: str) -> int:
+    """Current value of a counter on this thread's rerun (0 outside a rerun)."""
+    trace = getattr(_local, "trace", None)
+    return trace.counters[name] if trace is not None else 0
+
+
+def process_totals() -> tuple[dict[str, dict[str, float]], dict[str, int]]:
+    """(per-span count/total/mean/max, counters) since process start."""
+    with _LOCK:
+        spans = {
+            name: {"count": c, "total": t, "mean": t / c if c else 0.0, "max": m}
+            for name, (c, t, m) in _TOTALS.items()
+        }
+        return spans, dict(_COUNTERS)
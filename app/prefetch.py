@@ -0,0 +1,122 @@
+# app/prefetch.py
+from __future__ import annotations
+import logging
+import os
+import threading
+import time
+
+import streamlit as st
+
+from candles import next_close
+from candles import CandleSeries
+from data import (
+    DAILY,
+    OPEN_CANDLE_TTL,
+    fetch_ohlc_series,
+    fetch_open_candle,
+    publish_candle_series,
+    publish_ohlc_series,
+)
+from fanout import run_concurrently
+from student_api import (
+    COIN_TO_ENDPOINT,
+    PredictionError,
+    build_http_session,
+    import_student_module,
+    publish_prediction,
+    request_prediction,
+)
+
+log = logging.getLogger(__name__)
+
+# How often the full series is re-fetched (store and cursor included). In between,
+# only the open candle is refreshed, every data.OPEN_CANDLE_TTL seconds, so renders
+# keep reading snapshots; the loop also wakes right after every daily close, when
+# closed candles change and predictions roll over.
+REFRESH_SECONDS = int(os.environ.get("CRYPTO_INSIGHT_PREFETCH_SECONDS", 60 * 5))
+PREFETCH_ENABLED = os.environ.get("CRYPTO_INSIGHT_PREFETCH", "1") != "0"
+
+
+class Prefetcher:
+    """
+    Daemon thread that keeps OHLC and predictions for every coin hot.
+
+    Renders read the snapshots it publishes (data.load_ohlc_series and
+    student_api.cached_prediction), so page latency no longer depends on Kraken
+    or Render whenever the thread is keeping up.
+    """
+
+    def __init__(self, coins: tuple[str, ...], interval: float = REFRESH_SECONDS):
+        self.coins = coins
+        self.interval = interval
+        self.last_run: float | None = None
+        self.last_errors: dict[str, str] = {}
+        # coin -> daily candle date of the last published prediction
+        self._predicted: dict[str, tuple] = {}
+        # coin -> (last published series, when its closed candles were fetched)
+        self._snapshots: dict[str, tuple[CandleSeries, float]] = {}
+        self._session = build_http_session()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="crypto-prefetch", daemon=True)
+
+    def start(self) -> "Prefetcher":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def refresh_once(self) -> None:
+        """Refresh every coin in parallel (OHLC, then its prediction, per coin)."""
+        _, errors = run_concurrently({coin: (lambda c=coin: self._refresh_coin(c)) for coin in self.coins})
+        self.last_errors = {coin: str(e) for coin, e in errors.items()}
+        self.last_run = time.time()
+
+    def _refresh_coin(self, coin: str) -> None:
+        now = time.time()
+        snapshot = self._snapshots.get(coin)
+        if snapshot is not None and now - snapshot[1] < self.interval and now < next_close(DAILY, snapshot[1]):
+            # Closed candles are unchanged: one small request for the open candle
+            series = publish_candle_series(coin, fetch_open_candle(coin, DAILY, snapshot[0]))
+            self._snapshots[coin] = (series, snapshot[1])
+        else:
+            try:
+                df = fetch_ohlc_series(coin)
+            except Exception as e:
+                raise RuntimeError(f"ohlc: {e}") from e
+            series = publish_ohlc_series(coin, df)
+            self._snapshots[coin] = (series, now)
+
+        endpoint_suffix = COIN_TO_ENDPOINT.get(coin)
+        if not endpoint_suffix or not len(series):
+            return
+        # Same key and input as the Predictions tab: one prediction per daily
+        # candle, from the live price when it is first made.
+        candle_date = series.dates[-1]
+        if self._predicted.get(coin) == candle_date:
+            return
+        try:
+            module = import_student_module(coin)
+            pred = request_prediction(self._session, module, endpoint_suffix, float(series.close[-1]))
+            publish_prediction(coin, candle_date, pred)
+        except PredictionError as e:
+            raise RuntimeError(f"prediction: {e}") from e
+        self._predicted[coin] = candle_date
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh_once()
+            except Exception:
+                log.exception("Background refresh failed")
+            # +1s so the candle that just closed is on Kraken when we ask
+            self._stop.wait(min(OPEN_CANDLE_TTL, self.interval, next_close(DAILY) - time.time() + 1))
+
+
+@st.cache_resource(show_spinner=False)
+def start_prefetcher(coins: tuple[str, ...]) -> Prefetcher:
+    """Start the process-wide refresher exactly once (shared by all sessions)."""
+    return Prefetcher(coins).start()
@@ -0,0 +1,138 @@
+# app/pyramid.py
+from __future__ import annotations
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from candles import CandleSeries
+
+HOURLY = 60
+FOUR_HOURLY = 240
+DAILY = 1440
+WEEKLY = 7 * DAILY
+MONTHLY = 30 * DAILY  # nominal length; monthly candles follow calendar months
+
+# Coarser levels a base interval is aggregated into (those longer than it)
+PERIODS = (HOURLY, FOUR_HOURLY, DAILY, WEEKLY, MONTHLY)
+LEVEL_LABELS = {HOURLY: "Hourly", FOUR_HOURLY: "4-hour", DAILY: "Daily", WEEKLY: "Weekly", MONTHLY: "Monthly"}
+
+_DAY_S = 86400
+# 1970-01-01 was a Thursday; weeks start on Monday (ISO), like most charting tools
+_MONDAY_OFFSET_S = 4 * _DAY_S
+
+
+@dataclass(frozen=True)
+class Level:
+    """One resolution of a coin's history: candles plus, per candle, the index of its last base candle."""
+    period: int             # candle length in minutes (nominal for MONTHLY)
+    candles: CandleSeries
+    last: np.ndarray        # int64 base indices, ascending
+
+    def __len__(self) -> int:
+        return len(self.candles)
+
+    def since(self, base_index: int) -> Level:
+        """Candles that contain base candles from `base_index` on (the first may start earlier)."""
+        i = int(np.searchsorted(self.last, base_index, side="left"))
+        return Level(self.period, self.candles[i:], self.last[i:])
+
+
+def bucket_keys(time: np.ndarray, period: int) -> np.ndarray:
+    """Bucket number of each epoch-seconds timestamp (UTC hours/days, Monday weeks, calendar months)."""
+    if period == MONTHLY:
+        return time.view("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+    if period == WEEKLY:
+        return (time - _MONDAY_OFFSET_S) // (7 * _DAY_S)
+    return time // (period * 60)
+
+
+def bucket_starts(keys: np.ndarray, period: int) -> np.ndarray:
+    """Epoch seconds at which each bucket of bucket_keys() begins."""
+    if period == MONTHLY:
+        return keys.astype("datetime64[M]").astype("datetime64[s]").astype(np.int64)
+    if period == WEEKLY:
+        return keys * (7 * _DAY_S) + _MONDAY_OFFSET_S
+    return keys * (period * 60)
+
+
+def aggregate(series: CandleSeries, period: int, offset: int = 0) -> Level:
+    """
+    Merge `series` into `period` candles: open = first, high = max, low = min,
+    close = last, volume = sum; each candle is dated at its bucket start.
+    `offset` is added to the returned base indices.
+    """
+    if not len(series):
+        return Level(period, CandleSeries.empty(series.values.dtype), np.empty(0, dtype=np.int64))
+    keys = bucket_keys(series.time, period)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+
+    o, h, l, c, v = series.values
+    values = np.empty((5, len(starts)), dtype=series.values.dtype)
+    values[0] = o[starts]
+    values[1] = np.maximum.reduceat(h, starts)
+    values[2] = np.minimum.reduceat(l, starts)
+    values[3] = c[ends]
+    values[4] = np.add.reduceat(v, starts)
+    return Level(period, CandleSeries(bucket_starts(keys[starts], period), values), ends + offset)
+
+
+class CandlePyramid:
+    """
+    Coarser resolutions of one coin's base series: hourly → 4-hour → daily →
+    weekly → monthly, from the first one longer than the base interval.
+
+    `sync` is called with the base series on every render. Levels are rebuilt
+    only from the bucket holding the last candle both series share, so a new
+    or revised candle costs one bucket's worth of work per level; if the
+    history no longer lines up (backfill, gap) the pyramid rebuilds.
+    """
+
+    def __init__(self, interval: int):
+        self.interval = interval
+        self.periods = tuple(p for p in PERIODS if p > interval)
+        self._lock = threading.Lock()
+        self._base: CandleSeries | None = None
+        self._levels: dict[int, Level] = {}
+
+    def sync(self, base: CandleSeries) -> list[Level]:
+        """The base level followed by every coarser level, finest first."""
+        with self._lock:
+            if base is not self._base:
+                shared = self._shared_length(base)
+                self._levels = {p: self._extend(self._levels.get(p), base, p, shared) for p in self.periods}
+                self._base = base
+            levels = [self._levels[p] for p in self.periods]
+        return [Level(self.interval, base, np.arange(len(base)))] + levels
+
+    def window(self, base: CandleSeries, n_base: int, budget: int) -> Level:
+        """
+        The finest level that shows the newest `n_base` base candles in at most
+        `budget` candles (the coarsest level if none does).
+        """
+        start = max(0, len(base) - n_base)
+        for level in self.sync(base):
+            view = level.since(start)
+            if len(view) <= budget:
+                return view
+        return view
+
+    # --- internals ---
+    def _shared_length(self, base: CandleSeries) -> int:
+        prev = self._base
+        if prev is None or not len(prev) or not len(base) or prev.time[0] != base.time[0]:
+            return 0
+        k = min(len(prev), len(base))
+        return k if prev.time[k - 1] == base.time[k - 1] else 0
+
+    @staticmethod
+    def _extend(prev: Level | None, base: CandleSeries, period: int, shared: int) -> Level:
+        if prev is None or shared == 0:
+            return aggregate(base, period)
+        # Keep the buckets that end before the last shared candle; redo the rest
+        j = int(np.searchsorted(prev.last, shared - 1, side="left"))
+        start = int(prev.last[j - 1]) + 1 if j else 0
+        tail = aggregate(base[start:], period, offset=start)
+        candles = prev.candles[:j].merge(tail.candles)
+        return Level(period, candles, np.concatenate([prev.last[:j], tail.last]))
@@ -0,0 +1,53 @@
+# app/ratelimit.py
+from __future__ import annotations
+import threading
+import time
+
+
+class RateLimitTimeout(TimeoutError):
+    """No token became available within the caller's timeout."""
+
+
+class TokenBucket:
+    """
+    Process-wide token bucket: `rate` calls per second on average, bursts of
+    up to `capacity`. acquire() blocks (queues) instead of failing, and
+    pause() holds every caller back after the upstream answered "too many
+    requests".
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float | None = None) -> float:
+        """Take one token, waiting as long as needed; returns the seconds spent waiting."""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now > self._updated:  # no refill while paused
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - start
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"no rate-limit token within {timeout:.1f}s")
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Block all callers for `seconds` and drop the saved-up burst."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._updated = self._paused_until
+            self._tokens = 0.0
@@ -0,0 +1,183 @@
+# app/resilience.py
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"        # calls flow normally
+OPEN = "open"            # endpoint known down: fail fast until reset_timeout passes
+HALF_OPEN = "half-open"  # one trial call decides whether to close or re-open
+
+FAILURE_THRESHOLD = int(os.environ.get("CRYPTO_INSIGHT_BREAKER_FAILURES", 3))
+RESET_TIMEOUT = float(os.environ.get("CRYPTO_INSIGHT_BREAKER_RESET_SECONDS", 30))
+HEDGE_ENABLED = os.environ.get("CRYPTO_INSIGHT_HEDGE", "0") == "1"
+DEFAULT_HEDGE_DELAY = 2.0   # used until an endpoint has enough latency samples
+MIN_SAMPLES = 10
+
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="crypto-hedge")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose breaker is open."""
+
+
+class BudgetExceededError(TimeoutError):
+    """The call did not finish within the caller's latency budget."""
+
+
+class CircuitBreaker:
+    """Per-endpoint closed / open / half-open breaker."""
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._trial_running = False
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        with self._lock:
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def release(self) -> None:
+        """An allowed call was never made (e.g. still queued): the next one may be the half-open trial."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one endpoint."""
+
+    def __init__(self, window: int = 100):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self, default: float = DEFAULT_HEDGE_DELAY) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < MIN_SAMPLES:
+            return default
+        return samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_LATENCY: dict[str, LatencyTracker] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def breaker_for(endpoint: str) -> CircuitBreaker:
+    with _REGISTRY_LOCK:
+        return _BREAKERS.setdefault(endpoint, CircuitBreaker())
+
+
+def latency_for(endpoint: str) -> LatencyTracker:
+    with _REGISTRY_LOCK:
+        return _LATENCY.setdefault(endpoint, LatencyTracker())
+
+
+def guarded_call(
+    endpoint: str,
+    fn: Callable[[], T],
+    budget: float | None = None,
+    hedge: bool = HEDGE_ENABLED,
+) -> T:
+    """
+    Call `fn` for `endpoint` behind its circuit breaker.
+
+    - open breaker: CircuitOpenError immediately, no network call
+    - hedge: if the first attempt is still running after the endpoint's p95
+      latency, a second identical attempt races it; the first success wins
+    - budget: give up (BudgetExceededError) after `budget` seconds even if the
+      underlying request and its retries are still running
+
+    The budget, hedge delay and latency samples count from when the first
+    attempt starts running, not from when it was queued: waiting for a free
+    pool worker is not the endpoint's fault. A call still queued after
+    `budget` seconds is dropped without counting against the breaker.
+    """
+    breaker = breaker_for(endpoint)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{endpoint} is unavailable; retrying in {breaker.retry_in():.0f}s")
+
+    tracker = latency_for(endpoint)
+    started = threading.Event()
+    began: list[float] = []
+
+    def attempt() -> T:
+        if not started.is_set():
+            began.append(time.monotonic())
+            started.set()
+        return fn()
+
+    attempts = [_POOL.submit(attempt)]
+    if not started.wait(timeout=budget) and attempts[0].cancel():
+        breaker.release()
+        raise BudgetExceededError(f"{endpoint} was not called: no worker free within {budget:.1f}s")
+    started.wait()  # (it began just as the wait timed out)
+    start = began[0]
+    deadline = None if budget is None else start + budget
+
+    def remaining() -> float | None:
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    if hedge:
+        hedge_delay = tracker.p95()
+        delay = hedge_delay if deadline is None else min(hedge_delay, remaining())
+        done, _ = wait(attempts, timeout=delay)
+        if not done and (deadline is None or remaining() > 0):
+            attempts.append(_POOL.submit(attempt))
+
+    error: BaseException | None = None
+    pending = set(attempts)
+    while pending:
+        done, pending = wait(pending, timeout=remaining(), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for fut in done:
+            if fut.exception() is None:
+                tracker.observe(time.monotonic() - start)
+                breaker.record_success()
+                return fut.result()
+            error = fut.exception()
+
+    breaker.record_failure()
+    if error is not None and not pending:
+        raise error
+    raise BudgetExceededError(f"{endpoint} did not respond within {budget:.1f}s")
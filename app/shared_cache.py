@@ -0,0 +1,235 @@
+# app/shared_cache.py
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from caching import SingleFlight
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks fall back to in-process only
+    fcntl = None
+
+log = logging.getLogger(__name__)
+T = TypeVar("T")
+
+# The in-process caches are per process; this store sits behind them so every worker on a
+# host shares one fetched copy of OHLC series, health checks and predictions.
+#   CRYPTO_INSIGHT_SHARED_CACHE=sqlite  (default) one SQLite file under the data dir
+#   CRYPTO_INSIGHT_SHARED_CACHE=memory  process-local, i.e. no sharing
+BACKEND = os.environ.get("CRYPTO_INSIGHT_SHARED_CACHE", "sqlite")
+CACHE_DIR = Path(os.environ.get("CRYPTO_INSIGHT_DATA_DIR", Path(__file__).resolve().parent / ".data"))
+# A worker waits this long for another one's in-flight fetch before fetching itself.
+LOCK_TIMEOUT = 30.0
+# Keys hash onto this many lock files, so the lock directory stays a fixed size.
+LOCK_STRIPES = 64
+
+_MISSING = object()
+# In-process callers missing the same key share one load (and its error)
+_FLIGHTS = SingleFlight()
+
+
+class MemoryBackend:
+    """Process-local dict; the reference backend (and what tests use)."""
+
+    def __init__(self):
+        self._entries: dict[str, tuple[Any, float]] = {}
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            value, expires_at = self._entries.get(key, (_MISSING, 0.0))
+        return value if time.time() < expires_at else _MISSING
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @contextmanager
+    def lock(self, key: str, timeout: float = LOCK_TIMEOUT) -> Iterator[None]:
+        lock = self._locks[_stripe(key)]
+        acquired = lock.acquire(timeout=timeout)
+        try:
+            yield
+        finally:
+            if acquired:
+                lock.release()
+
+
+class SQLiteBackend:
+    """
+    Pickled values with an expiry in one SQLite file (WAL, so readers never
+    block the writer). Per-key flock files make sure only one process fetches
+    a missing key while the others wait for its result (keys share
+    LOCK_STRIPES lock files).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_dir = self.path.parent / "locks"
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        # Switching to WAL needs an exclusive lock, so workers starting together take turns.
+        with open(self.lock_dir / "init.lock", "a+b") as fh:
+            acquired = _flock(fh, LOCK_TIMEOUT)
+            try:
+                conn = self._conn()
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+                )
+            finally:
+                if acquired:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any:
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return _MISSING if row is None else pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, blob, time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    def delete_prefix(self, prefix: str) -> None:
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        self._conn().execute("DELETE FROM cache WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",))
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM cache")
+
+    @contextmanager
+    def lock(self, key: str, timeout: float = LOCK_TIMEOUT) -> Iterator[None]:
+        with open(self.lock_dir / f"{_stripe(key):02d}.lock", "a+b") as fh:
+            acquired = _flock(fh, timeout)
+            try:
+                yield
+            finally:
+                if acquired:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _stripe(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=4).digest(), "big") % LOCK_STRIPES
+
+
+def _flock(fh, timeout: float) -> bool:
+    if fcntl is None:
+        return False
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                return False  # holder is stuck: fetch ourselves rather than hang the page
+            time.sleep(0.05)
+
+
+_BACKEND: MemoryBackend | SQLiteBackend | None = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def backend() -> MemoryBackend | SQLiteBackend:
+    """The process's backend, created on first use (falls back to memory if the file can't be opened)."""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is None:
+            _BACKEND = MemoryBackend()
+            if BACKEND == "sqlite":
+                try:
+                    _BACKEND = SQLiteBackend(CACHE_DIR / "shared_cache.sqlite3")
+                except (OSError, sqlite3.Error) as e:
+                    log.warning("Shared cache unavailable, using a per-process one: %s", e)
+        return _BACKEND
+
+
+def get_or_load(key: str, loader: Callable[[], T], ttl: float, wait: float | None = None) -> T:
+    """
+    Value for `key` from the shared store, or `loader()` stored there for `ttl` seconds.
+
+    Concurrent misses for the same key run `loader` once: threads of this
+    process join the in-flight call, other processes wait on the key's lock
+    (at most `wait` seconds, default LOCK_TIMEOUT) and then read the stored
+    result. Store errors only cost the sharing, never the value.
+    """
+    store = backend()
+    value = _safe_get(store, key)
+    if value is not _MISSING:
+        return value
+
+    def load() -> T:
+        with store.lock(key, LOCK_TIMEOUT if wait is None else wait):
+            value = _safe_get(store, key)
+            if value is not _MISSING:
+                return value
+            value = loader()
+            put(key, value, ttl)
+            return value
+
+    return _FLIGHTS.do(key, load)
+
+
+def get(key: str, default: Any = None) -> Any:
+    value = _safe_get(backend(), key)
+    return default if value is _MISSING else value
+
+
+def put(key: str, value: Any, ttl: float) -> None:
+    try:
+        backend().set(key, value, ttl)
+    except (OSError, sqlite3.Error, pickle.PicklingError) as e:
+        log.warning("Shared cache write failed for %s: %s", key, e)
+
+
+def invalidate(prefix: str) -> None:
+    """Drop every key starting with `prefix`, for all workers."""
+    try:
+        backend().delete_prefix(prefix)
+    except (OSError, sqlite3.Error) as e:
+        log.warning("Shared cache invalidation failed for %s: %s", prefix, e)
+
+
+def _safe_get(store, key: str) -> Any:
+    try:
+        return store.get(key)
+    except (OSError, sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError) as e:
+        log.warning("Shared cache read failed for %s: %s", key, e)
+        return _MISSING
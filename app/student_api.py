@@ -0,0 +1,329 @@
+# app/student_api.py
+from __future__ import annotations
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import shared_cache
+from caching import SingleFlight, SWRCache
+from candles import next_close
+from data import DAILY
+from perf import count, span, timed
+from resilience import BudgetExceededError, CircuitOpenError, guarded_call
+
+# --- ensure repo root is importable (students/ is outside app/) ---
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Map sidebar coin -> students module path
+COIN_TO_MODULE = {
+    "BTC": "students.Dylan",
+    "ETH": "students.Kittituch",
+    "SOL": "students.Shawya",
+    "XRP": "students.Ratticha",
+}
+
+# Map coin -> exact endpoint suffix (case-sensitive as per your APIs)
+COIN_TO_ENDPOINT = {
+    "BTC": "bitcoin",
+    "ETH": "ETHUSD",
+    "SOL": "SOLUSD",
+    "XRP": "xrp",
+}
+
+PREDICTION_KEYS = ["bitcoin_predicted_next_day_high", "predicted_next_day_high"]
+
+# Kept connections per host; must cover the widest fan-out (see sweep.SWEEP_CONCURRENCY)
+HTTP_POOL_SIZE = int(os.environ.get("CRYPTO_INSIGHT_HTTP_POOL", 16))
+
+# How long a successful health check is trusted by every worker on the host
+HEALTH_TTL = 60 * 30
+# Sessions whose health-check cache expired together share one probe per API
+_HEALTH_FLIGHTS = SingleFlight()
+
+
+class PredictionError(RuntimeError):
+    """Student API call failed or returned something we can't use."""
+
+
+# -----------------------------
+# Plain (Streamlit-free) helpers, safe to call from background threads
+# -----------------------------
+def build_http_session() -> requests.Session:
+    """HTTP session with retries, shared by the UI and the background refresher."""
+    s = requests.Session()
+    s.headers.update({"User-Agent": "CryptoInsight/1.0"})
+
+    retry = Retry(
+        total=2,
+        backoff_factor=0.6,  # 0.6s, 1.2s ...
+        status_forcelist=[408, 429, 500, 502, 503, 504, 522, 524],
+        allowed_methods=["GET", "POST"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=HTTP_POOL_SIZE)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def import_student_module(coin: str):
+    mod_path = COIN_TO_MODULE.get(coin)
+    if not mod_path:
+        raise PredictionError(f"No student module mapped for coin '{coin}'.")
+    try:
+        return importlib.import_module(mod_path)
+    except Exception as e:
+        raise PredictionError(f"Failed to import {mod_path}: {e}") from e
+
+
+def api_base(api_url: str) -> str:
+    base = api_url.rstrip("/")
+    if base.lower().endswith("/predict"):
+        base = base[: -len("/predict")]
+    return base
+
+
+@timed("student_api.health")
+def check_health(session: requests.Session, api_url: str) -> bool:
+    """Try /health if it exists, else do a tiny predict probe (skipped while the breaker is open)."""
+    base = api_url.rstrip("/")
+    shared_key = f"health/{api_base(base)}"
+    if shared_cache.get(shared_key):
+        return True
+
+    def probe() -> bool:
+        try:
+            r = session.get(f"{base}/health", timeout=3)
+            if r.ok:
+                return True
+        except Exception:
+            pass
+
+        fallback_coin = next(iter(COIN_TO_ENDPOINT.values()))
+        url = f"{base}/predict/{fallback_coin}"
+        r = session.get(url, params={"price": 1.0}, timeout=5)
+        r.raise_for_status()
+        return True
+
+    try:
+        ok = _HEALTH_FLIGHTS.do(api_base(base), lambda: guarded_call(api_base(base), probe, hedge=False))
+    except Exception:
+        return False
+    # Only "up" is shared: a failed probe should be retried by the next worker.
+    shared_cache.put(shared_key, ok, ttl=HEALTH_TTL)
+    return ok
+
+
+def invalidate_health(api_url: str) -> None:
+    """Make the next check_health for this API probe it again."""
+    shared_cache.invalidate(f"health/{api_base(api_url)}")
+
+
+def request_prediction(
+    session: requests.Session,
+    module,
+    endpoint_suffix: str,
+    price: float,
+    budget: float | None = None,
+    hedge: bool | None = None,
+) -> dict:
+    """
+    Call student API and normalize the response to a unified dict
+    ({"predictedHigh", "modelName", "inputPrice"}, the price the model was given).
+
+    Goes through the endpoint's circuit breaker (fails fast while it is open),
+    optionally hedges slow calls, and gives up after `budget` seconds.
+    """
+    api_url = getattr(module, "API_URL", None)
+    if not api_url:
+        raise PredictionError(f"{module.__name__} has no API_URL defined.")
+
+    base = api_base(api_url)
+    url = f"{base}/predict/{endpoint_suffix}"
+    timeout = 10 if budget is None else max(0.5, min(10, budget))
+
+    def call() -> requests.Response:
+        res = session.get(url, params={"price": float(price)}, timeout=timeout)
+        res.raise_for_status()
+        return res
+
+    kwargs = {} if hedge is None else {"hedge": hedge}
+    try:
+        with span("student_api.predict"):
+            res = guarded_call(base, call, budget=budget, **kwargs)
+    except CircuitOpenError as e:
+        raise PredictionError(f"Model API temporarily unavailable: {e}") from e
+    except BudgetExceededError as e:
+        raise PredictionError(f"Model API too slow: {e}") from e
+    except Exception as e:
+        raise PredictionError(f"Error calling API {url}: {e}") from e
+
+    raw = _json(res, url)
+    # optional model name
+    model_name = getattr(module, "MODEL_NAME", "Unknown")
+
+    return {"predictedHigh": _predicted_high(raw), "modelName": model_name, "inputPrice": float(price)}
+
+
+def fetch_predicted_high(
+    session: requests.Session, module, endpoint_suffix: str, price: float, timeout: float = 10
+) -> float:
+    """
+    One plain single-price call, made on the caller's thread: no circuit breaker,
+    hedging or shared pool. For callers that bound their own calls (sweep.py).
+    """
+    api_url = getattr(module, "API_URL", None)
+    if not api_url:
+        raise PredictionError(f"{module.__name__} has no API_URL defined.")
+
+    url = f"{api_base(api_url)}/predict/{endpoint_suffix}"
+    try:
+        res = session.get(url, params={"price": float(price)}, timeout=timeout)
+        res.raise_for_status()
+    except Exception as e:
+        raise PredictionError(f"Error calling API {url}: {e}") from e
+    return _predicted_high(_json(res, url))
+
+
+def request_predictions(
+    session: requests.Session,
+    module,
+    endpoint_suffix: str,
+    prices: list[float],
+    budget: float | None = None,
+) -> list[float]:
+    """
+    Predicted highs for several prices in one call, for APIs whose module sets
+    BATCH_PREDICT = True: POST {base}/predict/{suffix}/batch {"prices": [...]}
+    answered by {"predictions": [...]}, one single-call response (or bare number)
+    per price, in order.
+    """
+    api_url = getattr(module, "API_URL", None)
+    if not api_url:
+        raise PredictionError(f"{module.__name__} has no API_URL defined.")
+
+    base = api_base(api_url)
+    url = f"{base}/predict/{endpoint_suffix}/batch"
+    timeout = 30 if budget is None else max(0.5, min(30, budget))
+
+    def call() -> requests.Response:
+        res = session.post(url, json={"prices": [float(p) for p in prices]}, timeout=timeout)
+        res.raise_for_status()
+        return res
+
+    try:
+        with span("student_api.predict_batch"):
+            res = guarded_call(base, call, budget=budget, hedge=False)
+    except CircuitOpenError as e:
+        raise PredictionError(f"Model API temporarily unavailable: {e}") from e
+    except BudgetExceededError as e:
+        raise PredictionError(f"Model API too slow: {e}") from e
+    except Exception as e:
+        raise PredictionError(f"Error calling API {url}: {e}") from e
+
+    items = _json(res, url).get("predictions")
+    if not isinstance(items, list) or len(items) != len(prices):
+        raise PredictionError(f"Expected {len(prices)} predictions from {url}. Got: {str(items)[:300]}")
+    return [_predicted_high(item if isinstance(item, dict) else {PREDICTION_KEYS[-1]: item}) for item in items]
+
+
+def _json(res: requests.Response, url: str):
+    try:
+        return res.json()
+    except Exception as e:
+        raise PredictionError(f"API {url} did not return valid JSON. Got: {res.text[:300]}") from e
+
+
+def _predicted_high(raw: dict) -> float:
+    # handle nested prediction key
+    data = raw.get("prediction", raw)
+
+    # try to extract only from these keys
+    pred_val = None
+    for key in PREDICTION_KEYS:
+        if key in data:
+            pred_val = data[key]
+            break
+
+    if pred_val is None:
+        raise PredictionError(f"Expected keys not found. Got: {data}")
+
+    try:
+        return float(pred_val)
+    except Exception as e:
+        raise PredictionError(f"Value under key is not numeric: {pred_val}") from e
+
+
+# -----------------------------
+# Prediction cache: keyed by (coin, daily candle date), stale-while-revalidate.
+# The model gets the live price; the first prediction of a daily candle is kept
+# until that candle closes (UTC midnight), then the key and the cache roll over.
+# A prediction carries its inputPrice, so it is shown next to the price it was made from.
+# -----------------------------
+def prediction_expiry(stored_at: float) -> float:
+    return next_close(DAILY, stored_at)
+
+
+PREDICTION_CACHE = SWRCache(ttl=DAILY * 60, expires=prediction_expiry)
+
+
+def prediction_key(coin: str, candle_date) -> tuple:
+    return (coin, str(candle_date))
+
+
+def _shared_prediction_key(coin: str, candle_date) -> str:
+    return "prediction/" + "/".join(prediction_key(coin, candle_date))
+
+
+def publish_prediction(coin: str, candle_date, pred: dict) -> None:
+    """Store a prediction fetched elsewhere (e.g. by the background refresher)."""
+    PREDICTION_CACHE.put(prediction_key(coin, candle_date), pred, group=coin)
+    shared_cache.put(_shared_prediction_key(coin, candle_date), pred, ttl=until_rollover())
+
+
+def cached_prediction(
+    session: requests.Session, coin: str, candle_date, price: float, budget: float | None = None
+) -> tuple[dict, str]:
+    """
+    Prediction for this coin's daily candle as (pred, state), state being one of
+    caching.FRESH / STALE / FALLBACK; on a miss the model is asked about `price`.
+    Raises PredictionError only when the API fails and no earlier prediction
+    for the coin exists.
+    """
+    module = import_student_module(coin)
+    endpoint_suffix = COIN_TO_ENDPOINT.get(coin)
+    if not endpoint_suffix:
+        raise PredictionError(f"No endpoint suffix mapped for coin '{coin}'.")
+
+    def load() -> dict:
+        # Shared across workers; a worker waits at most `budget` for another one's call.
+        return shared_cache.get_or_load(
+            _shared_prediction_key(coin, candle_date),
+            lambda: request_prediction(session, module, endpoint_suffix, price, budget=budget),
+            ttl=until_rollover(),
+            wait=budget,
+        )
+
+    pred, state = PREDICTION_CACHE.get(prediction_key(coin, candle_date), load, group=coin)
+    count(f"prediction.{state}")
+    return pred, state
+
+
+def until_rollover() -> float:
+    """Seconds until cached predictions roll over (the next daily close)."""
+    now = time.time()
+    return prediction_expiry(now) - now
+
+
+def invalidate_predictions(coin: str) -> None:
+    """Forget cached predictions for one coin only (other coins stay cached)."""
+    PREDICTION_CACHE.invalidate_group(coin)
+    shared_cache.invalidate(f"prediction/{coin}/")
@@ -0,0 +1,126 @@
+# app/sweep.py
+from __future__ import annotations
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+import requests
+
+import shared_cache
+from caching import SWRCache
+from data import DAILY
+from perf import count, timed
+from resilience import OPEN, breaker_for
+from student_api import (
+    COIN_TO_ENDPOINT,
+    PredictionError,
+    api_base,
+    fetch_predicted_high,
+    import_student_module,
+    prediction_expiry,
+    request_predictions,
+    until_rollover,
+)
+
+# What-if sweeps: the model's predicted high over a grid of hypothetical prices
+# around the last daily close (±SWEEP_SPAN in SWEEP_STEPS points).
+SWEEP_SPAN = 0.10
+SWEEP_STEPS = 50
+
+# One bounded pool per process for single-price sweep calls. The calls run on it
+# directly, not through resilience.guarded_call, so a sweep never queues OHLC
+# fetches, health probes or other endpoints' predictions behind it.
+# Keep it within student_api.HTTP_POOL_SIZE so every call reuses a connection.
+SWEEP_CONCURRENCY = int(os.environ.get("CRYPTO_INSIGHT_SWEEP_CONCURRENCY", 8))
+_POOL = ThreadPoolExecutor(max_workers=SWEEP_CONCURRENCY, thread_name_prefix="crypto-sweep")
+
+# Sweeps are keyed by their grid and, like predictions, roll over at the daily close
+SWEEP_CACHE = SWRCache(ttl=DAILY * 60, max_entries=32, expires=prediction_expiry)
+
+
+def sweep_grid(center: float, span: float = SWEEP_SPAN, steps: int = SWEEP_STEPS) -> np.ndarray:
+    """`steps` prices evenly spread over center·(1 ± span), both ends included."""
+    return np.round(float(center) * (1 + np.linspace(-span, span, steps)), 8)
+
+
+def sweep_key(coin: str, candle_date, center: float, span: float, steps: int) -> tuple:
+    return (coin, str(candle_date), round(float(center), 8), float(span), int(steps))
+
+
+@timed("student_api.sweep")
+def request_sweep(
+    session: requests.Session, module, endpoint_suffix: str, prices: np.ndarray, budget: float | None = None
+) -> np.ndarray:
+    """
+    Predicted high for every price: one batch call if the API has one, else
+    single-price calls SWEEP_CONCURRENCY at a time. All of them or PredictionError.
+    Single calls skip the endpoint's breaker, but none are sent while it is open.
+    """
+    if getattr(module, "BATCH_PREDICT", False):
+        return np.asarray(request_predictions(session, module, endpoint_suffix, list(prices), budget=budget))
+
+    api_url = getattr(module, "API_URL", None)
+    breaker = breaker_for(api_base(api_url)) if api_url else None
+    if breaker is not None and breaker.state == OPEN and breaker.retry_in() > 0:
+        raise PredictionError(f"Model API temporarily unavailable: {api_base(api_url)}")
+    deadline = None if budget is None else time.monotonic() + budget
+
+    def call(price: float) -> float:
+        # Calls queued behind others only get what is left of the budget
+        left = 10.0 if deadline is None else min(10.0, deadline - time.monotonic())
+        if left <= 0:
+            raise PredictionError("sweep budget used up")
+        return fetch_predicted_high(session, module, endpoint_suffix, price, timeout=max(0.5, left))
+
+    futures = [_POOL.submit(call, float(p)) for p in prices]
+    wait(futures, timeout=budget)
+    for fut in futures:
+        fut.cancel()  # still queued after the budget: don't send them
+    failed = [f for f in futures if not f.done() or f.cancelled() or f.exception() is not None]
+    if failed:
+        count("student_api.sweep.failed")
+        error = next((f.exception() for f in failed if f.done() and not f.cancelled()), None)
+        raise PredictionError(f"{len(failed)} of {len(prices)} sweep predictions failed: {error or 'too slow'}")
+    return np.array([f.result() for f in futures])
+
+
+def cached_sweep(
+    session: requests.Session,
+    coin: str,
+    candle_date,
+    center: float,
+    span: float = SWEEP_SPAN,
+    steps: int = SWEEP_STEPS,
+    budget: float | None = None,
+) -> tuple[dict, str]:
+    """
+    ({"prices", "predictedHigh", "modelName"}, state) for the grid around `center`,
+    state being one of caching.FRESH / STALE / FALLBACK (an earlier sweep of the coin).
+    Shared by every session and worker; raises PredictionError only with nothing to fall back to.
+    """
+    module = import_student_module(coin)
+    endpoint_suffix = COIN_TO_ENDPOINT.get(coin)
+    if not endpoint_suffix:
+        raise PredictionError(f"No endpoint suffix mapped for coin '{coin}'.")
+    key = sweep_key(coin, candle_date, center, span, steps)
+
+    def fetch() -> dict:
+        prices = sweep_grid(center, span, steps)
+        highs = request_sweep(session, module, endpoint_suffix, prices, budget=budget)
+        return {"prices": prices, "predictedHigh": highs, "modelName": getattr(module, "MODEL_NAME", "Unknown")}
+
+    def load() -> dict:
+        return shared_cache.get_or_load(
+            "sweep/" + "/".join(map(str, key)), fetch, ttl=until_rollover(), wait=budget
+        )
+
+    sweep, state = SWEEP_CACHE.get(key, load, group=coin)
+    count(f"sweep.{state}")
+    return sweep, state
+
+
+def invalidate_sweeps(coin: str) -> None:
+    """Forget cached sweeps for one coin only."""
+    SWEEP_CACHE.invalidate_group(coin)
+    shared_cache.invalidate(f"sweep/{coin}/")
@@ -0,0 +1,47 @@
+# app/tabs/debug.py
+import pandas as pd
+import streamlit as st
+
+from perf import RerunTrace, process_totals
+
+
+def render(trace: RerunTrace | None):
+    """Opt-in (?debug=1) sidebar panel: this rerun's stage timings, cache counters and export."""
+    if trace is None:
+        return
+    with st.sidebar.expander(f"⏱ Perf — {trace.duration * 1000:.0f} ms", expanded=False):
+        if trace.spans:
+            spans = pd.DataFrame(
+                {
+                    "stage": [s.name for s in trace.spans],
+                    "start ms": [round(s.start * 1000, 1) for s in trace.spans],
+                    "ms": [round(s.duration * 1000, 1) for s in trace.spans],
+                }
+            )
+            st.dataframe(spans, hide_index=True, use_container_width=True)
+        else:
+            st.caption("No instrumented stage ran on this rerun.")
+
+        if trace.counters:
+            st.markdown("**Cache counters**")
+            st.json(dict(sorted(trace.counters.items())), expanded=False)
+
+        totals, counters = process_totals()
+        if totals:
+            st.markdown("**Since process start**")
+            st.dataframe(
+                pd.DataFrame.from_dict(totals, orient="index").sort_values("total", ascending=False).round(4),
+                use_container_width=True,
+            )
+            st.json(counters, expanded=False)
+
+        st.download_button(
+            "Download trace (JSON lines)",
+            trace.to_json_lines(),
+            file_name=f"rerun-{trace.rerun_id}.jsonl",
+            mime="application/x-ndjson",
+            key="perf_trace_download",
+        )
+        if trace.profile:
+            st.markdown("**cProfile (top 30, cumulative)**")
+            st.code(trace.profile, language="text")
@@ -2,86 +2,90 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import streamlit as st
-from datetime import datetime
+import numpy as np
 
-from data import generate_ohlc_data, sma, rsi
+from data import DAILY, candle_pyramid, candles_for_days, indicator_engine, load_candle_series
+from downsample import candle_budget, ohlc_buckets
+from figures import cached_figure
+from indicators import batch_indicators
+from perf import span
+from pyramid import LEVEL_LABELS
+from ticker import LIVE_SECONDS, latest_tick, live_candle
 
-def render(coin: str, days: int, show_ind: bool):
-    st.subheader(f"OHLC + Indicators — {coin}")
-
-    # 1) Pull data WITH warm-up (generate_ohlc_data already fetches extra history)
-    df_full = generate_ohlc_data(coin, max(days, 60))   # function internally adds buffer for indicators
+# Optional extras, all computed by one vectorized batch_indicators() call
+EXTRA_INDICATORS = ["EMA(12/26)", "Bollinger(20, 2σ)", "MACD(12, 26, 9)"]
 
-    # 2) Drop a possibly-partial "today" candle (Kraken sometimes returns it)
-    if not df_full.empty and df_full["date"].iloc[-1].date() >= datetime.utcnow().date():
-        df_full = df_full.iloc[:-1]
+def render(coin: str, days: int, show_ind: bool, interval: int = DAILY, live: bool = False):
+    st.subheader(f"OHLC + Indicators — {coin}")
 
-    # 3) Compute indicators on the FULL series (uses warm-up), then slice to last N for display
-    df_full = df_full.sort_values("date").reset_index(drop=True)
+    extras = []
+    if show_ind:
+        extras = st.multiselect(
+            "Extra indicators",
+            EXTRA_INDICATORS,
+            default=[],
+            key="extra_indicators",
+            placeholder="Add EMA, Bollinger bands or MACD",
+        )
 
-    # SMAs (compute on full, then cut)
-    sma7_full  = sma(df_full["close"], 7)
-    sma20_full = sma(df_full["close"], 20)
+    # 1) Pull the coin's full shared series (warm-up for indicators comes for free);
+    #    it is sorted and every window below is a view of it, not a copy
+    series = load_candle_series(coin, interval)
+
+    # 2) Chart closed candles only (Kraken always returns the open one); live mode
+    #    draws the open candle separately from the ticker
+    recent = series.last(2).to_frame()
+    series = series.closed(interval)
+
+    # 3) Indicators from the per-coin incremental engine: only candles appended since
+    #    the last render are processed (same values as data.sma / data.rsi)
+    with span("indicators.engine"):
+        ind_full = indicator_engine(coin, interval).sync(series.dates, series.close)
+
+    # 4) Visible window (last N days) — no NaNs since we computed using warm-up.
+    #    Long ranges come from the coin's daily/weekly/monthly pyramid: the finest
+    #    level that fits the chart's candle budget. Indicators stay computed on the
+    #    base candles; an aggregated candle shows the value at its last base candle.
+    n_visible = candles_for_days(days, interval)
+    level = candle_pyramid(coin, interval).window(series, n_visible, candle_budget())
+    df = level.candles.to_frame()
+    ind = ind_full.iloc[level.last].reset_index(drop=True)
+    vis = df.assign(sma7=ind["sma7"], sma20=ind["sma20"], rsi14=ind["rsi14"])
+
+    # Extra indicators: one batched NumPy pass over the full series, then the visible candles
+    if extras:
+        with span("indicators.batch"):
+            batch = batch_indicators(
+                np.asarray(series.close, dtype=np.float64)[None, :],
+                ema_spans=(12, 26) if "EMA(12/26)" in extras else (),
+                macd=(12, 26, 9) if "MACD(12, 26, 9)" in extras else None,
+                bollinger_windows=(20,) if "Bollinger(20, 2σ)" in extras else (),
+            )
+        vis = vis.assign(**{name: values[0][level.last] for name, values in batch.items()})
 
-    # RSI (compute on full, EMA-style from data.py)
-    rsi_full = rsi(df_full["close"], 14)
+    # Safety net for histories longer than even the monthly level fits (high/low
+    # preserved); a no-op otherwise.
+    vis = ohlc_buckets(vis)
 
-    # 4) Visible window (last N days) — no NaNs since we computed using warm-up
-    df = df_full.tail(days).reset_index(drop=True)
-    sma7  = sma7_full.tail(days).reset_index(drop=True)
-    sma20 = sma20_full.tail(days).reset_index(drop=True)
-    rsi_vis = rsi_full.tail(days).reset_index(drop=True)
+    # Figures are memoized on the content of `vis` + options, so an unchanged
+    # rerun reuses the already-built figure objects.
 
     # =======================
     # TOP: Candles + Volume + SMAs
     # =======================
     with st.container(border=True):
         st.markdown("### Candlestick Chart + Moving Averages")
-
-        fig = go.Figure()
-
-        # Candles
-        fig.add_trace(go.Candlestick(
-            x=df["date"], open=df["open"], high=df["high"], low=df["low"], close=df["close"],
-            name="OHLC",
-            increasing_line_color="#00FFAA",
-            decreasing_line_color="#FF5C5C",
-        ))
-
-        # Volume (secondary axis)
-        fig.add_trace(go.Bar(
-            x=df["date"],
-            y=(df["volume"] / 1_000_000),
-            name="Volume (M)",
-            marker_color="#1E90FF",
-            opacity=0.3,
-            yaxis="y2",
-        ))
-
-        # SMAs
-        if show_ind:
-            fig.add_trace(go.Scatter(
-                x=df["date"], y=sma7, mode="lines", name="SMA(7)",
-                line=dict(width=2, color="#00BFFF")
-            ))
-            fig.add_trace(go.Scatter(
-                x=df["date"], y=sma20, mode="lines", name="SMA(20)",
-                line=dict(width=2, color="#00FFAA")
-            ))
-
-        fig.update_layout(
-            template="plotly_dark",
-            height=500,
-            margin=dict(t=50, b=30, l=30, r=30),
-            xaxis_rangeslider_visible=False,
-            xaxis=dict(title=None),
-            yaxis=dict(title="Price", side="right"),
-            yaxis2=dict(overlaying="y", side="left", showgrid=False, title="Volume (M)",
-                        range=[0, max(1.0, (df["volume"].max() / 1_000_000) * 3)]),
-            legend=dict(orientation="h", yanchor="bottom", y=-0.25, xanchor="center", x=0.5),
-            plot_bgcolor="#0E1117", paper_bgcolor="#0E1117",
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        if level.period != interval:
+            st.caption(f"{LEVEL_LABELS[level.period]} candles for this range")
+        fig = cached_figure("ohlc-candles", _candles_figure, vis, show_ind=show_ind)
+        # The live candle is drawn at the chart's resolution; weekly/monthly buckets are
+        # calendar-aligned rather than fixed-length, so those charts stay static
+        if live and level.period <= DAILY:
+            if level.period != interval:
+                recent = level.candles.last(2).to_frame()
+            _live_candles_chart(coin, fig, recent, level.period)
+        else:
+            st.plotly_chart(fig, use_container_width=True)
 
     # =======================
     # BOTTOM: RSI with bands
@@ -89,35 +93,161 @@ def render(coin: str, days: int, show_ind: bool):
     if show_ind:
         with st.container(border=True):
             st.markdown("### RSI (14)")
+            fig2 = cached_figure("ohlc-rsi", _rsi_figure, vis[["date", "rsi14"]])
+            st.plotly_chart(fig2, use_container_width=True)
 
-            rsi_df = pd.DataFrame({"date": df["date"], "rsi": rsi_vis})
-
-            fig2 = go.Figure()
+        st.caption("Guide: Oversold < 30, Neutral ≈ 50, Overbought > 70")
 
-            # RSI line
-            fig2.add_trace(go.Scatter(
-                x=rsi_df["date"], y=rsi_df["rsi"],
-                mode="lines", name="RSI(14)",
-                line=dict(color="rgb(255,170,50)", width=2.5)
+    # =======================
+    # OPTIONAL: MACD
+    # =======================
+    if "macd" in vis:
+        with st.container(border=True):
+            st.markdown("### MACD (12, 26, 9)")
+            fig3 = cached_figure("ohlc-macd", _macd_figure, vis[["date", "macd", "macd_signal", "macd_hist"]])
+            st.plotly_chart(fig3, use_container_width=True)
+
+
+# Live mode: only this fragment reruns every LIVE_SECONDS. The closed candles stay
+# in the memoized figure; the open candle is one extra trace on a copy of it.
+@st.experimental_fragment(run_every=LIVE_SECONDS)
+def _live_candles_chart(coin: str, base: go.Figure, recent: pd.DataFrame, interval: int):
+    tick = latest_tick(coin)
+    fig = base if tick is None else _with_live_candle(base, live_candle(recent, tick, interval))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+# -----------------------------
+# Figure builders (pure: frame in, figure out)
+# -----------------------------
+def _candles_figure(vis: pd.DataFrame, show_ind: bool) -> go.Figure:
+    fig = go.Figure()
+
+    # Candles
+    fig.add_trace(go.Candlestick(
+        x=vis["date"], open=vis["open"], high=vis["high"], low=vis["low"], close=vis["close"],
+        name="OHLC",
+        increasing_line_color="#00FFAA",
+        decreasing_line_color="#FF5C5C",
+    ))
+
+    # Volume (secondary axis)
+    fig.add_trace(go.Bar(
+        x=vis["date"],
+        y=(vis["volume"] / 1_000_000),
+        name="Volume (M)",
+        marker_color="#1E90FF",
+        opacity=0.3,
+        yaxis="y2",
+    ))
+
+    # SMAs
+    if show_ind:
+        fig.add_trace(go.Scatter(
+            x=vis["date"], y=vis["sma7"], mode="lines", name="SMA(7)",
+            line=dict(width=2, color="#00BFFF")
+        ))
+        fig.add_trace(go.Scatter(
+            x=vis["date"], y=vis["sma20"], mode="lines", name="SMA(20)",
+            line=dict(width=2, color="#00FFAA")
+        ))
+        for ema_span, color in ((12, "#F472B6"), (26, "#A78BFA")):
+            if f"ema{ema_span}" in vis:
+                fig.add_trace(go.Scatter(
+                    x=vis["date"], y=vis[f"ema{ema_span}"], mode="lines", name=f"EMA({ema_span})",
+                    line=dict(width=1.5, color=color, dash="dash")
+                ))
+        if "bb20_upper" in vis:
+            fig.add_trace(go.Scatter(
+                x=vis["date"], y=vis["bb20_upper"], mode="lines", name="BB Upper",
+                line=dict(width=1, color="rgba(250,204,21,0.8)")
+            ))
+            fig.add_trace(go.Scatter(
+                x=vis["date"], y=vis["bb20_lower"], mode="lines", name="BB Lower",
+                line=dict(width=1, color="rgba(250,204,21,0.8)"),
+                fill="tonexty", fillcolor="rgba(250,204,21,0.06)"
             ))
 
-            # Overbought/Oversold shaded regions
-            fig2.add_hrect(y0=70, y1=100, fillcolor="rgba(239,68,68,0.10)", line_width=0, layer="below")
-            fig2.add_hrect(y0=0,  y1=30,  fillcolor="rgba(34,197,94,0.10)", line_width=0, layer="below")
-
-            # Reference lines
-            for lvl in (30, 50, 70):
-                fig2.add_hline(y=lvl, line=dict(width=1, dash="dot", color="rgba(255,255,255,0.35)"))
-
-            fig2.update_yaxes(range=[0, 100], title="RSI")
-            fig2.update_layout(
-                template="plotly_dark",
-                height=250,
-                margin=dict(t=30, b=30, l=30, r=30),
-                showlegend=False,
-                plot_bgcolor="#0E1117",
-                paper_bgcolor="#0E1117",
-            )
-            st.plotly_chart(fig2, use_container_width=True)
-
-        st.caption("Guide: Oversold < 30, Neutral ≈ 50, Overbought > 70")
+    fig.update_layout(
+        template="plotly_dark",
+        height=500,
+        margin=dict(t=50, b=30, l=30, r=30),
+        xaxis_rangeslider_visible=False,
+        xaxis=dict(title=None),
+        yaxis=dict(title="Price", side="right"),
+        yaxis2=dict(overlaying="y", side="left", showgrid=False, title="Volume (M)",
+                    range=[0, max(1.0, (vis["volume"].max() / 1_000_000) * 3)]),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.25, xanchor="center", x=0.5),
+        plot_bgcolor="#0E1117", paper_bgcolor="#0E1117",
+    )
+    return fig
+
+
+def _with_live_candle(base: go.Figure, candle: dict) -> go.Figure:
+    fig = go.Figure(base)
+    fig.add_trace(go.Candlestick(
+        x=[candle["date"]], open=[candle["open"]], high=[candle["high"]],
+        low=[candle["low"]], close=[candle["close"]],
+        name="Live",
+        showlegend=False,
+        increasing_line_color="#00FFAA",
+        decreasing_line_color="#FF5C5C",
+        opacity=0.7,
+    ))
+    return fig
+
+
+def _rsi_figure(vis: pd.DataFrame) -> go.Figure:
+    fig2 = go.Figure()
+
+    # RSI line
+    fig2.add_trace(go.Scatter(
+        x=vis["date"], y=vis["rsi14"],
+        mode="lines", name="RSI(14)",
+        line=dict(color="rgb(255,170,50)", width=2.5)
+    ))
+
+    # Overbought/Oversold shaded regions
+    fig2.add_hrect(y0=70, y1=100, fillcolor="rgba(239,68,68,0.10)", line_width=0, layer="below")
+    fig2.add_hrect(y0=0,  y1=30,  fillcolor="rgba(34,197,94,0.10)", line_width=0, layer="below")
+
+    # Reference lines
+    for lvl in (30, 50, 70):
+        fig2.add_hline(y=lvl, line=dict(width=1, dash="dot", color="rgba(255,255,255,0.35)"))
+
+    fig2.update_yaxes(range=[0, 100], title="RSI")
+    fig2.update_layout(
+        template="plotly_dark",
+        height=250,
+        margin=dict(t=30, b=30, l=30, r=30),
+        showlegend=False,
+        plot_bgcolor="#0E1117",
+        paper_bgcolor="#0E1117",
+    )
+    return fig2
+
+
+def _macd_figure(vis: pd.DataFrame) -> go.Figure:
+    fig3 = go.Figure()
+    hist = vis["macd_hist"]
+    fig3.add_trace(go.Bar(
+        x=vis["date"], y=hist, name="Histogram",
+        marker_color=["#22c55e" if h >= 0 else "#ef4444" for h in hist], opacity=0.5,
+    ))
+    fig3.add_trace(go.Scatter(
+        x=vis["date"], y=vis["macd"], mode="lines", name="MACD",
+        line=dict(color="#00BFFF", width=2)
+    ))
+    fig3.add_trace(go.Scatter(
+        x=vis["date"], y=vis["macd_signal"], mode="lines", name="Signal",
+        line=dict(color="rgb(255,170,50)", width=1.5)
+    ))
+    fig3.update_layout(
+        template="plotly_dark",
+        height=250,
+        margin=dict(t=30, b=30, l=30, r=30),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.35, xanchor="center", x=0.5),
+        plot_bgcolor="#0E1117",
+        paper_bgcolor="#0E1117",
+    )
+    return fig3
@@ -1,11 +1,42 @@
 import plotly.express as px
 import streamlit as st
-from data import generate_ohlc_data   # use from app.data if you kept package imports
+from data import DAILY, candle_pyramid, candles_for_days, generate_ohlc_data, load_candle_series   # use from app.data if you kept package imports
+from downsample import line_budget, lttb_frame
+from figures import cached_figure
+from ticker import LIVE_SECONDS, latest_tick, with_live_candle
 
-def render(coin: str, days: int):
+def render(coin: str, days: int, interval: int = DAILY, live: bool = False):
     st.subheader(f"Overview — {coin}")
     
     df = generate_ohlc_data(coin, days)
+
+    # Live mode reruns only the KPI row (a fragment) every LIVE_SECONDS
+    if live:
+        _live_kpi_row(coin, df)
+    else:
+        _kpi_row(df)
+
+    # ===== Chart (still in its own big card) =====
+    with st.container():
+        # st.markdown("<div class='as-card'></div>", unsafe_allow_html=True)
+        st.markdown(f"### Price History – {coin}")
+        # KPIs stay daily; the chart follows the selected candle interval. Long ranges
+        # read a coarser level of the coin's pyramid (weekly closes for 5 years, ...)
+        series = load_candle_series(coin, interval)
+        level = candle_pyramid(coin, interval).window(series, candles_for_days(days, interval), line_budget())
+        # LTTB keeps the line's shape within the chart's point budget (no-op for short ranges)
+        line = lttb_frame(level.candles.to_frame()[["date", "close"]], "date", "close")
+        fig = cached_figure("overview-price", _price_history_figure, line)
+        st.plotly_chart(fig, use_container_width=True)
+
+
+@st.experimental_fragment(run_every=LIVE_SECONDS)
+def _live_kpi_row(coin: str, df):
+    tick = latest_tick(coin)
+    _kpi_row(with_live_candle(df, tick) if tick is not None else df)
+
+
+def _kpi_row(df):
     latest, prev = df.iloc[-1], df.iloc[-2]
     change24 = (latest.close - prev.close) / max(prev.close, 1e-6) * 100
 
@@ -45,16 +76,14 @@ def render(coin: str, days: int):
                 st.markdown("<div class='kpi-header'>Volume</div>", unsafe_allow_html=True)
                 st.markdown(f"<div class='kpi-value'>{latest.volume/1000:.2f}k</div>", unsafe_allow_html=True)
 
-    # ===== Chart (still in its own big card) =====
-    with st.container():
-        # st.markdown("<div class='as-card'></div>", unsafe_allow_html=True)
-        st.markdown(f"### Price History – {coin}")
-        fig = px.line(df, x="date", y="close", title=None)
-        fig.update_layout(
-            template="plotly_dark",
-            height=420,
-            margin=dict(t=30, b=30, l=30, r=30),
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-        )
-        st.plotly_chart(fig, use_container_width=True)
+
+def _price_history_figure(df):
+    fig = px.line(df, x="date", y="close", title=None)
+    fig.update_layout(
+        template="plotly_dark",
+        height=420,
+        margin=dict(t=30, b=30, l=30, r=30),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+    )
+    return fig
@@ -1,39 +1,49 @@
-import importlib
-import requests
-import streamlit as st
+import os
+import time
+
 import pandas as pd
-from pathlib import Path
-import sys
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import requests.exceptions as req_exc
-
-# --- ensure repo root is importable (students/ is outside app/) ---
-ROOT = Path(__file__).resolve().parents[2]
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
-
-# Choose the import style that matches your project
+import plotly.graph_objects as go
+import streamlit as st
+
+# (prefer the top-level "data" module so every tab shares one per-coin cache)
 try:
-    from app.data import generate_ohlc_data
+    from data import DAILY, invalidate_ohlc, load_candle_series
+    from student_api import (
+        PredictionError,
+        build_http_session,
+        cached_prediction,
+        check_health,
+        import_student_module,
+        invalidate_health,
+        invalidate_predictions,
+    )
+    from caching import FALLBACK
+    from fanout import start_probes
+    from figures import cached_figure
+    from keepalive import is_warm
+    from sweep import SWEEP_SPAN, SWEEP_STEPS, cached_sweep, invalidate_sweeps
 except ModuleNotFoundError:
-    from data import generate_ohlc_data
-
-# Map sidebar coin -> students module path
-COIN_TO_MODULE = {
-    "BTC": "students.Dylan",
-    "ETH": "students.Kittituch",
-    "SOL": "students.Shawya",
-    "XRP": "students.Ratticha",
-}
-
-# Map coin -> exact endpoint suffix (case-sensitive as per your APIs)
-COIN_TO_ENDPOINT = {
-    "BTC": "bitcoin",
-    "ETH": "ETHUSD",
-    "SOL": "SOLUSD",
-    "XRP": "xrp",
-}
+    from app.data import DAILY, invalidate_ohlc, load_candle_series
+    from app.student_api import (
+        PredictionError,
+        build_http_session,
+        cached_prediction,
+        check_health,
+        import_student_module,
+        invalidate_health,
+        invalidate_predictions,
+    )
+    from app.caching import FALLBACK
+    from app.fanout import start_probes
+    from app.figures import cached_figure
+    from app.keepalive import is_warm
+    from app.sweep import SWEEP_SPAN, SWEEP_STEPS, cached_sweep, invalidate_sweeps
+
+# Latency budget (seconds) for the whole tab; a slower model API falls back to
+# the last good prediction (or an error) instead of blocking the page.
+PREDICTION_BUDGET = float(os.environ.get("CRYPTO_INSIGHT_PREDICTION_BUDGET", 8))
+# The what-if sweep is opt-in and makes up to SWEEP_STEPS calls, so it gets its own
+SWEEP_BUDGET = float(os.environ.get("CRYPTO_INSIGHT_SWEEP_BUDGET", 20))
 
 # -----------------------------
 # Networking helpers & caching
@@ -41,39 +51,13 @@ COIN_TO_ENDPOINT = {
 @st.cache_resource
 def _http_session():
     """Reusable HTTP session with retries."""
-    s = requests.Session()
-    s.headers.update({"User-Agent": "CryptoInsight/1.0"})
-
-    retry = Retry(
-        total=2,
-        backoff_factor=0.6,  # 0.6s, 1.2s ...
-        status_forcelist=[408, 429, 500, 502, 503, 504, 522, 524],
-        allowed_methods=["GET", "POST"],
-        raise_on_status=False,
-    )
-    adapter = HTTPAdapter(max_retries=retry)
-    s.mount("https://", adapter)
-    s.mount("http://", adapter)
-    return s
+    return build_http_session()
 
-@st.cache_data(ttl=1800)
+# Health checks are not memoized here: check_health shares only "up" results
+# (for HEALTH_TTL), so an API that failed a probe is probed again next time.
 def _check_health_url(api_url: str) -> bool:
     """Try /health if it exists, else do a tiny predict probe."""
-    base = api_url.rstrip("/")
-    try:
-        r = _http_session().get(f"{base}/health", timeout=3)
-        if r.ok:
-            return True
-    except Exception:
-        pass
-
-    try:
-        fallback_coin = next(iter(COIN_TO_ENDPOINT.values()))
-        url = f"{base}/predict/{fallback_coin}"
-        r = _http_session().get(url, params={"price": 1.0}, timeout=5)
-        return r.ok
-    except Exception:
-        return False
+    return check_health(_http_session(), api_url)
 
 def prewarm_prediction_for_coin(coin: str) -> bool:
     """Pre-warm the specific student's API behind the chosen coin."""
@@ -91,72 +75,47 @@ def prewarm_prediction_for_coin(coin: str) -> bool:
     st.session_state[ready_key] = bool(ok)
     return bool(ok)
 
-def _get_student_module(coin: str):
-    mod_path = COIN_TO_MODULE.get(coin)
-    if not mod_path:
-        st.error(f"No student module mapped for coin '{coin}'.")
-        st.stop()
-    try:
-        return importlib.import_module(mod_path)
-    except Exception as e:
-        st.error(f"Failed to import {mod_path}: {e}")
-        st.stop()
-
-def _fetch_api_prediction(module, endpoint_suffix: str, price: float) -> dict:
-    """Call student API and normalize the response to a unified dict."""
-    api_url = getattr(module, "API_URL", None)
-    if not api_url:
-        st.error(f"{module.__name__} has no API_URL defined.")
-        st.stop()
-
-    base = api_url.rstrip("/")
-    if base.lower().endswith("/predict"):
-        base = base[: -len("/predict")]
-
-    url = f"{base}/predict/{endpoint_suffix}"
-
-    try:
-        res = _http_session().get(url, params={"price": float(price)}, timeout=10)
-        res.raise_for_status()
-    except Exception as e:
-        st.error(f"Error calling API {url}: {e}")
-        st.stop()
-
-    try:
-        raw = res.json()
-    except Exception:
-        st.error(f"API {url} did not return valid JSON. Got: {res.text[:300]}")
-        st.stop()
-
-    # handle nested prediction key
-    data = raw.get("prediction", raw)
-
-    # try to extract only from these keys
-    pred_val = None
-    for key in ["bitcoin_predicted_next_day_high", "predicted_next_day_high"]:
-        if key in data:
-            pred_val = data[key]
-            break
-
-    if pred_val is None:
-        st.error(f"Expected keys not found. Got: {data}")
-        st.stop()
+def prewarm_all_predictions(coins: list[str]) -> None:
+    """
+    Start warming every student's API in the background so switching coins rarely
+    waits on a probe. Never blocks the rerun: only the Predictions tab's guard
+    waits, and only for the selected coin.
+    """
+    pending = []
+    for coin in coins:
+        if st.session_state.get(f"pred_ready_{coin}"):
+            continue
+        api_url = getattr(_get_student_module(coin), "API_URL", None)
+        if api_url and not is_warm(api_url):
+            pending.append(api_url)
+        else:
+            st.session_state[f"pred_ready_{coin}"] = True  # no API, or the keep-alive loop just saw it up
+    if pending:
+        start_probes(_http_session(), pending)
+
+def invalidate_coin(coin: str) -> None:
+    """Scoped refresh: drop this coin's OHLC, predictions and health check, keep everything else warm."""
+    api_url = getattr(_get_student_module(coin), "API_URL", None)
+    if api_url:
+        invalidate_health(api_url)
+    invalidate_ohlc(coin)
+    invalidate_predictions(coin)
+    invalidate_sweeps(coin)
+    st.session_state.pop(f"pred_ready_{coin}", None)
 
+def _get_student_module(coin: str):
     try:
-        predicted_high = float(pred_val)
-    except Exception:
-        st.error(f"Value under key is not numeric: {pred_val}")
+        return import_student_module(coin)
+    except PredictionError as e:
+        st.error(str(e))
         st.stop()
 
-    # optional model name
-    model_name = getattr(module, "MODEL_NAME", "Unknown")
-
-    return {"predictedHigh": predicted_high, "modelName": model_name}
-
 # -----------------------------
 # UI render
 # -----------------------------
 def render(coin: str, days: int):
+    started = time.monotonic()
+
     # ---------- HEADER ----------
     col_title, col_btn = st.columns([6, 1])
     with col_title:
@@ -169,11 +128,10 @@ def render(coin: str, days: int):
         refresh_clicked = st.button("↻ Refresh", use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
-    # ---------- HARD REFRESH ----------
+    # ---------- SCOPED REFRESH (selected coin only) ----------
     if refresh_clicked:
-        st.cache_data.clear()
-        st.cache_resource.clear()
-        st.rerun()  
+        invalidate_coin(coin)
+        st.rerun()
 
     # ---------- PREWARM GUARD ----------
     ready_key = f"pred_ready_{coin}"
@@ -193,24 +151,30 @@ def render(coin: str, days: int):
             st.stop()  # avoid calling the predict endpoint until ready
 
     # ---------- DATA ----------
-    ohlc = generate_ohlc_data(coin, max(days, 30))
-    current_price = float(ohlc.iloc[-1]["close"])
+    series = load_candle_series(coin)
+    current_price = float(series.close[-1])
+    # One prediction per daily candle (from the live price when first made); it
+    # holds until the candle closes, then the key and the cache roll over
+    candle_date = series.dates[-1]
 
-    # ---------- Route to the correct student + endpoint ----------
-    module = _get_student_module(coin)
-    endpoint_suffix = COIN_TO_ENDPOINT.get(coin)
-    if not endpoint_suffix:
-        st.error(f"No endpoint suffix mapped for coin '{coin}'.")
+    # ---------- Cached prediction (stale-while-revalidate) ----------
+    try:
+        budget = max(0.5, PREDICTION_BUDGET - (time.monotonic() - started))
+        pred, state = cached_prediction(_http_session(), coin, candle_date, current_price, budget=budget)
+    except PredictionError as e:
+        st.error(str(e))
         st.stop()
-
-    pred = _fetch_api_prediction(module, endpoint_suffix, current_price)
-    delta_pct = (pred["predictedHigh"] - current_price) / max(current_price, 1e-6) * 100
+    # The prediction may be hours old: compare it with the price the model was given
+    input_price = float(pred.get("inputPrice", current_price))
+    delta_pct = (pred["predictedHigh"] - input_price) / max(input_price, 1e-6) * 100
 
     # ---------- PRESENTATION ----------
+    if state == FALLBACK:
+        st.warning("Model API is unavailable right now — showing the last successful prediction.")
     with st.container():
         st.markdown(
             f"<div style='color:rgba(255,255,255,.8); font-size:.9rem; margin-top:2px;'>"
-            f"Based on {pred['modelName']}"
+            f"Based on {pred['modelName']}, from a price of ${input_price:,.2f}"
             f"</div>",
             unsafe_allow_html=True
         )
@@ -248,3 +212,47 @@ def render(coin: str, days: int):
                 f"<div style='font-size:23px; font-weight:800; color:#fff;'>{pred['modelName']}</div>",
                 unsafe_allow_html=True
             )
+
+    # ---------- WHAT-IF SWEEP (on demand) ----------
+    if st.toggle(f"What-if: predicted high across ±{SWEEP_SPAN:.0%} of the last close", key=f"sweep_{coin}"):
+        # Centred on the last closed daily candle so the grid (and its cache) is stable all day
+        closed = series.closed(DAILY) or series
+        _render_sweep(coin, closed.dates[-1], float(closed.close[-1]))
+
+
+def _render_sweep(coin: str, candle_date, close_price: float):
+    try:
+        with st.spinner(f"Asking the model about {SWEEP_STEPS} prices…"):
+            sweep, state = cached_sweep(_http_session(), coin, candle_date, close_price, budget=SWEEP_BUDGET)
+    except PredictionError as e:
+        st.error(str(e))
+        return
+    if state == FALLBACK:
+        st.warning("Model API is unavailable right now — showing the last successful sweep.")
+    frame = pd.DataFrame({"price": sweep["prices"], "predicted_high": sweep["predictedHigh"]})
+    fig = cached_figure("prediction-sweep", _sweep_figure, frame, close_price=close_price)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _sweep_figure(frame: pd.DataFrame, close_price: float) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=frame["price"], y=frame["predicted_high"], mode="lines+markers", name="Predicted high",
+        line=dict(width=2, color="#00BFFF"), marker=dict(size=4),
+    ))
+    fig.add_trace(go.Scatter(
+        x=frame["price"], y=frame["price"], mode="lines", name="High = price",
+        line=dict(width=1, color="rgba(255,255,255,0.4)", dash="dot"),
+    ))
+    fig.add_vline(x=close_price, line=dict(width=1, color="#FACC15", dash="dash"),
+                  annotation_text="Last close", annotation_font_color="#FACC15")
+    fig.update_layout(
+        template="plotly_dark",
+        height=380,
+        margin=dict(t=40, b=30, l=30, r=30),
+        xaxis=dict(title="Hypothetical close"),
+        yaxis=dict(title="Predicted next-day high", side="right"),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.35, xanchor="center", x=0.5),
+        plot_bgcolor="#0E1117", paper_bgcolor="#0E1117",
+    )
+    return fig
@@ -1,5 +1,8 @@
 import streamlit as st
 
+# Label of the view switcher radio in main.py; the tab-like CSS below only targets it
+VIEW_SWITCHER_LABEL = "Dashboard view"
+
 def style_sidebar():
     st.markdown(
         """
@@ -214,6 +217,23 @@ def style_sidebar():
         .kpi-delta-pos{ color:#22c55e; font-weight:600; }
         .kpi-delta-neg{ color:#ef4444; font-weight:600; }
 
+        /* Lazy view switcher (main.py): horizontal radio styled like st.tabs.
+           Matched by its label (VIEW_SWITCHER_LABEL) so other radios keep their circles. */
+        div[role="radiogroup"][aria-label="Dashboard view"]{
+            gap: 1.6rem;
+            border-bottom: 1px solid rgba(255,255,255,.12);
+            margin-bottom: .8rem;
+        }
+        div[role="radiogroup"][aria-label="Dashboard view"] label > div:first-child{ display:none; }
+        div[role="radiogroup"][aria-label="Dashboard view"] label{
+            padding: .45rem 0;
+            margin: 0 !important;
+            border-bottom: 2px solid transparent;
+            cursor: pointer;
+        }
+        div[role="radiogroup"][aria-label="Dashboard view"] label:has(input:checked){ border-bottom-color: #ff4b4b; }
+        div[role="radiogroup"][aria-label="Dashboard view"] label:has(input:checked) p{ color: #ff4b4b !important; font-weight: 700; }
+
         /* Mini KPI cards (used inside Overview big card) */
         .as-mini{ display:none; }  /* invisible anchor */
 
@@ -0,0 +1,126 @@
+# app/ticker.py
+from __future__ import annotations
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+import requests
+
+import data
+from caching import SingleFlight
+from perf import count, timed
+
+log = logging.getLogger(__name__)
+
+# Live mode: how often the KPI row / last candle fragments rerun, and how old a
+# shared tick may be before someone fetches a new one (all sessions share it).
+LIVE_SECONDS = float(os.environ.get("CRYPTO_INSIGHT_LIVE_SECONDS", 5))
+TICK_MAX_AGE = max(1.0, LIVE_SECONDS / 2)
+# A tick older than this is not shown as "live" even when Kraken keeps failing.
+TICK_STALE_AFTER = 60.0
+
+
+@dataclass(frozen=True)
+class Tick:
+    symbol: str
+    price: float    # last trade
+    open: float     # today's (UTC) open
+    high: float     # today's high
+    low: float      # today's low
+    volume: float   # today's volume
+    at: float       # epoch seconds when fetched
+
+
+_TICKS: dict[str, Tick] = {}
+_TICKS_LOCK = threading.Lock()
+_FLIGHTS = SingleFlight()
+
+
+def latest_tick(symbol: str, max_age: float = TICK_MAX_AGE) -> Tick | None:
+    """
+    Newest ticker for `symbol`, shared by every session of the process.
+
+    At most one Ticker request per coin per `max_age` seconds (concurrent
+    callers join it); on failure the previous tick is returned while it is
+    younger than TICK_STALE_AFTER, else None.
+    """
+    key = symbol.upper()
+    with _TICKS_LOCK:
+        tick = _TICKS.get(key)
+    if tick is not None and time.time() - tick.at <= max_age:
+        return tick
+    try:
+        tick = _FLIGHTS.do(key, lambda: fetch_ticker(key))
+    except Exception as e:
+        log.warning("Ticker for %s failed: %s", key, e)
+        with _TICKS_LOCK:
+            tick = _TICKS.get(key)
+        return tick if tick is not None and time.time() - tick.at <= TICK_STALE_AFTER else None
+    with _TICKS_LOCK:
+        _TICKS[key] = tick
+    return tick
+
+
+@timed("kraken.ticker")
+def fetch_ticker(symbol: str) -> Tick:
+    """One Kraken Ticker request (paced by the shared Kraken rate limiter)."""
+    count("kraken.ticker")
+    pair = data._symbol_to_kraken_pair(symbol)
+    data.KRAKEN_LIMITER.acquire()
+    resp = requests.get(f"{data.KRAKEN_API_URL}/Ticker", params={"pair": pair}, timeout=5)
+    resp.raise_for_status()
+    payload = data._decode_json(resp.content)
+    if payload.get("error"):
+        raise RuntimeError(f"Kraken API error: {payload['error']}")
+    result = payload.get("result") or {}
+    if not result:
+        raise RuntimeError("Kraken response missing ticker data")
+    t = next(iter(result.values()))
+    return Tick(
+        symbol=symbol.upper(),
+        price=float(t["c"][0]),
+        open=float(t["o"]),
+        high=float(t["h"][0]),
+        low=float(t["l"][0]),
+        volume=float(t["v"][0]),
+        at=time.time(),
+    )
+
+
+def live_candle(df: pd.DataFrame, tick: Tick, interval: int = data.DAILY) -> dict:
+    """
+    The still-open candle for `interval` with `tick` folded in.
+
+    `df` is the series as fetched (its last row may be that open candle).
+    Daily candles take today's open/high/low/volume straight from the ticker,
+    which covers the same UTC day; shorter intervals only move close/high/low.
+    """
+    step = interval * 60
+    start = pd.Timestamp(int(tick.at // step) * step, unit="s")
+    last = df.iloc[-1] if not df.empty else None
+
+    if last is not None and last["date"] == start:
+        candle = {k: last[k] for k in ("date", "open", "high", "low", "close", "volume")}
+    else:
+        prev_close = float(last["close"]) if last is not None else tick.price
+        candle = {"date": start, "open": prev_close, "high": prev_close, "low": prev_close,
+                  "close": prev_close, "volume": 0.0}
+
+    if interval == data.DAILY:
+        candle.update(open=tick.open, volume=max(candle["volume"], tick.volume))
+        candle["high"] = max(candle["high"], tick.high)
+        candle["low"] = min(candle["low"], tick.low)
+    candle["high"] = max(candle["high"], tick.price)
+    candle["low"] = min(candle["low"], tick.price)
+    candle["close"] = tick.price
+    return candle
+
+
+def with_live_candle(df: pd.DataFrame, tick: Tick, interval: int = data.DAILY) -> pd.DataFrame:
+    """`df` with its open candle replaced (or appended) by live_candle()."""
+    candle = live_candle(df, tick, interval)
+    base = df.iloc[:-1] if not df.empty and df["date"].iloc[-1] == candle["date"] else df
+    return pd.concat([base, pd.DataFrame([candle])], ignore_index=True)
@@ -0,0 +1,40 @@
+# benchmarks/compare.py
+"""
+Compare two benchmark result files (best round of each, the least noisy statistic):
+
+    python benchmarks/compare.py benchmarks/results/OLD.json benchmarks/results/NEW.json
+"""
+from __future__ import annotations
+import json
+import sys
+from pathlib import Path
+
+
+def _fmt(result: dict | None) -> str:
+    if result is None:
+        return ""
+    if result.get("unit") == "bytes":
+        return f"{result['min'] / 2**20:.2f} MiB"
+    return f"{result['min'] * 1000:.2f} ms"
+
+
+def main(old_path: str, new_path: str, threshold: float = 0.10) -> int:
+    old, new = (json.loads(Path(p).read_text()) for p in (old_path, new_path))
+    print(f"{'benchmark':<48} {old['commit']:>14} {new['commit']:>14} {'change':>9}")
+    regressions = 0
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        a, b = old["results"].get(name), new["results"].get(name)
+        if a is None or b is None:
+            print(f"{name:<48} {_fmt(a):>14} {_fmt(b):>14} {'new' if a is None else 'removed':>9}")
+            continue
+        change = b["min"] / a["min"] - 1 if a["min"] else 0.0
+        flag = " !" if change > threshold else ""
+        regressions += change > threshold
+        print(f"{name:<48} {_fmt(a):>14} {_fmt(b):>14} {change:>+8.1%}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    sys.exit(main(sys.argv[1], sys.argv[2]))
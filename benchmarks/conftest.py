@@ -0,0 +1,197 @@
+# benchmarks/conftest.py
+"""
+Offline benchmark harness: `python -m pytest benchmarks`.
+
+Kraken and the student APIs are served by stub_server.StubServer from recorded
+fixtures, so nothing here touches the network. Every `bench(...)` result is
+written to benchmarks/results/<timestamp>_<commit>.json at the end of the
+session; compare two runs with `python benchmarks/compare.py OLD NEW`.
+"""
+from __future__ import annotations
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Must be set before the app modules are imported.
+os.environ["CRYPTO_INSIGHT_PREFETCH"] = "0"
+os.environ["CRYPTO_INSIGHT_KEEPALIVE"] = "0"
+# The stub is not Kraken: don't let the client-side rate limit pace the measurements.
+os.environ.setdefault("CRYPTO_INSIGHT_KRAKEN_RATE", "1000")
+os.environ.setdefault("CRYPTO_INSIGHT_KRAKEN_BURST", "1000")
+os.environ.setdefault("CRYPTO_INSIGHT_DATA_DIR", tempfile.mkdtemp(prefix="crypto-bench-"))
+
+import pytest
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from stub_server import StubConfig, StubServer, load_fixtures  # noqa: E402
+
+RESULTS_DIR = BENCH_DIR / "results"
+_RESULTS: dict[str, dict] = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-min-time", type=float, default=0.5,
+                    help="keep repeating a benchmark until this many seconds were measured")
+    group.addoption("--bench-out", default=None,
+                    help="results file (default: benchmarks/results/<timestamp>_<commit>.json)")
+
+
+class Bench:
+    """Time `fn()` over several rounds; `setup()` (untimed) runs before each round."""
+
+    def __init__(self, name: str, min_time: float):
+        self.name = name
+        self.min_time = min_time
+
+    def __call__(self, fn, *, setup=None, warmup: int = 1, min_rounds: int = 3, max_rounds: int = 50):
+        for _ in range(warmup):
+            if setup:
+                setup()
+            fn()
+
+        times: list[float] = []
+        while len(times) < min_rounds or (sum(times) < self.min_time and len(times) < max_rounds):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+
+        _RESULTS[self.name] = {
+            "rounds": len(times),
+            "min": min(times),
+            "median": statistics.median(times),
+            "mean": statistics.fmean(times),
+            "max": max(times),
+            "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        }
+        return result
+
+
+@pytest.fixture
+def bench(request) -> Bench:
+    return Bench(request.node.name, request.config.getoption("--bench-min-time"))
+
+
+@pytest.fixture
+def record_bytes(request):
+    """Store a memory measurement (bytes) next to the timings, compared the same way."""
+    def record(value: float, suffix: str = "") -> None:
+        _RESULTS[request.node.name + suffix] = {
+            "unit": "bytes", "rounds": 1, "min": value, "median": value, "mean": value, "max": value, "stdev": 0.0,
+        }
+    return record
+
+
+@pytest.fixture(scope="session")
+def kraken_fixtures() -> dict:
+    return load_fixtures()
+
+
+@pytest.fixture(scope="session")
+def stub(kraken_fixtures):
+    """Stub server wired into the app: Kraken base URL plus every student module's API_URL."""
+    import data
+    from student_api import COIN_TO_MODULE, import_student_module
+
+    with StubServer(kraken_fixtures) as server:
+        saved_kraken = data.KRAKEN_API_URL
+        data.KRAKEN_API_URL = server.kraken_url
+        modules = [import_student_module(coin) for coin in COIN_TO_MODULE]
+        saved_urls = [m.API_URL for m in modules]
+        for m in modules:
+            m.API_URL = server.url
+        try:
+            yield server
+        finally:
+            data.KRAKEN_API_URL = saved_kraken
+            for m, url in zip(modules, saved_urls):
+                m.API_URL = url
+
+
+@pytest.fixture(autouse=True)
+def cold_app(request):
+    """Every benchmark starts from empty caches, a closed breaker and a clean stub config."""
+    reset_app_state()
+    if "stub" in request.fixturenames:
+        request.getfixturevalue("stub").reset(StubConfig())
+    yield
+
+
+@pytest.fixture
+def reset():
+    """reset_app_state, for `bench(..., setup=reset)` cold-start measurements."""
+    return reset_app_state
+
+
+def reset_app_state() -> None:
+    """Drop every process-wide cache the app keeps (what a fresh server process would have)."""
+    import shutil
+
+    import streamlit as st
+
+    import candle_store
+    import data
+    import figures
+    import resilience
+    import shared_cache
+    import student_api
+    import sweep
+
+    st.cache_data.clear()
+    shared_cache.backend().clear()
+    st.cache_resource.clear()
+    with data._LATEST_LOCK:
+        data._LATEST.clear()
+        data._SERIES.clear()
+    data._STORED.clear()
+    shutil.rmtree(candle_store.DATA_DIR, ignore_errors=True)
+    figures.FIGURE_CACHE = figures.FigureCache()
+    student_api.PREDICTION_CACHE = type(student_api.PREDICTION_CACHE)(
+        ttl=student_api.PREDICTION_CACHE.ttl, expires=student_api.prediction_expiry
+    )
+    sweep.SWEEP_CACHE = type(sweep.SWEEP_CACHE)(
+        ttl=sweep.SWEEP_CACHE.ttl, max_entries=sweep.SWEEP_CACHE.max_entries, expires=student_api.prediction_expiry
+    )
+    with resilience._REGISTRY_LOCK:
+        resilience._BREAKERS.clear()
+        resilience._LATENCY.clear()
+
+
+def _commit() -> str:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BENCH_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _RESULTS:
+        return
+    commit = _commit()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out = session.config.getoption("--bench-out") or RESULTS_DIR / f"{stamp}_{commit}.json"
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "commit": commit,
+        "created": stamp,
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": dict(sorted(_RESULTS.items())),
+    }, indent=2))
+    session.config.pluginmanager.get_plugin("terminalreporter").write_line(f"benchmark results: {out}")
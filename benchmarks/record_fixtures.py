@@ -0,0 +1,81 @@
+# benchmarks/record_fixtures.py
+"""
+Record Kraken OHLC payloads for the offline benchmarks.
+
+    python benchmarks/record_fixtures.py              # live Kraken (needs network)
+    python benchmarks/record_fixtures.py --synthetic  # seeded random walk, same wire format
+
+Each payload is stored verbatim (gzipped JSON) as fixtures/kraken_ohlc_<PAIR>_<interval>.json.gz.
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import json
+import random
+import time
+from pathlib import Path
+
+import requests
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+KRAKEN_OHLC_URL = "https://api.kraken.com/0/public/OHLC"
+
+# Request pair -> (response key Kraken uses, rough price for --synthetic)
+PAIRS = {
+    "XBTUSD": ("XXBTZUSD", 60_000.0),
+    "ETHUSD": ("XETHZUSD", 3_000.0),
+    "SOLUSD": ("SOLUSD", 150.0),
+    "XRPUSD": ("XXRPZUSD", 0.6),
+}
+INTERVALS = (1440, 60)
+
+
+def fixture_path(pair: str, interval: int) -> Path:
+    return FIXTURES_DIR / f"kraken_ohlc_{pair}_{interval}.json.gz"
+
+
+def record_live(pair: str, interval: int) -> dict:
+    resp = requests.get(KRAKEN_OHLC_URL, params={"pair": pair, "interval": interval}, timeout=20)
+    resp.raise_for_status()
+    payload = resp.json()
+    if payload.get("error"):
+        raise RuntimeError(f"Kraken API error for {pair}: {payload['error']}")
+    return payload
+
+
+def synthesize(pair: str, interval: int, n: int = 720, seed: int = 13) -> dict:
+    key, price = PAIRS[pair]
+    rng = random.Random(f"{seed}-{pair}-{interval}")
+    step = interval * 60
+    end = (int(time.time()) // step) * step
+    digits = 5 if price < 10 else 2
+    rows = []
+    for i in range(n):
+        t = end - (n - 1 - i) * step
+        o = price
+        c = price * (1 + rng.gauss(0, 0.02 * (interval / 1440) ** 0.5))
+        h = max(o, c) * (1 + abs(rng.gauss(0, 0.006)))
+        l = min(o, c) * (1 - abs(rng.gauss(0, 0.006)))
+        vwap = (o + h + l + c) / 4
+        rows.append([t, *(f"{v:.{digits}f}" for v in (o, h, l, c, vwap)), f"{rng.uniform(50, 5_000):.8f}", rng.randint(500, 50_000)])
+        price = c
+    return {"error": [], "result": {key: rows, "last": rows[-2][0]}}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", action="store_true", help="generate payloads offline instead of calling Kraken")
+    args = parser.parse_args()
+
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    for pair in PAIRS:
+        for interval in INTERVALS:
+            payload = synthesize(pair, interval) if args.synthetic else record_live(pair, interval)
+            path = fixture_path(pair, interval)
+            with gzip.open(path, "wt", encoding="utf-8") as fh:
+                json.dump(payload, fh, separators=(",", ":"))
+            print(f"{path.name}: {len(next(v for k, v in payload['result'].items() if k != 'last'))} candles")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# benchmarks/stub_server.py
+"""
+Local stand-in for Kraken's OHLC endpoint and the student model APIs.
+
+Routes (same shapes as the real services):
+  GET /0/public/OHLC?pair=&interval=&since=   recorded fixture, replayed so the newest candle is "now"
+  GET /0/public/Ticker?pair=                  ticker built from the fixture's newest daily candle
+  GET /health                                 {"status": "ok"}
+  GET /predict/<coin>?price=                  {"predicted_next_day_high": price * 1.02}
+  POST /predict/<coin>/batch {"prices": [...]}  {"predictions": [{"predicted_next_day_high": ...}, ...]}
+
+Latency and failures are injected through `StubServer.config`, which tests may
+change between runs.
+"""
+from __future__ import annotations
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+_FIXTURE_NAME = re.compile(r"kraken_ohlc_(?P<pair>[A-Z]+)_(?P<interval>\d+)\.json\.gz")
+
+KRAKEN_PAGE = 720
+
+
+@dataclass
+class StubConfig:
+    kraken_latency: float = 0.0    # seconds added to every OHLC response
+    predict_latency: float = 0.0   # seconds added to every /predict response
+    health_latency: float = 0.0    # seconds added to every /health response
+    failure_rate: float = 0.0      # share of /predict and /health calls answered with HTTP 503
+    kraken_throttle_rate: float = 0.0  # share of OHLC calls answered 429 (Retry-After: retry_after)
+    retry_after: float = 0.1
+    seed: int = 0
+
+
+def load_fixtures(directory: Path = FIXTURES_DIR) -> dict[tuple[str, int], dict]:
+    """{(pair, interval): raw Kraken payload} for every recorded fixture."""
+    fixtures = {}
+    for path in sorted(directory.glob("kraken_ohlc_*.json.gz")):
+        m = _FIXTURE_NAME.fullmatch(path.name)
+        if m:
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                fixtures[(m["pair"], int(m["interval"]))] = json.load(fh)
+    return fixtures
+
+
+def fixture_rows(payload: dict) -> tuple[str, list]:
+    """(response pair key, candle rows) of a Kraken OHLC payload."""
+    key = next(k for k in payload["result"] if k != "last")
+    return key, payload["result"][key]
+
+
+class StubServer:
+    """Threaded HTTP server on 127.0.0.1:<free port>; use as a context manager or start()/stop()."""
+
+    def __init__(self, fixtures: dict[tuple[str, int], dict] | None = None, config: StubConfig | None = None):
+        self.fixtures = load_fixtures() if fixtures is None else fixtures
+        self.config = config or StubConfig()
+        self.hits: Counter = Counter()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _handler_for(self))
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="bench-stub", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def kraken_url(self) -> str:
+        return f"{self.url}/0/public"
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reset(self, config: StubConfig | None = None) -> None:
+        with self._lock:
+            self.config = config or StubConfig()
+            self._rng = random.Random(self.config.seed)
+            self.hits.clear()
+
+    # --- responses ---
+    def ohlc(self, params: dict[str, str]) -> tuple[int, dict]:
+        with self._lock:
+            throttled = self._rng.random() < self.config.kraken_throttle_rate
+        if throttled:
+            return 429, {"error": ["EGeneral:Too many requests"]}
+        pair, interval = params.get("pair", ""), int(params.get("interval", 1))
+        payload = self.fixtures.get((pair, interval))
+        if payload is None:
+            return 200, {"error": ["EQuery:Unknown asset pair"]}
+
+        # Replay relative to now: shift the recording so its newest candle is the open one.
+        key, rows = fixture_rows(payload)
+        step = interval * 60
+        shift = (int(time.time()) // step) * step - rows[-1][0]
+        since = int(params.get("since") or 0)
+        page = [[r[0] + shift, *r[1:]] for r in rows if r[0] + shift > since][:KRAKEN_PAGE]
+        if not page:
+            return 200, {"error": [], "result": {key: [], "last": since}}
+        last = page[-2][0] if len(page) > 1 else page[-1][0]
+        return 200, {"error": [], "result": {key: page, "last": last}}
+
+    def ticker(self, params: dict[str, str]) -> tuple[int, dict]:
+        payload = self.fixtures.get((params.get("pair", ""), 1440))
+        if payload is None:
+            return 200, {"error": ["EQuery:Unknown asset pair"]}
+        key, rows = fixture_rows(payload)
+        t, o, h, l, c, _, v, _ = rows[-1]
+        return 200, {"error": [], "result": {key: {"c": [c, "1"], "o": o, "h": [h, h], "l": [l, l], "v": [v, v]}}}
+
+    def model(self, kind: str, params: dict[str, str]) -> tuple[int, dict]:
+        with self._lock:
+            failed = self._rng.random() < self.config.failure_rate
+        if failed:
+            return 503, {"detail": "injected failure"}
+        if kind == "health":
+            return 200, {"status": "ok"}
+        if kind == "batch":
+            return 200, {"predictions": [{"predicted_next_day_high": float(p) * 1.02} for p in params["prices"]]}
+        return 200, {"predicted_next_day_high": float(params.get("price", 0)) * 1.02}
+
+
+def _handler_for(server: StubServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            parsed = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+            config = server.config
+            if parsed.path == "/0/public/OHLC":
+                route, delay = "ohlc", config.kraken_latency
+                status, body = server.ohlc(params)
+            elif parsed.path == "/0/public/Ticker":
+                route, delay = "ticker", config.kraken_latency
+                status, body = server.ticker(params)
+            elif parsed.path == "/health":
+                route, delay = "health", config.health_latency
+                status, body = server.model("health", params)
+            elif parsed.path.startswith("/predict/"):
+                route, delay = "predict", config.predict_latency
+                status, body = server.model("predict", params)
+            else:
+                route, delay, status, body = "unknown", 0.0, 404, {"detail": "Not Found"}
+            self._reply(route, delay, status, body)
+
+        def do_POST(self) -> None:
+            parsed = urlparse(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            params = json.loads(self.rfile.read(length) or b"{}")
+            if parsed.path.startswith("/predict/") and parsed.path.endswith("/batch"):
+                route, delay = "predict_batch", server.config.predict_latency
+                status, body = server.model("batch", params)
+            else:
+                route, delay, status, body = "unknown", 0.0, 404, {"detail": "Not Found"}
+            self._reply(route, delay, status, body)
+
+        def _reply(self, route: str, delay: float, status: int, body: dict) -> None:
+            config = server.config
+            with server._lock:
+                server.hits[route] += 1
+            if delay:
+                time.sleep(delay)
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            if status == 429:
+                self.send_header("Retry-After", str(config.retry_after))
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args) -> None:  # keep pytest output clean
+            pass
+
+    return Handler
@@ -0,0 +1,133 @@
+# benchmarks/test_bench_data.py
+import json
+
+import pandas as pd
+import pytest
+
+import data
+from indicators import IndicatorEngine, batch_indicators
+from stub_server import StubConfig, fixture_rows
+
+
+def _btc_rows(kraken_fixtures, interval=1440):
+    return fixture_rows(kraken_fixtures[("XBTUSD", interval)])[1]
+
+
+def _btc_frame(kraken_fixtures) -> pd.DataFrame:
+    return data._parse_ohlc_rows(_btc_rows(kraken_fixtures))
+
+
+def test_parse_ohlc_rows_daily(bench, kraken_fixtures):
+    rows = _btc_rows(kraken_fixtures)
+    df = bench(lambda: data._parse_ohlc_rows(rows))
+    assert len(df) == len(rows)
+
+
+def test_fetch_ohlc_cold_store(bench, stub, reset):
+    # Full backfill: HTTP round trip + JSON decode + parse + candle store write
+    df = bench(lambda: data.fetch_ohlc_series("BTC"), setup=reset)
+    assert len(df) == 720
+
+
+def test_fetch_ohlc_incremental(bench, stub):
+    data.fetch_ohlc_series("BTC")
+    df = bench(lambda: data.fetch_ohlc_series("BTC"))
+    assert len(df) == 720
+
+
+def test_fetch_ohlc_slow_kraken(bench, stub, reset):
+    stub.reset(StubConfig(kraken_latency=0.2))
+    bench(lambda: data.fetch_ohlc_series("ETH"), setup=reset, warmup=0, min_rounds=2, max_rounds=3)
+
+
+def test_generate_ohlc_data_warm(bench, stub):
+    df = bench(lambda: data.generate_ohlc_data("BTC", 180))
+    assert len(df) == 180 + data.RSI_WARMUP
+
+
+def test_sma(bench, kraken_fixtures):
+    close = _btc_frame(kraken_fixtures)["close"]
+    bench(lambda: (data.sma(close, 7), data.sma(close, 20)))
+
+
+def test_rsi(bench, kraken_fixtures):
+    close = _btc_frame(kraken_fixtures)["close"]
+    bench(lambda: data.rsi(close, 14))
+
+
+def test_indicator_engine_cold_sync(bench, kraken_fixtures):
+    df = _btc_frame(kraken_fixtures)
+    bench(lambda: IndicatorEngine().sync(df["date"], df["close"]))
+
+
+def test_indicator_engine_warm_sync(bench, kraken_fixtures):
+    df = _btc_frame(kraken_fixtures)
+    engine = IndicatorEngine()
+    engine.sync(df["date"], df["close"])
+    bench(lambda: engine.sync(df["date"], df["close"]))
+
+
+def test_batch_indicators_all_coins(bench, kraken_fixtures):
+    closes = [data._parse_ohlc_rows(fixture_rows(p)[1])["close"].to_numpy()
+              for (pair, interval), p in sorted(kraken_fixtures.items()) if interval == 1440]
+    n = min(map(len, closes))
+    matrix = pd.DataFrame([c[-n:] for c in closes]).to_numpy()
+    bench(lambda: batch_indicators(matrix, ema_spans=(12, 26), macd=(12, 26, 9), bollinger_windows=(20,)))
+
+
+# --- Kraken payload decoding: typed parser vs. the original pandas path ---
+PAGES = 20  # ~ a multi-page hourly backfill (20 x 720 candles)
+
+
+@pytest.fixture(scope="module")
+def big_page(kraken_fixtures):
+    key, rows = fixture_rows(kraken_fixtures[("XBTUSD", 60)])
+    span = rows[-1][0] - rows[0][0] + 3600
+    big = [[r[0] - (PAGES - 1 - p) * span, *r[1:]] for p in range(PAGES) for r in rows]
+    return big, json.dumps({"error": [], "result": {key: big, "last": big[-2][0]}}).encode()
+
+
+def test_parse_multi_page_typed(bench, big_page):
+    rows, _ = big_page
+    assert len(bench(lambda: data._parse_ohlc_rows(rows))) == len(rows)
+
+
+def test_parse_multi_page_pandas(bench, big_page):
+    rows, _ = big_page
+    assert len(bench(lambda: data._parse_ohlc_rows_pandas(rows))) == len(rows)
+
+
+def test_decode_multi_page_json(bench, big_page):
+    bench(lambda: json.loads(big_page[1]))
+
+
+@pytest.mark.skipif(data.orjson is None, reason="orjson not installed")
+def test_decode_multi_page_orjson(bench, big_page):
+    bench(lambda: data.orjson.loads(big_page[1]))
+
+
+# --- Stampedes: many sessions missing the same key at once ---
+SESSIONS = 16
+
+
+def _stampede(fn):
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(SESSIONS) as pool:
+        return list(pool.map(lambda _: fn(), range(SESSIONS)))
+
+
+def test_cold_miss_stampede(bench, stub, reset):
+    def run():
+        stub.hits.clear()
+        frames = _stampede(lambda: data.load_ohlc_series("SOL"))
+        # one backfill request (a single full page) no matter how many sessions missed
+        assert stub.hits["ohlc"] == 1 and all(len(f) == 720 for f in frames)
+
+    bench(run, setup=reset, min_rounds=3, max_rounds=10)
+
+
+def test_fetch_with_kraken_throttling(bench, stub, reset):
+    stub.reset(StubConfig(kraken_throttle_rate=0.3, retry_after=0.05))
+    df = bench(lambda: data.fetch_ohlc_series("XRP"), setup=reset, warmup=0, min_rounds=3, max_rounds=5)
+    assert len(df) == 720
@@ -0,0 +1,66 @@
+# benchmarks/test_bench_figures.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import data
+from downsample import lttb_frame, ohlc_buckets
+from indicators import IndicatorEngine, batch_indicators
+from stub_server import fixture_rows
+from tabs.ohlc import _candles_figure, _macd_figure, _rsi_figure
+from tabs.overview import _price_history_figure
+
+
+@pytest.fixture(scope="module")
+def vis(kraken_fixtures):
+    """What the OHLC tab plots for the widest daily range, indicators included."""
+    df = data._parse_ohlc_rows(fixture_rows(kraken_fixtures[("XBTUSD", 1440)])[1])
+    ind = IndicatorEngine().sync(df["date"], df["close"])
+    extras = batch_indicators(df["close"].to_numpy()[None, :], ema_spans=(12, 26), macd=(12, 26, 9),
+                              bollinger_windows=(20,))
+    full = df.assign(**{c: ind[c] for c in ind}, **{k: v[0] for k, v in extras.items()})
+    return ohlc_buckets(full.tail(180).reset_index(drop=True))
+
+
+def test_candles_figure(bench, vis):
+    bench(lambda: _candles_figure(vis, show_ind=True))
+
+
+def test_rsi_figure(bench, vis):
+    bench(lambda: _rsi_figure(vis[["date", "rsi14"]]))
+
+
+def test_macd_figure(bench, vis):
+    bench(lambda: _macd_figure(vis[["date", "macd", "macd_signal", "macd_hist"]]))
+
+
+def test_price_history_figure(bench, vis):
+    bench(lambda: _price_history_figure(lttb_frame(vis, "date", "close")))
+
+
+@pytest.fixture(scope="module")
+def five_years():
+    """Five years of daily candles (more than Kraken serves), as the store accumulates them."""
+    from candles import CandleSeries
+    n = 5 * 365
+    close = 30_000 + np.cumsum(np.random.default_rng(0).normal(0, 300, n))
+    return CandleSeries.from_frame(pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=n, freq="D"),
+        "open": close, "high": close * 1.01, "low": close * 0.99, "close": close, "volume": np.full(n, 1e6),
+    }))
+
+
+def test_pyramid_cold_build(bench, five_years):
+    from pyramid import CandlePyramid
+    bench(lambda: CandlePyramid(1440).sync(five_years))
+
+
+def test_pyramid_new_candle(bench, five_years):
+    from pyramid import CandlePyramid
+    pyramid = CandlePyramid(1440)
+    pyramid.sync(five_years[:-1])
+
+    def step():
+        pyramid.sync(five_years[:-1])
+        return pyramid.sync(five_years)
+    bench(step)
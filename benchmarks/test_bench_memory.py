@@ -0,0 +1,65 @@
+# benchmarks/test_bench_memory.py
+"""Per-hit cost of the shared OHLC series: latency, and memory held by many sessions."""
+import gc
+import tracemalloc
+
+import numpy as np
+
+import data
+from candles import CandleSeries
+
+COINS = ("BTC", "ETH", "SOL", "XRP")
+SESSIONS = 50
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _warm():
+    for coin in COINS:
+        data.load_ohlc_series(coin)
+
+
+def test_ohlc_hit_latency(bench, stub):
+    _warm()
+    bench(lambda: data.load_ohlc_series("BTC"))
+
+
+def test_ohlc_window_hit_latency(bench, stub):
+    _warm()
+    bench(lambda: data.generate_ohlc_data("BTC", 180))
+
+
+def test_ohlc_hits_memory(stub, record_bytes):
+    """Frames held by SESSIONS sessions x 4 coins (each rerun keeps its own reference)."""
+    _warm()
+    gc.collect()
+    rss0 = _rss_bytes()
+    tracemalloc.start()
+    try:
+        held = [data.load_ohlc_series(coin) for _ in range(SESSIONS) for coin in COINS]
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    record_bytes(allocated, "[traced]")
+    record_bytes(max(0, _rss_bytes() - rss0), "[rss]")
+    assert len(held) == SESSIONS * len(COINS)
+
+
+def test_series_window(bench, stub):
+    _warm()
+    series = data.load_candle_series("BTC")
+    bench(lambda: series.between(series.time[-400], series.time[-220]).to_frame())
+
+
+def test_series_memory(stub, record_bytes):
+    """Bytes held per process for the 4 coins' daily series, as a frame vs as CandleSeries."""
+    frames = [data.fetch_ohlc_series(coin) for coin in COINS]
+    record_bytes(sum(int(df.memory_usage(deep=True).sum()) for df in frames), "[frame]")
+    for dtype in (np.float64, np.float32):
+        record_bytes(sum(CandleSeries.from_frame(df, dtype).nbytes for df in frames), f"[{np.dtype(dtype)}]")
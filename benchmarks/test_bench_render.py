@@ -0,0 +1,78 @@
+# benchmarks/test_bench_render.py
+"""Full tab renders through Streamlit's AppTest, against the stub server."""
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from stub_server import StubConfig
+
+
+def _view(view: str, coin: str, days: int, interval: int, live: bool = False):
+    from tabs.ohlc import render as render_ohlc
+    from tabs.overview import render as render_overview
+    from tabs.predictions import render as render_predictions
+    from tabs.team import render as render_team
+
+    if view == "overview":
+        render_overview(coin=coin, days=days, interval=interval, live=live)
+    elif view == "ohlc":
+        render_ohlc(coin=coin, days=days, show_ind=True, interval=interval, live=live)
+    elif view == "predictions":
+        render_predictions(coin=coin, days=days)
+    else:
+        render_team()
+
+
+def _render(view: str, coin: str = "BTC", days: int = 180, interval: int = 1440, live: bool = False) -> AppTest:
+    at = AppTest.from_function(_view, args=(view, coin, days, interval, live), default_timeout=60)
+    at.run()
+    assert not at.exception, [e.value for e in at.exception]
+    return at
+
+
+@pytest.mark.parametrize("view", ["overview", "ohlc", "predictions", "team"])
+def test_render_cold(bench, stub, reset, view):
+    bench(lambda: _render(view), setup=reset, min_rounds=3, max_rounds=10)
+
+
+@pytest.mark.parametrize("view", ["overview", "ohlc", "predictions", "team"])
+def test_render_warm(bench, stub, view):
+    bench(lambda: _render(view))
+
+
+@pytest.mark.parametrize("view", ["overview", "ohlc"])
+def test_render_live_warm(bench, stub, view):
+    bench(lambda: _render(view, live=True))
+
+
+@pytest.mark.parametrize("view", ["overview", "ohlc"])
+@pytest.mark.parametrize("days", [30, 365, 5 * 365])
+def test_render_range_warm(bench, stub, view, days):
+    # 1Y / 5Y draw weekly candles from the pyramid; they should cost about what 30 days does
+    bench(lambda: _render(view, days=days))
+
+
+def test_live_tick_shared_by_sessions(bench, stub):
+    import ticker
+
+    def tick_round():
+        ticker._TICKS.clear()
+        return [ticker.latest_tick("BTC") for _ in range(50)]
+
+    ticks = bench(tick_round)
+    assert len({t.at for t in ticks}) == 1
+
+
+def test_render_ohlc_hourly_cold(bench, stub, reset):
+    bench(lambda: _render("ohlc", interval=60, days=30), setup=reset, min_rounds=3, max_rounds=10)
+
+
+def test_render_predictions_slow_model(bench, stub, reset):
+    stub.reset(StubConfig(predict_latency=0.5, health_latency=0.5))
+    bench(lambda: _render("predictions"), setup=reset, warmup=0, min_rounds=2, max_rounds=3)
+
+
+def test_render_predictions_model_down(bench, stub, reset):
+    # Every /health and /predict call fails: the tab must give up quickly, not hang.
+    stub.reset(StubConfig(failure_rate=1.0))
+    at = bench(lambda: _render("predictions"), setup=reset, warmup=0, min_rounds=2, max_rounds=3)
+    assert at.info or at.error
@@ -0,0 +1,45 @@
+# benchmarks/test_bench_sweep.py
+import pytest
+
+import sweep
+from student_api import build_http_session, import_student_module
+from stub_server import StubConfig
+
+# Render-like model latency: what the sweep's fan-out (or batching) has to hide
+MODEL_LATENCY = 0.05
+CLOSE = 60_000.0
+
+
+@pytest.fixture
+def batch_api(stub):
+    module = import_student_module("BTC")
+    module.BATCH_PREDICT = True
+    yield
+    del module.BATCH_PREDICT
+
+
+def _sweep():
+    out, _ = sweep.cached_sweep(build_http_session(), "BTC", "2024-05-01", CLOSE, budget=30)
+    assert len(out["predictedHigh"]) == sweep.SWEEP_STEPS
+    return out
+
+
+def test_sweep_concurrent_calls(bench, stub, reset):
+    # 50 single-price calls, SWEEP_CONCURRENCY at a time
+    stub.reset(StubConfig(predict_latency=MODEL_LATENCY))
+    bench(_sweep, setup=reset, warmup=0, min_rounds=3, max_rounds=5)
+    assert stub.hits["predict"] % sweep.SWEEP_STEPS == 0 and stub.hits["predict_batch"] == 0
+
+
+def test_sweep_batch_call(bench, stub, reset, batch_api):
+    stub.reset(StubConfig(predict_latency=MODEL_LATENCY))
+    bench(_sweep, setup=reset, warmup=0, min_rounds=3, max_rounds=5)
+    # one round-trip per cold sweep
+    assert stub.hits["predict_batch"] >= 3 and stub.hits["predict"] == 0
+
+
+def test_sweep_cached_grid(bench, stub):
+    stub.reset(StubConfig(predict_latency=MODEL_LATENCY))
+    _sweep()
+    bench(_sweep)
+    assert stub.hits["predict"] == sweep.SWEEP_STEPS
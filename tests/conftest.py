@@ -0,0 +1,21 @@
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+@pytest.fixture(scope="session")
+def kraken_rows():
+    """
+    Candle rows of a Kraken-format OHLC payload (XBTUSD, hourly, 720 candles).
+
+    Synthetic, not recorded from Kraken: a seeded random walk in Kraken's wire
+    format (benchmarks/record_fixtures.py --synthetic), so parser tests cover the
+    format, not quirks of real payloads.
+    """
+    with gzip.open(FIXTURES_DIR / "kraken_ohlc_XBTUSD_60.json.gz", "rt", encoding="utf-8") as fh:
+        result = json.load(fh)["result"]
+    return next(rows for key, rows in result.items() if key != "last")
@@ -0,0 +1,68 @@
+import json
+
+import pandas as pd
+import pytest
+
+import candle_store
+from candle_store import load_candles, merge_candles, save_candles
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(candle_store, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+def _candles(start, n, close=100.0):
+    return pd.DataFrame({
+        "date": pd.date_range(start, periods=n, freq="D"),
+        "open": close, "high": close, "low": close, "close": close, "volume": 1.0,
+    })
+
+
+def _epoch(date):
+    return int(pd.Timestamp(date).timestamp())
+
+
+def test_merge_keeps_the_newer_row_for_overlapping_dates():
+    stored = _candles("2024-05-01", 5)
+    fresh = _candles("2024-05-04", 3, close=200.0)  # cursor candle + open candle re-sent
+    merged = merge_candles(stored, fresh)
+    assert list(merged["date"]) == list(pd.date_range("2024-05-01", periods=6, freq="D"))
+    assert list(merged["close"]) == [100.0] * 3 + [200.0] * 3
+    pd.testing.assert_frame_equal(merge_candles(None, fresh), fresh)
+    assert merge_candles(stored, fresh.iloc[:0]) is stored
+
+
+def test_round_trip_keeps_candles_and_cursor():
+    df = _candles("2024-05-01", 10)
+    save_candles("XBTUSD", 1440, df, _epoch("2024-05-09"))
+    loaded, last = load_candles("XBTUSD", 1440)
+    pd.testing.assert_frame_equal(loaded, df)
+    assert last == _epoch("2024-05-09")
+    assert load_candles("XBTUSD", 60) == (None, None)
+
+
+def test_save_keeps_only_the_newest_max_rows(monkeypatch):
+    monkeypatch.setattr(candle_store, "MAX_ROWS", 4)
+    save_candles("XBTUSD", 1440, _candles("2024-05-01", 10), None)
+    loaded, _ = load_candles("XBTUSD", 1440)
+    assert list(loaded["date"]) == list(pd.date_range("2024-05-07", periods=4, freq="D"))
+
+
+@pytest.mark.parametrize("meta", [None, "{not json", json.dumps({"last": _epoch("2024-06-30")})])
+def test_cursor_recovers_from_a_missing_stale_or_ahead_sidecar(data_dir, meta):
+    save_candles("XBTUSD", 1440, _candles("2024-05-01", 10), _epoch("2024-05-09"))
+    meta_path = data_dir / "XBTUSD_1440.json"
+    if meta is None:
+        meta_path.unlink()
+    else:
+        meta_path.write_text(meta)
+    loaded, last = load_candles("XBTUSD", 1440)
+    assert len(loaded) == 10 and last == _epoch("2024-05-10")  # newest stored candle
+
+
+def test_corrupt_candle_file_reads_as_cold(data_dir):
+    save_candles("XBTUSD", 1440, _candles("2024-05-01", 10), _epoch("2024-05-09"))
+    (data_dir / "XBTUSD_1440.parquet").write_bytes(b"PAR1 cut short")
+    assert load_candles("XBTUSD", 1440) == (None, None)
@@ -0,0 +1,88 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from candles import CandleSeries, next_close
+
+
+def _frame(n=10, start="2024-05-01"):
+    close = np.arange(n, dtype=float) + 100.0
+    return pd.DataFrame({
+        "date": pd.date_range(start, periods=n, freq="D"),
+        "open": close - 1, "high": close + 5, "low": close - 5, "close": close, "volume": np.full(n, 10.0),
+    })
+
+
+def test_from_frame_round_trips_through_to_frame():
+    df = _frame()
+    out = CandleSeries.from_frame(df).to_frame()
+    assert list(out.columns) == list(df.columns)
+    assert (out["date"] == df["date"]).all()
+    pd.testing.assert_frame_equal(out.drop(columns="date"), df.drop(columns="date"))
+
+
+def test_from_frame_sorts_and_keeps_last_duplicate():
+    df = _frame(3)
+    df = pd.concat([df.iloc[[2, 0, 1]], df.iloc[[1]].assign(close=999.0)], ignore_index=True)
+    series = CandleSeries.from_frame(df)
+    assert list(series.close) == [100.0, 999.0, 102.0]
+    assert (np.diff(series.time) > 0).all()
+
+
+def test_windows_and_frames_are_read_only_views():
+    series = CandleSeries.from_frame(_frame())
+    window = series.last(3)
+    frame = window.to_frame()
+    assert np.shares_memory(window.values, series.values)
+    assert np.shares_memory(frame["close"].to_numpy(), series.values)
+    assert np.shares_memory(frame["date"].to_numpy(), series.time)
+    with pytest.raises(ValueError):
+        series.close[0] = 1.0
+    derived = frame.assign(close=frame["close"] * 2)
+    assert derived["close"].iloc[0] == 214.0 and series.close[7] == 107.0
+
+
+def test_last_and_between():
+    series = CandleSeries.from_frame(_frame())
+    assert len(series.last(3)) == 3 and len(series.last(50)) == 10 and len(series.last(0)) == 0
+    window = series.between("2024-05-03", pd.Timestamp("2024-05-05"))
+    assert list(window.close) == [102.0, 103.0, 104.0]
+    assert len(series.between("2025-01-01", "2025-02-01")) == 0
+    assert len(series.between(series.time[-1], series.time[-1])) == 1
+
+
+def test_float32_halves_price_memory_and_pickles():
+    wide, narrow = (CandleSeries.from_frame(_frame(100), dtype) for dtype in (np.float64, np.float32))
+    assert narrow.values.nbytes * 2 == wide.values.nbytes
+    restored = pickle.loads(pickle.dumps(narrow))
+    assert restored.values.dtype == np.float32 and not restored.values.flags.writeable
+    assert (restored.time == narrow.time).all()
+
+
+def test_closed_drops_only_the_open_candle():
+    series = CandleSeries.from_frame(_frame(3, "2024-05-01"))  # last candle: 2024-05-03
+    noon = pd.Timestamp("2024-05-03 12:00").timestamp()
+    assert len(series.closed(1440, now=noon)) == 2
+    assert series.closed(1440, now=noon + 86400) is series
+    assert next_close(1440, noon) == pd.Timestamp("2024-05-04").timestamp()
+    assert next_close(60, noon + 1) == noon + 3600
+
+
+def test_merge_replaces_from_the_first_new_candle():
+    series = CandleSeries.from_frame(_frame(5))
+    newer = CandleSeries.from_frame(_frame(3, "2024-05-04").assign(close=1.0), np.float32)
+    merged = series.merge(newer)
+    assert list(merged.close) == [100.0, 101.0, 102.0, 1.0, 1.0, 1.0]
+    assert merged.values.dtype == np.float64 and series.merge(CandleSeries.empty()) is series
+
+
+def test_frames_are_per_caller_views():
+    series = CandleSeries.from_frame(_frame())
+    mine, theirs = series.to_frame(), series.to_frame()
+    mine["signal"] = 1.0
+    assert "signal" not in theirs and "signal" not in series.last(3).to_frame()
+    assert np.shares_memory(mine["close"].to_numpy(), theirs["close"].to_numpy())
+    with pytest.raises(ValueError):
+        mine.loc[0, "close"] = 1.0
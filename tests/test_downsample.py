@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from downsample import lttb_frame, lttb_indices, ohlc_buckets
+
+
+def _candles(n=1001, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=n, freq="D"),
+        "open": open_,
+        "high": np.maximum(open_, close) * 1.01,
+        "low": np.minimum(open_, close) * 0.99,
+        "close": close,
+        "volume": rng.uniform(1, 2, n),
+        "rsi14": rng.uniform(0, 100, n),
+    })
+
+
+def test_lttb_keeps_endpoints_and_budget():
+    y = np.sin(np.linspace(0, 20, 5000))
+    idx = lttb_indices(np.arange(5000), y, 500)
+    assert len(idx) == 500
+    assert idx[0] == 0 and idx[-1] == 4999
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_frame_is_noop_within_budget():
+    df = _candles(100)[["date", "close"]]
+    assert lttb_frame(df, "date", "close", 200) is df
+
+
+def test_ohlc_buckets_preserve_extremes_and_totals():
+    df = _candles()
+    out = ohlc_buckets(df, 100)
+    assert len(out) <= 100
+    assert out["high"].max() == df["high"].max()
+    assert out["low"].min() == df["low"].min()
+    assert np.isclose(out["volume"].sum(), df["volume"].sum())
+    assert out["open"].iloc[0] == df["open"].iloc[0]
+    assert out["close"].iloc[-1] == df["close"].iloc[-1]
+    assert out["rsi14"].iloc[-1] == df["rsi14"].iloc[-1]
+    assert list(out.columns) == list(df.columns)
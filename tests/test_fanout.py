@@ -0,0 +1,50 @@
+import threading
+import time
+
+import fanout
+
+
+def test_fetch_all_ohlc_runs_coins_concurrently_and_reports_errors_per_coin(monkeypatch):
+    started = threading.Barrier(3, timeout=2)  # only passes if three loads run at once
+
+    def load(coin):
+        started.wait()
+        if coin == "XRP":
+            raise RuntimeError("kraken down")
+        return f"{coin} series"
+
+    monkeypatch.setattr(fanout, "load_candle_series", load)
+    t0 = time.monotonic()
+    results, errors = fanout.fetch_all_ohlc(["BTC", "ETH", "XRP"])
+    assert time.monotonic() - t0 < 1
+    assert results == {"BTC": "BTC series", "ETH": "ETH series"}
+    assert list(errors) == ["XRP"] and "kraken down" in str(errors["XRP"])
+
+
+def test_run_concurrently_reports_slow_tasks_as_timeouts():
+    results, errors = fanout.run_concurrently({"fast": lambda: 1, "slow": lambda: time.sleep(0.5)}, timeout=0.1)
+    assert results == {"fast": 1} and isinstance(errors["slow"], TimeoutError)
+
+
+def test_start_probes_returns_at_once_with_one_probe_per_api_in_flight(monkeypatch):
+    release, probes = threading.Event(), []
+
+    def probe(session, url):
+        probes.append(url)
+        release.wait(2)
+        return True
+
+    monkeypatch.setattr(fanout, "check_health", probe)
+    monkeypatch.setattr(fanout, "_PROBES", {})
+    t0 = time.monotonic()
+    fanout.start_probes(None, ["http://a.test", "http://b.test"])
+    fanout.start_probes(None, ["http://a.test"])  # the next rerun: a is still being probed
+    assert time.monotonic() - t0 < 0.5
+    release.set()
+    for fut in fanout._PROBES.values():
+        fut.result(timeout=2)
+    assert sorted(probes) == ["http://a.test", "http://b.test"]
+
+    fanout.start_probes(None, ["http://a.test"])
+    fanout._PROBES["http://a.test"].result(timeout=2)
+    assert probes.count("http://a.test") == 2
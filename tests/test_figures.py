@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+import figures
+from figures import FigureCache, cached_figure, fingerprint
+
+
+def _frame(close=(1.0, 2.0, 3.0)):
+    return pd.DataFrame({"date": pd.date_range("2024-05-01", periods=len(close)), "close": close})
+
+
+def _build(frame, **options):
+    return go.Figure(go.Scatter(x=frame["date"], y=frame["close"]))
+
+
+def test_fingerprint_changes_with_data_columns_and_options():
+    base = fingerprint(_frame(), 1)
+    assert fingerprint(_frame(), 1) == base
+    assert fingerprint(_frame((1.0, 2.0, 3.5)), 1) != base
+    assert fingerprint(_frame().rename(columns={"close": "open"}), 1) != base
+    assert fingerprint(_frame(), 2) != base
+    assert fingerprint(np.arange(3)) != fingerprint(np.arange(3.0))
+
+
+def test_hit_returns_the_same_figure_and_misses_rebuild(monkeypatch):
+    monkeypatch.setattr(figures, "FIGURE_CACHE", FigureCache())
+    builds = []
+
+    def build(frame, **options):
+        builds.append(1)
+        return _build(frame)
+
+    fig = cached_figure("t", build, _frame(), show=True)
+    assert cached_figure("t", build, _frame(), show=True) is fig and len(builds) == 1
+    assert cached_figure("t", build, _frame((1.0, 2.0, 9.0)), show=True) is not fig
+    assert cached_figure("t", build, _frame(), show=False) is not fig
+    assert len(builds) == 3 and figures.FIGURE_CACHE.hits == 1
+
+
+def test_least_recently_used_figure_is_evicted():
+    cache = FigureCache(maxsize=2)
+    a = cache.get_or_build("a", go.Figure)
+    cache.get_or_build("b", go.Figure)
+    assert cache.get_or_build("a", go.Figure) is a  # "a" is now the most recent
+    cache.get_or_build("c", go.Figure)              # evicts "b"
+    assert cache.get_or_build("a", go.Figure) is a
+    assert list(cache._figs) == ["c", "a"] and cache.misses == 3
@@ -0,0 +1,61 @@
+import types
+
+import pytest
+
+import shared_cache
+import student_api
+from shared_cache import MemoryBackend
+from tabs import predictions
+
+MODULE = types.SimpleNamespace(__name__="students.Fake", API_URL="http://model.test")
+
+
+class _Response:
+    ok = True
+
+    def raise_for_status(self):
+        pass
+
+
+class Session:
+    """Answers probes only while `up`; counts them."""
+
+    def __init__(self, up):
+        self.up = up
+        self.probes = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.probes += 1
+        if not self.up:
+            raise ConnectionError("cold start")
+        return _Response()
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = Session(up=False)
+    monkeypatch.setattr(shared_cache, "_BACKEND", MemoryBackend())
+    monkeypatch.setattr(student_api, "guarded_call", lambda endpoint, fn, **kw: fn())
+    monkeypatch.setattr(predictions, "_http_session", lambda: session)
+    monkeypatch.setattr(predictions, "import_student_module", lambda coin: MODULE)
+    monkeypatch.setattr(predictions, "_get_student_module", lambda coin: MODULE)
+    return session
+
+
+def test_failed_probe_is_not_remembered(session):
+    assert predictions._check_health_url(MODULE.API_URL) is False
+    session.up = True
+    assert predictions._check_health_url(MODULE.API_URL) is True
+    probes = session.probes
+    assert predictions._check_health_url(MODULE.API_URL) is True and session.probes == probes  # "up" is shared
+
+
+def test_refresh_reprobes_the_coins_api(session):
+    session.up = True
+    assert predictions._check_health_url(MODULE.API_URL) is True
+    probes = session.probes
+
+    predictions.invalidate_coin("BTC")
+    session.up = False  # went cold since: Refresh must notice instead of trusting the cached "up"
+    assert predictions._check_health_url(MODULE.API_URL) is False and session.probes > probes
+
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import rsi, sma
+from indicators import IndicatorEngine, batch_indicators
+
+
+def _series(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.03, n))))
+    dates = pd.Series(pd.date_range("2024-01-01", periods=n, freq="D"))
+    return dates, close
+
+
+def _reference(close):
+    return pd.DataFrame({"sma7": sma(close, 7), "sma20": sma(close, 20), "rsi14": rsi(close, 14)})
+
+
+def _assert_parity(out, close):
+    pd.testing.assert_frame_equal(out, _reference(close), check_exact=False, rtol=1e-9, atol=1e-9)
+
+
+def test_full_sync_matches_pandas():
+    dates, close = _series()
+    _assert_parity(IndicatorEngine().sync(dates, close), close)
+
+
+@pytest.mark.parametrize("split", [1, 13, 15, 20, 250, 399])
+def test_incremental_appends_match_pandas(split):
+    dates, close = _series()
+    engine = IndicatorEngine()
+    engine.sync(dates[:split], close[:split])
+    _assert_parity(engine.sync(dates, close), close)
+
+
+def test_revised_last_candle_matches_pandas():
+    dates, close = _series()
+    engine = IndicatorEngine()
+    engine.sync(dates, close)
+    revised = close.copy()
+    revised.iloc[-1] *= 1.05
+    _assert_parity(engine.sync(dates, revised), revised)
+
+
+def test_front_trim_keeps_state_and_appends():
+    dates, close = _series()
+    engine = IndicatorEngine()
+    engine.sync(dates[:350], close[:350])
+    # a capped store drops 50 old candles as 50 new ones arrive: no rebuild
+    out = engine.sync(dates[50:].reset_index(drop=True), close[50:].reset_index(drop=True))
+    expected = _reference(close)[50:].reset_index(drop=True)
+    pd.testing.assert_frame_equal(out, expected, check_exact=False, rtol=1e-9, atol=1e-9)
+    assert len(engine._dates) == 350
+
+
+def test_shifted_history_rebuilds():
+    dates, close = _series()
+    engine = IndicatorEngine()
+    engine.sync(dates, close)
+    shifted_dates = (dates + pd.Timedelta(hours=12))[50:].reset_index(drop=True)
+    tail_close = close[50:].reset_index(drop=True)
+    _assert_parity(engine.sync(shifted_dates, tail_close), tail_close)
+
+
+def test_flat_prices_give_nan_rsi_like_pandas():
+    dates = pd.Series(pd.date_range("2024-01-01", periods=40, freq="D"))
+    close = pd.Series(np.r_[np.linspace(100, 120, 20), np.full(20, 120.0)])
+    _assert_parity(IndicatorEngine().sync(dates, close), close)
+
+
+def test_batch_indicators_match_pandas():
+    closes = np.vstack([_series(seed=s)[1].to_numpy() for s in range(3)])
+    out = batch_indicators(
+        closes,
+        sma_windows=(7, 20),
+        ema_spans=(12, 26),
+        rsi_periods=(7, 14),
+        macd=(12, 26, 9),
+        bollinger_windows=(20,),
+    )
+    for i, row in enumerate(closes):
+        close = pd.Series(row)
+        macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+        expected = {
+            "sma7": sma(close, 7),
+            "sma20": sma(close, 20),
+            "ema26": close.ewm(span=26, adjust=False).mean(),
+            "rsi7": rsi(close, 7),
+            "rsi14": rsi(close, 14),
+            "macd": macd,
+            "macd_signal": macd.ewm(span=9, adjust=False).mean(),
+            "bb20_lower": sma(close, 20) - 2 * close.rolling(20).std(),
+        }
+        for name, series in expected.items():
+            np.testing.assert_allclose(out[name][i], series.to_numpy(), rtol=1e-9, atol=1e-9, err_msg=name)
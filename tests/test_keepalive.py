@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+import keepalive
+import resilience
+from resilience import OPEN
+
+
+class _Response:
+    def __init__(self, status=200):
+        self.status_code = status
+        self.ok = status < 400
+
+
+class Session:
+    def __init__(self, delay=0.0, status=200, error=None):
+        self.delay, self.status, self.error = delay, status, error
+        self.calls = []
+
+    def get(self, url, timeout=None):
+        self.calls.append((url, timeout))
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return _Response(self.status)
+
+
+@pytest.fixture(autouse=True)
+def clean(monkeypatch):
+    monkeypatch.setattr(keepalive, "_STATUS", {})
+    monkeypatch.setattr(resilience, "_BREAKERS", {})
+
+
+def test_fast_answer_is_warm():
+    session = Session()
+    status = keepalive.ping(session, "http://model.test")
+    assert status.warm and status.error is None
+    assert session.calls == [("http://model.test/health", keepalive.PING_TIMEOUT)]
+    assert keepalive.is_warm("http://model.test/")
+
+
+def test_slow_or_failing_answer_is_cold(monkeypatch):
+    monkeypatch.setattr(keepalive, "COLD_THRESHOLD", 0.01)
+    assert not keepalive.ping(Session(delay=0.05), "http://slow.test").warm
+    assert keepalive.ping(Session(status=503), "http://down.test").error == "HTTP 503"
+    failed = keepalive.ping(Session(error=ConnectionError("refused")), "http://gone.test")
+    assert not failed.warm and failed.latency is None and "refused" in failed.error
+    assert not keepalive.is_warm("http://gone.test")
+
+
+def test_stale_status_is_not_warm():
+    keepalive.ping(Session(), "http://model.test")
+    assert not keepalive.is_warm("http://model.test", max_age=-1)
+
+
+def test_ping_does_not_close_a_breaker_opened_by_real_traffic():
+    breaker = resilience.breaker_for("http://model.test")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    keepalive.ping(Session(), "http://model.test")
+    assert breaker.state == OPEN
+
+
+def test_ping_session_does_not_retry():
+    adapter = keepalive.build_ping_session().get_adapter("https://model.test")
+    assert adapter.max_retries.total == 0
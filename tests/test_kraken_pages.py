@@ -0,0 +1,94 @@
+import time
+
+import pandas as pd
+import pytest
+
+import candle_store
+import data
+
+PAGE = data.KRAKEN_MAX_CANDLES
+
+
+class FakeKraken:
+    """Kraken's OHLC paging: candles after `since`, at most 720, newest one still open."""
+
+    def __init__(self, interval, history):
+        step = interval * 60
+        newest = int(time.time()) // step * step
+        self.times = [newest - i * step for i in range(history)][::-1]
+        self.requests = []
+
+    def __call__(self, pair, interval, since):
+        self.requests.append(since)
+        page = [[t, "1", "2", "0.5", "1.5", "1", "10", 3] for t in self.times if t > since][:PAGE]
+        last = page[-2][0] if len(page) > 1 else (page[-1][0] if page else since)
+        return page, last
+
+
+@pytest.fixture
+def kraken(monkeypatch, tmp_path):
+    monkeypatch.setattr(candle_store, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(data, "_STORED", {})
+
+    def install(interval, history):
+        fake = FakeKraken(interval, history)
+        monkeypatch.setattr(data, "_request_kraken_page", fake)
+        return fake
+
+    return install
+
+
+def _walk(since, interval):
+    return [chunk for chunk, _ in data._iter_kraken_ohlc_pages("XBTUSD", interval, since)]
+
+
+def test_cold_backfill_is_one_request(kraken):
+    fake = kraken(60, 5000)
+    chunks = _walk(int(time.time()) - 60 * 60 * PAGE, 60)
+    assert len(fake.requests) == 1 and len(chunks[0]) == PAGE
+
+
+def test_walk_follows_the_cursor_to_the_open_candle(kraken):
+    fake = kraken(60, 5000)
+    since = fake.times[-1500]
+    df = pd.concat(_walk(since, 60), ignore_index=True).drop_duplicates("date")
+    assert len(fake.requests) == 3 and fake.requests[1:] == sorted(fake.requests[1:])
+    expected = pd.to_datetime(fake.times[-1499:], unit="s")
+    assert (df["date"].to_numpy() == expected.to_numpy()).all()
+
+
+def test_short_interval_store_is_read_once_and_written_at_most_every_persist_period(kraken, monkeypatch):
+    kraken(1, 3000)
+    calls = {"load": 0, "save": 0}
+    load, save = data.load_candles, data.save_candles
+    monkeypatch.setattr(data, "load_candles", lambda *a: calls.__setitem__("load", calls["load"] + 1) or load(*a))
+    monkeypatch.setattr(data, "save_candles", lambda *a: calls.__setitem__("save", calls["save"] + 1) or save(*a))
+
+    first = data._fetch_ohlc_series("XBTUSD", 1)
+    second = data._fetch_ohlc_series("XBTUSD", 1)
+    assert calls == {"load": 1, "save": 1} and len(second) == len(first) == PAGE
+
+    monkeypatch.setattr(data, "STORE_PERSIST_SECONDS", 0)
+    data._fetch_ohlc_series("XBTUSD", 1)
+    assert calls == {"load": 1, "save": 2}
+    stored, _ = candle_store.load_candles("XBTUSD", 1)
+    assert len(stored) == PAGE
+
+
+class WindowedKraken(FakeKraken):
+    """Real Kraken: a `since` older than its 720-candle window gets the newest 720 candles."""
+
+    def __call__(self, pair, interval, since):
+        return super().__call__(pair, interval, max(since, self.times[-PAGE] - interval * 60))
+
+
+def test_store_behind_krakens_window_is_not_joined_across_the_hole(kraken, monkeypatch):
+    fake = WindowedKraken(1, 5000)
+    monkeypatch.setattr(data, "_request_kraken_page", fake)
+    old = pd.to_datetime(fake.times[:100], unit="s")  # ~3 days before the window
+    stored = pd.DataFrame({"date": old, "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10.0})
+    candle_store.save_candles("XBTUSD", 1, stored, fake.times[99])
+
+    df = data._fetch_ohlc_series("XBTUSD", 1)
+    assert len(df) == PAGE and df["date"].iloc[0] > old[-1]
+    assert (df["date"].diff().dropna() == pd.Timedelta(minutes=1)).all()
@@ -0,0 +1,32 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+import data
+
+
+def test_matches_pandas_parser(kraken_rows):
+    pd.testing.assert_frame_equal(data._parse_ohlc_rows(kraken_rows), data._parse_ohlc_rows_pandas(kraken_rows))
+
+
+def test_unsorted_and_malformed_rows(kraken_rows):
+    messy = [list(r) for r in kraken_rows[:50]]
+    messy[10][4] = "not-a-number"
+    messy[20][6] = None
+    messy = messy[25:] + messy[:25]
+    got = data._parse_ohlc_rows(messy)
+    pd.testing.assert_frame_equal(got, data._parse_ohlc_rows_pandas(messy))
+    assert len(got) == 48 and got["date"].is_monotonic_increasing
+
+
+def test_empty_page():
+    got = data._parse_ohlc_rows([])
+    assert got.empty
+    assert list(got.columns) == ["date", "open", "high", "low", "close", "volume"]
+    assert got["date"].dtype == "datetime64[ns]" and got["close"].dtype == np.float64
+
+
+def test_decode_json_roundtrip(kraken_rows):
+    payload = {"error": [], "result": {"XXBTZUSD": kraken_rows[:5], "last": kraken_rows[3][0]}}
+    assert data._decode_json(json.dumps(payload).encode()) == payload
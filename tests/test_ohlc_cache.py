@@ -0,0 +1,105 @@
+import time
+
+import pandas as pd
+import pytest
+
+import data
+import shared_cache
+from shared_cache import MemoryBackend
+
+DAY = 86400
+NOON = pd.Timestamp("2024-05-02 12:00").timestamp()
+
+
+@pytest.fixture
+def kraken(monkeypatch):
+    """Fake clock + Kraken: counts full (store) fetches and single open-candle requests."""
+    clock = {"now": NOON}
+    calls = {"full": 0, "open": 0}
+    monkeypatch.setattr(time, "time", lambda: clock["now"])
+    monkeypatch.setattr(shared_cache, "_BACKEND", MemoryBackend())
+    monkeypatch.setattr(data, "_SERIES", {})
+    monkeypatch.setattr(data, "_LATEST", {})
+
+    def fetch(symbol, interval=data.DAILY):
+        calls["full"] += 1
+        end = pd.Timestamp(clock["now"], unit="s").floor("D")
+        dates = pd.date_range(end - pd.Timedelta(days=29), end, freq="D")
+        close = [100.0 + i for i in range(len(dates))]
+        return pd.DataFrame({"date": dates, "open": close, "high": close, "low": close,
+                             "close": close, "volume": 1.0})
+
+    def request_page(pair, interval, since):
+        calls["open"] += 1
+        start = int(clock["now"] // DAY * DAY)
+        return [[since, "1", "1", "1", "1", "1", "1", 1], [start, "7", "9", "6", "8", "8", "2", 3]], start
+
+    monkeypatch.setattr(data, "fetch_ohlc_series", fetch)
+    monkeypatch.setattr(data, "_request_kraken_page", request_page)
+    return clock, calls
+
+
+def test_open_candle_refreshed_alone_until_the_close(kraken):
+    clock, calls = kraken
+    first = data.load_candle_series("BTC")
+    assert data.load_candle_series("BTC") is first and calls == {"full": 1, "open": 0}
+
+    clock["now"] += data.OPEN_CANDLE_TTL + 1
+    refreshed = data.load_candle_series("BTC")
+    assert calls == {"full": 1, "open": 1}
+    assert len(refreshed) == len(first) and refreshed.close[-1] == 8.0
+    # closed candles are kept as they were, including the one at the cursor
+    assert (refreshed.closed(data.DAILY).close == first.closed(data.DAILY).close).all()
+
+
+def test_series_expires_exactly_at_the_candle_close(kraken):
+    clock, calls = kraken
+    clock["now"] = NOON + 12 * 3600 - 5  # 5s before UTC midnight
+    data.load_candle_series("BTC")
+    clock["now"] += 4
+    data.load_candle_series("BTC")
+    assert calls["full"] == 1
+    clock["now"] += 2  # a new daily candle has closed: full (incremental) fetch
+    series = data.load_candle_series("BTC")
+    assert calls == {"full": 2, "open": 0}
+    assert series.dates[-1] == pd.Timestamp("2024-05-03")
+
+
+def test_hourly_expiry_follows_the_hour(kraken):
+    clock, _ = kraken
+    assert data.series_expiry(60, NOON + 30) == NOON + 30 + data.OPEN_CANDLE_TTL
+    assert data.series_expiry(60, NOON + 3590) == NOON + 3600
+    assert data.series_expiry(data.DAILY, NOON) == NOON + data.OPEN_CANDLE_TTL
+
+
+def test_snapshot_open_candle_follows_the_ttl(kraken):
+    clock, calls = kraken
+    snapshot = data.publish_ohlc_series("BTC", data.fetch_ohlc_series("BTC"))
+    assert data.load_candle_series("BTC") is snapshot
+
+    clock["now"] += data.OPEN_CANDLE_TTL + 1  # the refresher's next snapshot is due
+    assert data.load_candle_series("BTC") is snapshot and calls == {"full": 1, "open": 0}
+
+    clock["now"] += data.SNAPSHOT_GRACE  # ... but it is late
+    refreshed = data.load_candle_series("BTC")
+    assert calls == {"full": 1, "open": 1}  # the snapshot's own fetch, then its open candle
+    assert refreshed.close[-1] == 8.0 and len(refreshed) == len(snapshot)
+    assert data.load_candle_series("BTC") is refreshed and calls["open"] == 1
+
+
+def test_workers_share_only_the_newest_candles(kraken, monkeypatch):
+    clock, calls = kraken
+    monkeypatch.setattr(data, "SHARED_TAIL_ROWS", 5)
+    first = data.load_candle_series("BTC")
+    other_worker = {("BTC", data.DAILY): (first, clock["now"], data._GENERATION.get("BTC", 0))}
+
+    clock["now"] += data.OPEN_CANDLE_TTL + 1
+    data.load_candle_series("BTC")  # this worker refreshes the open candle
+    tail, _ = shared_cache.get(data._shared_key("BTC", data.DAILY))
+    assert len(tail) == 5 and calls == {"full": 1, "open": 1}
+
+    monkeypatch.setattr(data, "_SERIES", other_worker)
+    merged = data.load_candle_series("BTC")
+    assert calls == {"full": 1, "open": 1}  # merged the shared tail, no Kraken request
+    assert len(merged) == len(first) and merged.close[-1] == 8.0
+    assert (merged.close[:-1] == first.close[:-1]).all()
@@ -0,0 +1,36 @@
+import json
+
+import perf
+
+
+def test_rerun_trace_collects_spans_and_counters():
+    perf.begin_rerun()
+
+    @perf.timed("stage.outer")
+    def outer():
+        with perf.span("stage.inner"):
+            perf.count("cache.hit")
+        perf.count("cache.hit", 2)
+
+    outer()
+    assert perf.rerun_count("cache.hit") == 3
+    trace = perf.end_rerun()
+
+    assert [s.name for s in trace.spans] == ["stage.inner", "stage.outer"]
+    assert trace.duration >= trace.spans[-1].duration
+    assert perf.rerun_count("cache.hit") == 0  # no rerun open any more
+
+    lines = [json.loads(line) for line in trace.to_json_lines().splitlines()]
+    assert lines[0]["type"] == "rerun" and lines[0]["counters"] == {"cache.hit": 3}
+    assert {line["name"] for line in lines[1:]} == {"stage.inner", "stage.outer"}
+
+    totals, counters = perf.process_totals()
+    assert totals["stage.outer"]["count"] >= 1
+    assert counters["cache.hit"] >= 3
+
+
+def test_spans_outside_a_rerun_only_update_totals():
+    with perf.span("background.work"):
+        pass
+    assert perf.end_rerun() is None
+    assert perf.process_totals()[0]["background.work"]["count"] >= 1
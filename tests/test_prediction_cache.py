@@ -0,0 +1,49 @@
+import types
+
+import pytest
+
+import shared_cache
+import student_api
+from shared_cache import MemoryBackend
+
+MODULE = types.SimpleNamespace(__name__="students.Fake", API_URL="http://model.test", MODEL_NAME="Fake")
+
+
+class _Response:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"predicted_next_day_high": 110.0}
+
+
+class Session:
+    def __init__(self):
+        self.prices = []
+
+    def get(self, url, params=None, timeout=None):
+        self.prices.append(params["price"])
+        return _Response()
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(shared_cache, "_BACKEND", MemoryBackend())
+    monkeypatch.setattr(student_api, "PREDICTION_CACHE", type(student_api.PREDICTION_CACHE)(ttl=60))
+    monkeypatch.setattr(student_api, "import_student_module", lambda coin: MODULE)
+    monkeypatch.setattr(student_api, "guarded_call", lambda endpoint, fn, **kw: fn())
+    return Session()
+
+
+def test_prediction_records_its_input_price(session):
+    pred = student_api.request_prediction(session, MODULE, "bitcoin", 101.5)
+    assert pred == {"predictedHigh": 110.0, "modelName": "Fake", "inputPrice": 101.5}
+
+
+def test_one_prediction_per_daily_candle_with_the_price_it_was_made_from(session):
+    first, _ = student_api.cached_prediction(session, "BTC", "2024-05-02", 101.5)
+    again, _ = student_api.cached_prediction(session, "BTC", "2024-05-02", 102.0)
+    assert again is first and again["inputPrice"] == 101.5 and session.prices == [101.5]
+
+    nextday, _ = student_api.cached_prediction(session, "BTC", "2024-05-03", 103.0)
+    assert nextday["inputPrice"] == 103.0 and session.prices == [101.5, 103.0]
@@ -0,0 +1,119 @@
+import time
+import types
+
+import pandas as pd
+import pytest
+
+import data
+import prefetch
+import shared_cache
+import student_api
+from shared_cache import MemoryBackend
+from student_api import PredictionError
+
+NOON = pd.Timestamp("2024-05-02 12:00").timestamp()
+MODULE = types.SimpleNamespace(__name__="students.Fake", API_URL="http://model.test", MODEL_NAME="Fake")
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake clock, Kraken and model API behind the refresher; counts what it asks for."""
+    clock = {"now": NOON}
+    calls = {"full": 0, "open": 0, "predict": []}
+    monkeypatch.setattr(time, "time", lambda: clock["now"])
+    monkeypatch.setattr(shared_cache, "_BACKEND", MemoryBackend())
+    monkeypatch.setattr(data, "_SERIES", {})
+    monkeypatch.setattr(data, "_LATEST", {})
+    monkeypatch.setattr(student_api, "PREDICTION_CACHE", type(student_api.PREDICTION_CACHE)(ttl=60))
+    monkeypatch.setattr(prefetch, "import_student_module", lambda coin: MODULE)
+    monkeypatch.setattr(student_api, "import_student_module", lambda coin: MODULE)
+
+    def fetch(symbol, interval=data.DAILY):
+        calls["full"] += 1
+        end = pd.Timestamp(clock["now"], unit="s").floor("D")
+        dates = pd.date_range(end - pd.Timedelta(days=29), end, freq="D")
+        close = [100.0 + i for i in range(len(dates))]
+        return pd.DataFrame({"date": dates, "open": close, "high": close, "low": close,
+                             "close": close, "volume": 1.0})
+
+    def open_candle(symbol, interval, series):
+        calls["open"] += 1
+        return series
+
+    def predict(session, module, suffix, price, budget=None):
+        calls["predict"].append(price)
+        return {"predictedHigh": price * 1.1, "modelName": "Fake", "inputPrice": price}
+
+    monkeypatch.setattr(prefetch, "fetch_ohlc_series", fetch)
+    monkeypatch.setattr(prefetch, "fetch_open_candle", open_candle)
+    monkeypatch.setattr(prefetch, "request_prediction", predict)
+    return clock, calls
+
+
+def test_published_snapshot_is_what_renders_read(upstream, monkeypatch):
+    refresher = prefetch.Prefetcher(("BTC",))
+    refresher.refresh_once()
+    monkeypatch.setattr(data, "fetch_ohlc_series", lambda *a: pytest.fail("render fetched from Kraken"))
+    series = data.load_candle_series("BTC")
+    assert series.dates[-1] == pd.Timestamp("2024-05-02") and refresher.last_errors == {}
+
+
+def test_open_candle_alone_between_full_refreshes(upstream):
+    clock, calls = upstream
+    refresher = prefetch.Prefetcher(("BTC",), interval=300)
+    refresher.refresh_once()
+    clock["now"] += data.OPEN_CANDLE_TTL
+    refresher.refresh_once()
+    assert (calls["full"], calls["open"]) == (1, 1)
+    clock["now"] += 300
+    refresher.refresh_once()
+    assert (calls["full"], calls["open"]) == (2, 1)
+
+
+def test_one_prediction_per_daily_candle(upstream):
+    clock, calls = upstream
+    refresher = prefetch.Prefetcher(("BTC",))
+    refresher.refresh_once()
+    clock["now"] += data.OPEN_CANDLE_TTL
+    refresher.refresh_once()
+    assert calls["predict"] == [129.0]
+
+    clock["now"] = NOON + 12 * 3600 + 1  # the daily candle closed
+    refresher.refresh_once()
+    assert len(calls["predict"]) == 2
+    today = data.load_candle_series("BTC").dates[-1]
+    assert today == pd.Timestamp("2024-05-03") and shared_cache.get(student_api._shared_prediction_key("BTC", today))
+
+
+def test_renders_read_the_published_prediction(upstream, monkeypatch):
+    refresher = prefetch.Prefetcher(("BTC",))
+    refresher.refresh_once()
+    monkeypatch.setattr(student_api, "request_prediction", lambda *a, **kw: pytest.fail("render called the model"))
+    series = data.load_candle_series("BTC")
+    pred, _ = student_api.cached_prediction(None, "BTC", series.dates[-1], 131.0)
+    assert pred["inputPrice"] == 129.0
+
+
+def test_errors_are_reported_per_coin(upstream, monkeypatch):
+    _, calls = upstream
+    refresher = prefetch.Prefetcher(("BTC", "ETH"))
+    predict = prefetch.request_prediction
+
+    def cold(session, module, suffix, price, budget=None):
+        raise PredictionError("cold start")
+
+    def down(coin):
+        raise ConnectionError("kraken down")
+
+    monkeypatch.setattr(prefetch, "request_prediction", cold)
+    refresher.refresh_once()
+    assert refresher.last_errors == {"BTC": "prediction: cold start", "ETH": "prediction: cold start"}
+
+    monkeypatch.setattr(prefetch, "request_prediction", predict)
+    refresher.refresh_once()  # a failed prediction is retried on the next run
+    assert refresher.last_errors == {} and len(calls["predict"]) == 2
+
+    other = prefetch.Prefetcher(("XRP",))
+    monkeypatch.setattr(prefetch, "fetch_ohlc_series", down)
+    other.refresh_once()
+    assert other.last_errors == {"XRP": "ohlc: kraken down"}
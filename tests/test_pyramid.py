@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from candles import CandleSeries
+from pyramid import DAILY, FOUR_HOURLY, MONTHLY, WEEKLY, CandlePyramid, aggregate
+
+RESAMPLE_RULES = {FOUR_HOURLY: "4h", DAILY: "D", WEEKLY: "W-MON", MONTHLY: "MS"}
+
+
+def _series(n, freq="D", start="2023-01-03", seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return CandleSeries.from_frame(pd.DataFrame({
+        "date": pd.date_range(start, periods=n, freq=freq),
+        "open": close + rng.normal(0, 0.5, n), "high": close + 2, "low": close - 2,
+        "close": close, "volume": rng.uniform(1, 10, n),
+    }))
+
+
+def _resampled(series, period):
+    df = series.to_frame().set_index("date")
+    out = df.resample(RESAMPLE_RULES[period], label="left", closed="left").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    ).dropna()
+    return out.reset_index()
+
+
+def _assert_levels_equal(a, b):
+    assert (a.candles.time == b.candles.time).all() and (a.last == b.last).all()
+    np.testing.assert_allclose(a.candles.values, b.candles.values)
+
+
+@pytest.mark.parametrize("period,freq,n", [(DAILY, "h", 500), (FOUR_HOURLY, "h", 100),
+                                          (WEEKLY, "D", 400), (MONTHLY, "D", 400)])
+def test_aggregate_matches_pandas_resample(period, freq, n):
+    series = _series(n, freq)
+    level = aggregate(series, period)
+    expected = _resampled(series, period)
+    assert (level.candles.dates == expected["date"].to_numpy()).all()
+    np.testing.assert_allclose(level.candles.values, expected[["open", "high", "low", "close", "volume"]].to_numpy().T)
+    # each candle's last base index points at the candle whose close it took
+    np.testing.assert_array_equal(series.close[level.last], level.candles.close)
+
+
+def test_incremental_sync_matches_full_rebuild():
+    full = _series(400)
+    pyramid = CandlePyramid(DAILY)
+    for base in (full[:300], full[:301], full[:340], full[:339], full):
+        for level, period in zip(pyramid.sync(base)[1:], (WEEKLY, MONTHLY)):
+            _assert_levels_equal(level, aggregate(base, period))
+
+
+def test_revised_last_candle_is_reaggregated():
+    base = _series(60)
+    pyramid = CandlePyramid(DAILY)
+    pyramid.sync(base)
+    df = base.to_frame()
+    revised = CandleSeries.from_frame(df.assign(high=np.r_[df["high"].to_numpy()[:-1], 10_000.0]))
+    weekly = pyramid.sync(revised)[1]
+    assert weekly.candles.high[-1] == 10_000.0
+    _assert_levels_equal(weekly, aggregate(revised, WEEKLY))
+
+
+def test_window_picks_finest_level_within_budget():
+    base = _series(5 * 365)
+    pyramid = CandlePyramid(DAILY)
+    assert pyramid.window(base, 180, budget=300).period == DAILY
+    one_year = pyramid.window(base, 365, budget=300)
+    assert one_year.period == WEEKLY and 52 <= len(one_year) <= 54
+    assert pyramid.window(base, 5 * 365, budget=300).period == WEEKLY
+    assert pyramid.window(base, 5 * 365, budget=100).period == MONTHLY
+    # the window covers the requested span (its first candle may start a bit earlier)
+    assert one_year.candles.time[0] <= base.time[-365] < one_year.candles.time[1]
@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+import data
+from caching import SingleFlight
+from ratelimit import RateLimitTimeout, TokenBucket
+
+
+def test_token_bucket_paces_after_burst():
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # 2 from the burst, then 4 more at 20/s
+    assert time.monotonic() - start >= 0.18
+
+
+def test_token_bucket_pause_and_timeout():
+    bucket = TokenBucket(rate=100, capacity=5)
+    bucket.pause(0.2)
+    with pytest.raises(RateLimitTimeout):
+        bucket.acquire(timeout=0.05)
+    assert bucket.acquire() >= 0.1
+
+
+def test_single_flight_shares_result_and_error():
+    flights = SingleFlight()
+    calls = []
+    gate = threading.Event()
+
+    def slow():
+        calls.append(1)
+        gate.wait(2)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    while not flights.in_flight("k"):
+        time.sleep(0.01)
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert calls == [1] and results == ["value"] * 8
+
+    def boom():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        flights.do("k", boom)
+    assert flights.do("k", lambda: "again") == "again"
+
+
+class _Resp:
+    def __init__(self, status, payload=None, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.content = data.json.dumps(payload or {}).encode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+def test_kraken_throttling_is_queued_not_raised(monkeypatch):
+    rows = [[1_700_000_000, "1", "2", "0.5", "1.5", "1.2", "10", 3]]
+    answers = iter([
+        _Resp(429, headers={"Retry-After": "0.1"}),
+        _Resp(200, {"error": ["EAPI:Rate limit exceeded"]}),
+        _Resp(200, {"error": [], "result": {"XXBTZUSD": rows, "last": 1_700_000_000}}),
+    ])
+    monkeypatch.setattr(data.requests, "get", lambda *a, **kw: next(answers))
+    monkeypatch.setattr(data, "THROTTLE_BACKOFF", 0.1)
+    monkeypatch.setattr(data, "KRAKEN_LIMITER", TokenBucket(rate=100, capacity=1))
+
+    start = time.monotonic()
+    got, last = data._request_kraken_page("XBTUSD", 1440, 0)
+    assert got == rows and last == 1_700_000_000
+    assert time.monotonic() - start >= 0.2
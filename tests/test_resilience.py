@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+import resilience
+from resilience import (
+    CLOSED, HALF_OPEN, OPEN, BudgetExceededError, CircuitBreaker, CircuitOpenError, guarded_call,
+)
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(resilience, "_BREAKERS", {})
+    monkeypatch.setattr(resilience, "_LATENCY", {})
+
+
+def _fail():
+    raise ConnectionError("down")
+
+
+def test_breaker_closed_open_half_open_closed(monkeypatch):
+    now = {"t": 100.0}
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now["t"])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    now["t"] += 30
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # one trial call at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN  # a failed trial re-opens at once
+
+    now["t"] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.failures == 0 and breaker.allow()
+
+
+def test_open_breaker_fails_fast_without_calling():
+    for _ in range(resilience.FAILURE_THRESHOLD):
+        with pytest.raises(ConnectionError):
+            guarded_call("api", _fail, hedge=False)
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        guarded_call("api", lambda: calls.append(1), hedge=False)
+    assert calls == []
+
+
+def test_hedge_fires_after_the_p95_and_the_first_success_wins():
+    tracker = resilience.latency_for("api")
+    for _ in range(resilience.MIN_SAMPLES):
+        tracker.observe(0.02)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.5)  # the straggler
+            return "slow"
+        return "hedged"
+
+    t0 = time.monotonic()
+    assert guarded_call("api", call, hedge=True) == "hedged"
+    assert len(calls) == 2 and time.monotonic() - t0 < 0.4
+
+
+def test_no_hedge_when_the_first_attempt_is_fast():
+    calls = []
+    assert guarded_call("api", lambda: calls.append(1) or "ok", hedge=True) == "ok"
+    assert calls == [1]
+
+
+def test_budget_expiry_counts_as_a_failure():
+    with pytest.raises(BudgetExceededError):
+        guarded_call("api", lambda: time.sleep(0.5), budget=0.1, hedge=False)
+    assert resilience.breaker_for("api").failures == 1
+
+
+def _saturate_pool(seconds):
+    release = threading.Event()
+    for _ in range(resilience._POOL._max_workers):
+        resilience._POOL.submit(release.wait, seconds)
+    return release
+
+
+def test_queueing_does_not_eat_the_endpoints_budget():
+    _saturate_pool(0.2)  # every worker busy for 0.2 s
+    # 0.2 s queued + 0.1 s call > 0.25 s budget, but the endpoint itself took 0.1 s
+    assert guarded_call("api", lambda: time.sleep(0.1) or "ok", budget=0.25, hedge=False) == "ok"
+    assert resilience.breaker_for("api").failures == 0
+
+
+def test_call_that_never_left_the_queue_is_not_the_endpoints_failure():
+    release = _saturate_pool(5)
+    try:
+        calls = []
+        with pytest.raises(BudgetExceededError, match="not called"):
+            guarded_call("api", lambda: calls.append(1), budget=0.1, hedge=False)
+    finally:
+        release.set()
+    breaker = resilience.breaker_for("api")
+    assert calls == [] and breaker.failures == 0 and breaker.state == CLOSED
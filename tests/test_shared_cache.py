@@ -0,0 +1,71 @@
+import multiprocessing as mp
+import time
+
+import pytest
+
+import shared_cache
+from shared_cache import MemoryBackend, SQLiteBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, monkeypatch):
+    backend = MemoryBackend() if request.param == "memory" else SQLiteBackend(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(shared_cache, "_BACKEND", backend)
+    return backend
+
+
+def test_get_or_load_caches_until_ttl(store):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    assert shared_cache.get_or_load("k", loader, ttl=0.2) == {"value": 1}
+    assert shared_cache.get_or_load("k", loader, ttl=0.2) == {"value": 1}
+    time.sleep(0.25)
+    assert shared_cache.get_or_load("k", loader, ttl=0.2) == {"value": 2}
+
+
+def test_invalidate_prefix_only(store):
+    shared_cache.put("ohlc/BTC/1440", 1, ttl=60)
+    shared_cache.put("ohlc/BTC/60", 2, ttl=60)
+    shared_cache.put("ohlc/BTCX_/60", 3, ttl=60)
+    shared_cache.put("ohlc/ETH/1440", 4, ttl=60)
+    shared_cache.invalidate("ohlc/BTC/")
+    assert shared_cache.get("ohlc/BTC/1440") is None and shared_cache.get("ohlc/BTC/60") is None
+    assert shared_cache.get("ohlc/BTCX_/60") == 3 and shared_cache.get("ohlc/ETH/1440") == 4
+
+
+def test_loader_errors_are_not_cached(store):
+    def boom():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        shared_cache.get_or_load("k", boom, ttl=60)
+    assert shared_cache.get_or_load("k", lambda: "ok", ttl=60) == "ok"
+
+
+def _worker(path, counter_path, results):
+    shared_cache._BACKEND = SQLiteBackend(path)
+
+    def loader():
+        with open(counter_path, "a") as fh:
+            fh.write("x")
+        time.sleep(0.3)
+        return "payload"
+
+    results.put(shared_cache.get_or_load("ohlc/BTC/1440", loader, ttl=60))
+
+
+def test_processes_share_one_fetch(tmp_path):
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    counter = tmp_path / "calls.txt"
+    procs = [ctx.Process(target=_worker, args=(tmp_path / "cache.sqlite3", counter, results)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    assert [results.get(timeout=5) for _ in procs] == ["payload"] * 4
+    assert counter.read_text() == "x"
@@ -0,0 +1,139 @@
+import threading
+import types
+
+import numpy as np
+import pytest
+
+import resilience
+import shared_cache
+import student_api
+import sweep
+from resilience import CLOSED, guarded_call
+from shared_cache import MemoryBackend
+from student_api import PredictionError
+
+MODULE = types.SimpleNamespace(__name__="students.Fake", API_URL="http://model.test", MODEL_NAME="Fake")
+
+
+class _Response:
+    def __init__(self, body):
+        self.body = body
+        self.text = str(body)
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+def test_grid_spans_both_ends():
+    grid = sweep.sweep_grid(200.0, 0.10, 5)
+    assert list(grid) == [180.0, 190.0, 200.0, 210.0, 220.0]
+    assert len(sweep.sweep_grid(123.45)) == sweep.SWEEP_STEPS
+
+
+def test_single_calls_are_capped_and_ordered(monkeypatch):
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def fake(session, module, suffix, price, timeout=None):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        threading.Event().wait(0.01)
+        with lock:
+            running[0] -= 1
+        return price * 2
+
+    monkeypatch.setattr(sweep, "fetch_predicted_high", fake)
+    prices = sweep.sweep_grid(100.0, 0.1, 30)
+    highs = sweep.request_sweep(None, MODULE, "fake", prices, budget=5)
+    np.testing.assert_allclose(highs, prices * 2)
+    assert 1 < peak[0] <= sweep.SWEEP_CONCURRENCY
+
+
+def test_one_failed_point_fails_the_sweep(monkeypatch):
+    def fake(session, module, suffix, price, timeout=None):
+        if price >= 105:
+            raise PredictionError("boom")
+        return price
+
+    monkeypatch.setattr(sweep, "fetch_predicted_high", fake)
+    with pytest.raises(PredictionError, match="2 of 5"):
+        sweep.request_sweep(None, MODULE, "fake", sweep.sweep_grid(100.0, 0.1, 5))
+
+
+def test_batch_api_is_one_post():
+    posts = []
+
+    class Session:
+        def post(self, url, json, timeout):
+            posts.append((url, json))
+            return _Response({"predictions": [{"predicted_next_day_high": p + 1} for p in json["prices"]]})
+
+    module = types.SimpleNamespace(**vars(MODULE), BATCH_PREDICT=True)
+    highs = sweep.request_sweep(Session(), module, "bitcoin", np.array([1.0, 2.0]))
+    assert list(highs) == [2.0, 3.0]
+    assert posts == [("http://model.test/predict/bitcoin/batch", {"prices": [1.0, 2.0]})]
+
+
+def test_batch_response_of_the_wrong_length_is_rejected():
+    class Session:
+        def post(self, url, json, timeout):
+            return _Response({"predictions": [5.0]})
+
+    with pytest.raises(PredictionError, match="Expected 2 predictions"):
+        student_api.request_predictions(Session(), MODULE, "bitcoin", [1.0, 2.0])
+
+
+def test_sweeps_are_cached_per_grid(monkeypatch):
+    calls = []
+    monkeypatch.setattr(shared_cache, "_BACKEND", MemoryBackend())
+    monkeypatch.setattr(sweep, "SWEEP_CACHE", type(sweep.SWEEP_CACHE)(ttl=60))
+    monkeypatch.setattr(sweep, "import_student_module", lambda coin: MODULE)
+    monkeypatch.setattr(sweep, "request_sweep", lambda s, m, e, prices, budget=None: calls.append(len(prices)) or prices)
+
+    first, _ = sweep.cached_sweep(None, "BTC", "2024-05-01", 100.0)
+    again, _ = sweep.cached_sweep(None, "BTC", "2024-05-01", 100.0)
+    sweep.cached_sweep(None, "BTC", "2024-05-01", 100.0, steps=11)
+    assert again is first and calls == [sweep.SWEEP_STEPS, 11]
+
+    sweep.invalidate_sweeps("BTC")
+    sweep.cached_sweep(None, "BTC", "2024-05-01", 100.0)
+    assert len(calls) == 3
+
+
+def test_slow_sweep_leaves_other_endpoints_healthy(monkeypatch):
+    monkeypatch.setattr(resilience, "_BREAKERS", {})
+    monkeypatch.setattr(resilience, "_LATENCY", {})
+    release = threading.Event()
+
+    class SlowModel:
+        def get(self, url, params, timeout):
+            release.wait(5)
+            return _Response({"predicted_next_day_high": params["price"]})
+
+    prices = sweep.sweep_grid(100.0, 0.1, 3 * sweep.SWEEP_CONCURRENCY)
+    slow = threading.Thread(target=sweep.request_sweep, args=(SlowModel(), MODULE, "fake", prices))
+    slow.start()
+    try:
+        threading.Event().wait(0.05)  # every sweep worker is now busy
+        for _ in range(resilience.FAILURE_THRESHOLD + 1):
+            assert guarded_call("http://fast.test", lambda: "ok", budget=0.5, hedge=False) == "ok"
+        assert resilience.breaker_for("http://fast.test").state == CLOSED
+    finally:
+        release.set()
+        slow.join()
+
+
+def test_no_sweep_calls_while_the_breaker_is_open(monkeypatch):
+    monkeypatch.setattr(resilience, "_BREAKERS", {})
+    calls = []
+    monkeypatch.setattr(sweep, "fetch_predicted_high", lambda *a, **kw: calls.append(a) or 1.0)
+    breaker = resilience.breaker_for("http://model.test")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    with pytest.raises(PredictionError, match="temporarily unavailable"):
+        sweep.request_sweep(None, MODULE, "fake", sweep.sweep_grid(100.0, 0.1, 5))
+    assert calls == []
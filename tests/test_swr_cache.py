@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from caching import FALLBACK, FRESH, STALE, SWRCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 1_000.0}
+    monkeypatch.setattr(time, "time", lambda: now["t"])
+    return now
+
+
+def _loader(*values):
+    calls = []
+
+    def load():
+        calls.append(1)
+        value = values[min(len(calls), len(values)) - 1]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return load, calls
+
+
+def _wait_for_refresh(cache, key):
+    for _ in range(200):
+        with cache._lock:
+            if key not in cache._refreshing:
+                return
+        threading.Event().wait(0.005)
+    raise AssertionError("background refresh did not finish")
+
+
+def test_fresh_within_ttl_then_stale_while_refreshing(clock):
+    cache = SWRCache(ttl=60)
+    load, calls = _loader("v1", "v2")
+    assert cache.get("k", load) == ("v1", FRESH)
+    clock["t"] += 59
+    assert cache.get("k", load) == ("v1", FRESH) and len(calls) == 1
+
+    clock["t"] += 2
+    assert cache.get("k", load) == ("v1", STALE)  # served at once, refreshed behind it
+    _wait_for_refresh(cache, "k")
+    assert len(calls) == 2 and cache.get("k", load) == ("v2", FRESH)
+
+
+def test_failed_background_refresh_keeps_serving_the_stale_value(clock):
+    cache = SWRCache(ttl=60)
+    load, calls = _loader("v1", RuntimeError("down"))
+    cache.get("k", load)
+    clock["t"] += 61
+    assert cache.get("k", load) == ("v1", STALE)
+    _wait_for_refresh(cache, "k")
+    assert cache.get("k", load) == ("v1", STALE) and len(calls) >= 2
+
+
+def test_failed_miss_falls_back_to_the_groups_last_good_value(clock):
+    cache = SWRCache(ttl=60)
+    cache.get(("BTC", 1), _loader("btc-1")[0], group="BTC")
+    failing, _ = _loader(RuntimeError("down"))
+    assert cache.get(("BTC", 2), failing, group="BTC") == ("btc-1", FALLBACK)
+    with pytest.raises(RuntimeError):
+        cache.get(("ETH", 1), failing, group="ETH")
+
+
+def test_invalidate_group_drops_only_that_group(clock):
+    cache = SWRCache(ttl=60)
+    cache.put("btc", "b", group="BTC")
+    cache.put("eth", "e", group="ETH")
+    assert cache.invalidate_group("BTC") == 1
+    reload, calls = _loader("b2")
+    assert cache.get("btc", reload, group="BTC") == ("b2", FRESH) and calls == [1]
+    assert cache.get("eth", reload, group="ETH") == ("e", FRESH) and calls == [1]
+
+
+def test_expires_callable_replaces_the_ttl(clock):
+    cache = SWRCache(ttl=3600, expires=lambda stored_at: stored_at // 100 * 100 + 100)
+    cache.put("k", "v")  # stored at 1000 -> expires at 1100
+    clock["t"] = 1099
+    assert cache.get("k", _loader("x")[0]) == ("v", FRESH)
+    clock["t"] = 1100
+    assert cache.get("k", _loader("x")[0])[1] == STALE
+
+
+def test_lru_bound(clock):
+    cache = SWRCache(ttl=60, max_entries=2)
+    for key in "abc":
+        cache.put(key, key)
+    load, calls = _loader("reloaded")
+    assert cache.get("a", load) == ("reloaded", FRESH) and calls == [1]
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from ticker import Tick, live_candle, with_live_candle
+
+
+def _frame(dates, close=100.0):
+    n = len(dates)
+    return pd.DataFrame({
+        "date": pd.to_datetime(dates),
+        "open": [close] * n, "high": [close + 5] * n, "low": [close - 5] * n,
+        "close": [close] * n, "volume": [10.0] * n,
+    })
+
+
+def _tick(price, when, **kw):
+    fields = dict(open=99.0, high=price, low=price, volume=3.0)
+    fields.update(kw)
+    return Tick("BTC", price, at=pd.Timestamp(when).timestamp(), **fields)
+
+
+def test_daily_open_candle_takes_ticker_day_stats():
+    df = _frame(["2024-05-01", "2024-05-02"])
+    candle = live_candle(df, _tick(120.0, "2024-05-02 13:00", high=121.0, low=90.0, volume=42.0))
+    assert candle["date"] == pd.Timestamp("2024-05-02")
+    assert candle == {**candle, "open": 99.0, "high": 121.0, "low": 90.0, "close": 120.0, "volume": 42.0}
+
+
+def test_hourly_new_candle_starts_from_previous_close():
+    df = _frame(["2024-05-02 11:00", "2024-05-02 12:00"], close=100.0)
+    candle = live_candle(df, _tick(98.0, "2024-05-02 13:20"), interval=60)
+    assert candle["date"] == pd.Timestamp("2024-05-02 13:00")
+    assert (candle["open"], candle["high"], candle["low"], candle["close"]) == (100.0, 100.0, 98.0, 98.0)
+
+
+def test_with_live_candle_replaces_or_appends():
+    df = _frame(["2024-05-01", "2024-05-02"])
+    same_day = with_live_candle(df, _tick(130.0, "2024-05-02 09:00"))
+    assert len(same_day) == 2 and same_day["close"].iloc[-1] == 130.0
+    next_day = with_live_candle(df, _tick(130.0, "2024-05-03 09:00"))
+    assert len(next_day) == 3 and next_day["date"].iloc[-1] == pd.Timestamp("2024-05-03")